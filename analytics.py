@@ -0,0 +1,233 @@
+# analytics.py
+
+import time
+from datetime import date
+
+from metrics import timed
+from migrations import DEFAULT_TEAM_ID
+from validation import FEET, POSITIONS, ROLES
+
+
+# Age bands of the age distribution: (lowest age, highest age, label)
+AGE_BANDS = ((0, 17, 'under 18'), (18, 22, '18-22'), (23, 27, '23-27'), (28, 32, '28-32'), (33, 200, '33+'))
+
+# Members of a conflicting jersey number are listed only up to this many in total
+MAX_CONFLICT_MEMBERS = 100
+
+# Every aggregate is computed by the database and only grouped rows reach
+# Python. Role, position, foot and height statistics share one scan: the
+# profile is grouped by all four categories and the groups are summed up.
+PROFILE_QUERY = """SELECT position, primary_position, secondary_position, preferred_foot,
+        COUNT(*), COUNT(height), SUM(height), MIN(height), MAX(height)
+    FROM users WHERE team_id = %s GROUP BY position, primary_position, secondary_position, preferred_foot"""
+BIRTH_QUERY = "SELECT date_of_birth, COUNT(*) FROM users WHERE team_id = %s GROUP BY date_of_birth"
+JERSEY_QUERY = """SELECT jersey_number, COUNT(*) FROM users WHERE team_id = %s AND jersey_number IS NOT NULL
+    GROUP BY jersey_number HAVING COUNT(*) > 1 ORDER BY jersey_number"""
+CONFLICT_MEMBERS_QUERY = """SELECT jersey_number, id, first_name, last_name FROM users
+    WHERE team_id = %s AND jersey_number IN ({numbers}) ORDER BY jersey_number, last_name, id"""
+
+
+def age_on(birth_date, today):
+    """
+    Compute an age in whole years.
+
+    Args:
+        birth_date (date or str): Date of birth
+        today (date): Reference date
+
+    Returns:
+        int: Age on the reference date
+    """
+    if not isinstance(birth_date, date):
+        birth_date = date.fromisoformat(str(birth_date))
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+
+
+class SquadReport:
+    """
+    Squad statistics: age distribution, position coverage, height by
+    position, foot balance and jersey number conflicts.
+    """
+
+    def __init__(self, today):
+        self.today = today
+        self.roles = {}
+        self.ages = {}
+        self.primary = {}
+        self.secondary = {}
+        self.heights = {}
+        self.feet = {}
+        self.jersey_conflicts = {}
+        self.conflict_members = {}
+        self.elapsed = 0.0
+
+    @property
+    def members(self):
+        """
+        int: Number of team members.
+        """
+        return sum(self.roles.values())
+
+    @property
+    def mean_age(self):
+        """
+        float or None: Average age, or None for an empty roster.
+        """
+        count = sum(self.ages.values())
+        if not count:
+            return None
+        return sum(age * members for age, members in self.ages.items()) / count
+
+    @property
+    def age_bands(self):
+        """
+        dict: Number of members per AGE_BANDS label.
+        """
+        bands = {label: 0 for _, _, label in AGE_BANDS}
+        for age, count in self.ages.items():
+            for low, high, label in AGE_BANDS:
+                if low <= age <= high:
+                    bands[label] += count
+                    break
+        return bands
+
+    @property
+    def uncovered_positions(self):
+        """
+        list: Positions no player has as primary or secondary position.
+        """
+        return [position for position in POSITIONS
+                if not self.primary.get(position) and not self.secondary.get(position)]
+
+    def conflict_summary(self, number):
+        """
+        Describe who shares a jersey number.
+
+        Args:
+            number (int): A conflicting jersey number
+
+        Returns:
+            str: Names of the members, or only their number if too many to list
+        """
+        members = self.conflict_members.get(number)
+        if not members:
+            return f"{self.jersey_conflicts[number]} members"
+        return ", ".join(name for _, name in members)
+
+    def to_dict(self):
+        """
+        Summarize the report for JSON output.
+
+        Returns:
+            dict: Every statistic, keyed by report section
+        """
+        return {
+            'members': self.members,
+            'roles': self.roles,
+            'age': {'mean': self.mean_age, 'bands': self.age_bands,
+                    'ages': {str(age): count for age, count in sorted(self.ages.items())}},
+            'coverage': {position: {'primary': self.primary.get(position, 0),
+                                    'secondary': self.secondary.get(position, 0)} for position in POSITIONS},
+            'uncovered_positions': self.uncovered_positions,
+            'height_by_position': {position: {'count': count, 'mean': mean, 'min': low, 'max': high}
+                                   for position, (count, mean, low, high) in self.heights.items()},
+            'feet': self.feet,
+            'jersey_conflicts': {str(number): {'count': count, 'members': [
+                {'id': user_id, 'name': name} for user_id, name in self.conflict_members.get(number, [])]}
+                for number, count in self.jersey_conflicts.items()},
+        }
+
+    def summary(self):
+        """
+        Build a human-readable summary of the report.
+
+        Returns:
+            str: One section per statistic
+        """
+        mean_age = f"{self.mean_age:.1f}" if self.mean_age is not None else "-"
+        lines = [f"Members: {self.members} ({', '.join(f'{role}: {self.roles.get(role, 0)}' for role in ROLES)})",
+                 f"Mean age: {mean_age}",
+                 "Age bands: " + ", ".join(f"{label}: {count}" for label, count in self.age_bands.items()),
+                 "Coverage (primary/secondary):"]
+        lines.extend(f"  {position:<4}{self.primary.get(position, 0):>6}{self.secondary.get(position, 0):>6}"
+                     for position in POSITIONS)
+        if self.uncovered_positions:
+            lines.append("Uncovered positions: " + ", ".join(self.uncovered_positions))
+        lines.append("Height by position (count, mean, min, max):")
+        lines.extend(f"  {position:<4}{count:>6}{mean:>8.1f}{low:>6}{high:>6}"
+                     for position, (count, mean, low, high) in sorted(self.heights.items()))
+        lines.append("Preferred foot: " + ", ".join(f"{foot}: {self.feet.get(foot, 0)}" for foot in FEET))
+        if self.jersey_conflicts:
+            lines.append("Jersey number conflicts:")
+            lines.extend(f"  {number}: {self.conflict_summary(number)}" for number in self.jersey_conflicts)
+        else:
+            lines.append("Jersey number conflicts: none")
+        return "\n".join(lines)
+
+
+@timed('model')
+def squad_report(model, today=None, team_id=DEFAULT_TEAM_ID):
+    """
+    Compute squad statistics with grouped queries.
+
+    The team is scanned by three grouped queries on one cursor, so only
+    one row per distinct combination of values is transferred, however
+    large the roster. Reports are cached with the team's roster until the
+    next write to the team.
+
+    Args:
+        model (FootballTeamModel): Model whose backend is queried
+        today (date, optional): Reference date for ages; defaults to today
+        team_id (int): ID of the team
+
+    Returns:
+        SquadReport: The statistics
+    """
+    today = today or date.today()
+    cache = model.team_cache(team_id)
+    cache_key = ('squad_report', today)
+    report = cache.get(cache_key)
+    if report is not None:
+        return report
+
+    generation = cache.generation
+    start = time.perf_counter()
+    report = SquadReport(today)
+    heights = {}
+    with model.backend.cursor() as cursor:
+        cursor.execute(PROFILE_QUERY, (team_id,))
+        for role, primary, secondary, foot, count, measured, total, low, high in cursor.fetchall():
+            report.roles[role] = report.roles.get(role, 0) + count
+            if role != 'Player':
+                continue
+            if primary is not None:
+                report.primary[primary] = report.primary.get(primary, 0) + count
+            if secondary is not None:
+                report.secondary[secondary] = report.secondary.get(secondary, 0) + count
+            if foot is not None:
+                report.feet[foot] = report.feet.get(foot, 0) + count
+            if primary is not None and measured:
+                heights.setdefault(primary, []).append((measured, total, low, high))
+
+        cursor.execute(BIRTH_QUERY, (team_id,))
+        for birth_date, count in cursor.fetchall():
+            age = age_on(birth_date, today)
+            report.ages[age] = report.ages.get(age, 0) + count
+
+        cursor.execute(JERSEY_QUERY, (team_id,))
+        report.jersey_conflicts = {number: count for number, count in cursor.fetchall()}
+        if report.jersey_conflicts and sum(report.jersey_conflicts.values()) <= MAX_CONFLICT_MEMBERS:
+            cursor.execute(CONFLICT_MEMBERS_QUERY.format(numbers=", ".join(["%s"] * len(report.jersey_conflicts))),
+                           (team_id, *report.jersey_conflicts))
+            for number, user_id, first_name, last_name in cursor.fetchall():
+                report.conflict_members.setdefault(number, []).append((user_id, f"{first_name} {last_name}"))
+
+    for position, groups in heights.items():
+        count = sum(group[0] for group in groups)
+        report.heights[position] = (count, float(sum(group[1] for group in groups)) / count,
+                                    min(group[2] for group in groups), max(group[3] for group in groups))
+    report.elapsed = time.perf_counter() - start
+
+    cache.set(cache_key, report, generation)
+    return report
+
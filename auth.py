@@ -0,0 +1,257 @@
+# auth.py
+
+import os
+import secrets
+import threading
+import time
+
+import bcrypt
+
+
+# Login latency the work factor is calibrated against, in seconds
+DEFAULT_TARGET_SECONDS = 0.25
+
+# Never hash with fewer rounds than bcrypt's own default
+MIN_ROUNDS = 12
+MAX_ROUNDS = 16
+
+# Rounds used to time the hardware; cheap enough to run at startup
+CALIBRATION_ROUNDS = 6
+
+# Lifetime of a session token, in seconds
+DEFAULT_SESSION_TTL = 15 * 60
+
+
+def hash_password(password, rounds=MIN_ROUNDS):
+    """
+    Hash a password with bcrypt.
+    Defined at module level so it can run in worker processes.
+
+    Args:
+        password (str): Plain-text password
+        rounds (int): bcrypt work factor
+
+    Returns:
+        str: bcrypt hash
+    """
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def rounds_of(hashed):
+    """
+    Read the work factor of a stored hash.
+
+    Args:
+        hashed (str): bcrypt hash such as "$2b$12$..."
+
+    Returns:
+        int or None: Work factor, or None if the hash is not in bcrypt format
+    """
+    parts = hashed.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def calibrate_rounds(target_seconds=DEFAULT_TARGET_SECONDS, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS):
+    """
+    Find the highest work factor whose hash takes at most target_seconds.
+
+    One hash is timed at CALIBRATION_ROUNDS and the cost of higher factors
+    is extrapolated, since every extra round doubles the work.
+
+    Args:
+        target_seconds (float): Latency budget for one hash
+        min_rounds (int): Lowest factor returned, even if it exceeds the budget
+        max_rounds (int): Highest factor returned
+
+    Returns:
+        int: Work factor between min_rounds and max_rounds
+    """
+    salt = bcrypt.gensalt(CALIBRATION_ROUNDS)
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration", salt)
+    elapsed = time.perf_counter() - start
+
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed * 2 ** (rounds + 1 - CALIBRATION_ROUNDS) <= target_seconds:
+        rounds += 1
+    return rounds
+
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords with a bcrypt work factor that is either
+    fixed or calibrated to a target login latency on first use.
+
+    A stored hash made with a different factor is reported by needs_rehash,
+    so it can be replaced the next time its password is known.
+    """
+
+    def __init__(self, rounds=None, target_seconds=DEFAULT_TARGET_SECONDS, min_rounds=MIN_ROUNDS,
+                 max_rounds=MAX_ROUNDS):
+        """
+        Initialize the hasher.
+
+        Args:
+            rounds (int, optional): Fixed work factor; calibrated if omitted
+            target_seconds (float): Latency budget used for calibration
+            min_rounds (int): Lowest calibrated factor
+            max_rounds (int): Highest calibrated factor
+        """
+        self._rounds = rounds
+        self.target_seconds = target_seconds
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls):
+        """
+        Create a hasher configured by environment variables.
+
+        FOOTBALL_TEAM_BCRYPT_ROUNDS fixes the work factor.
+        FOOTBALL_TEAM_LOGIN_TARGET_MS sets the latency calibration aims for.
+
+        Returns:
+            PasswordHasher: New hasher
+        """
+        rounds = os.environ.get("FOOTBALL_TEAM_BCRYPT_ROUNDS")
+        target = os.environ.get("FOOTBALL_TEAM_LOGIN_TARGET_MS")
+        return cls(rounds=int(rounds) if rounds else None,
+                   target_seconds=float(target) / 1000 if target else DEFAULT_TARGET_SECONDS)
+
+    @property
+    def rounds(self):
+        """
+        int: Work factor for new hashes, calibrated on first access if not fixed.
+        """
+        with self.lock:
+            if self._rounds is None:
+                self._rounds = calibrate_rounds(self.target_seconds, self.min_rounds, self.max_rounds)
+            return self._rounds
+
+    def hash(self, password):
+        """
+        Hash a password with the current work factor.
+
+        Args:
+            password (str): Plain-text password
+
+        Returns:
+            str: bcrypt hash
+        """
+        return hash_password(password, self.rounds)
+
+    def verify(self, password, hashed):
+        """
+        Check a password against a stored hash.
+
+        Args:
+            password (str): Plain-text password
+            hashed (str): Stored bcrypt hash
+
+        Returns:
+            bool: True if the password matches
+        """
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed):
+        """
+        Tell whether a stored hash was made with a different work factor.
+
+        Args:
+            hashed (str): Stored bcrypt hash
+
+        Returns:
+            bool: True if the hash should be replaced
+        """
+        return rounds_of(hashed) != self.rounds
+
+
+class SessionManager:
+    """
+    Issues short-lived session tokens after a successful login.
+
+    Actions on a logged-in user's profile check the token instead of the
+    password, so they never pay the bcrypt cost again. Tokens expire ttl
+    seconds after they are issued and only live in memory.
+    """
+
+    def __init__(self, ttl=DEFAULT_SESSION_TTL, clock=time.monotonic):
+        """
+        Initialize an empty session store.
+
+        Args:
+            ttl (float): Seconds a token stays valid
+            clock (callable): Time source, in seconds
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def create(self, user_id):
+        """
+        Start a session.
+
+        Args:
+            user_id (int): ID of the authenticated user
+
+        Returns:
+            str: New session token
+        """
+        token = secrets.token_urlsafe(32)
+        with self.lock:
+            self.purge()
+            self.sessions[token] = (user_id, self.clock() + self.ttl)
+        return token
+
+    def validate(self, token):
+        """
+        Look up the user of a session.
+
+        Args:
+            token (str): Session token
+
+        Returns:
+            int or None: User ID if the token is valid and unexpired, None otherwise
+        """
+        with self.lock:
+            session = self.sessions.get(token)
+            if session is None:
+                return None
+            user_id, expires = session
+            if self.clock() >= expires:
+                del self.sessions[token]
+                return None
+            return user_id
+
+    def revoke(self, token):
+        """
+        End a session.
+
+        Args:
+            token (str): Session token
+        """
+        with self.lock:
+            self.sessions.pop(token, None)
+
+    def revoke_user(self, user_id):
+        """
+        End every session of a user, e.g. after the account is deleted.
+
+        Args:
+            user_id (int): ID of the user
+        """
+        with self.lock:
+            for token in [token for token, (owner, _) in self.sessions.items() if owner == user_id]:
+                del self.sessions[token]
+
+    def purge(self):
+        """
+        Drop expired sessions. Called with the lock held.
+        """
+        now = self.clock()
+        for token in [token for token, (_, expires) in self.sessions.items() if now >= expires]:
+            del self.sessions[token]
@@ -0,0 +1,320 @@
+# benchmark.py
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from itertools import islice
+
+from analytics import squad_report
+from lineup import suggest_lineups
+from model import PROFILE_COLUMNS, FootballTeamModel
+from search import RosterIndex
+from storage import SQLiteBackend
+from validation import POSITIONS
+
+
+FIRST_NAMES = ['Adam', 'Ben', 'Carlos', 'David', 'Emil', 'Farid', 'Georg', 'Hugo', 'Ivan', 'Jonas',
+               'Karim', 'Luca', 'Marco', 'Nico', 'Omar', 'Paul', 'Rafael', 'Sami', 'Tom', 'Yusuf']
+LAST_NAMES = ['Almaradni', 'Becker', 'Costa', 'Dubois', 'Eriksen', 'Fischer', 'Garcia', 'Hansen',
+              'Ivanov', 'Jansen', 'Kovac', 'Lopez', 'Muller', 'Novak', 'Olsen', 'Petrov', 'Rossi',
+              'Schmidt', 'Silva', 'Weber']
+CITIES = ['Berlin', 'Hamburg', 'Munich', 'Cologne', 'Frankfurt', 'Stuttgart']
+
+# Password of every generated member
+PASSWORD = "benchmark"
+
+# A p50 more than this factor above the baseline counts as a regression
+DEFAULT_TOLERANCE = 1.5
+
+
+def generate_roster(model, count, seed=0, chunk_size=10000):
+    """
+    Fill the database with synthetic team members.
+
+    All members share one password hash so that generating a large roster
+    does not spend its time in bcrypt.
+
+    Args:
+        model (FootballTeamModel): Model whose backend receives the rows
+        count (int): Number of members to create
+        seed (int): Random seed, so runs are reproducible
+        chunk_size (int): Rows inserted per transaction
+    """
+    rng = random.Random(seed)
+    hashed = model.hasher.hash(PASSWORD)
+    query = """INSERT INTO users
+            (id, username, password, first_name, last_name, date_of_birth, position, email,
+             street, building_number, postal_code, city, jersey_number, primary_position,
+             secondary_position, height, preferred_foot)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+
+    def member(user_id):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        dob = date(1980, 1, 1) + timedelta(days=rng.randrange(25 * 365))
+        return (user_id, f"user{user_id}", hashed, first_name, last_name, dob.isoformat(),
+                'Coach' if rng.random() < 0.05 else 'Player',
+                f"{first_name.lower()}.{last_name.lower()}{user_id}@example.com",
+                "Stadionstrasse", str(rng.randint(1, 200)), f"{rng.randint(10000, 99999)}",
+                rng.choice(CITIES), rng.randint(1, 99), rng.choice(POSITIONS), rng.choice(POSITIONS),
+                rng.randint(160, 205), rng.choice(['Right', 'Right', 'Left']))
+
+    members = (member(user_id) for user_id in range(1, count + 1))
+    while True:
+        chunk = list(islice(members, chunk_size))
+        if not chunk:
+            break
+        with model.backend.transaction() as cursor:
+            cursor.executemany(query, chunk)
+    with model.backend.transaction() as cursor:
+        cursor.execute("INSERT INTO id_sequence (name, next_id) VALUES ('users', %s)", (count + 1,))
+
+
+class BenchmarkResult:
+    """
+    Latency samples and peak memory of one benchmark at one roster size.
+    """
+
+    def __init__(self, name, size, samples, peak_memory):
+        self.name = name
+        self.size = size
+        self.samples = samples
+        self.peak_memory = peak_memory
+
+    @property
+    def key(self):
+        """
+        str: Identifier used in baseline files.
+        """
+        return f"{self.name}@{self.size}"
+
+    def percentile(self, percent):
+        """
+        Compute a latency percentile.
+
+        Args:
+            percent (int): Percentile between 1 and 99
+
+        Returns:
+            float: Latency in seconds
+        """
+        if len(self.samples) < 2:
+            return self.samples[0]
+        return statistics.quantiles(self.samples, n=100, method='inclusive')[percent - 1]
+
+    def to_dict(self):
+        """
+        Summarize the result for reports and baselines.
+
+        Returns:
+            dict: Percentiles in milliseconds and peak memory in KiB
+        """
+        return {
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'peak_kib': self.peak_memory / 1024,
+            'runs': len(self.samples),
+        }
+
+
+def measure(func, repeats):
+    """
+    Time func over several runs, then trace its peak memory in one more run.
+
+    Args:
+        func (callable): Operation to measure; called without arguments
+        repeats (int): Number of timed runs
+
+    Returns:
+        tuple: List of durations in seconds, and peak memory in bytes
+    """
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return samples, peak
+
+
+def model_benchmarks(model, size):
+    """
+    Build the model operations to benchmark against a roster of a given size.
+
+    Read benchmarks clear the model's caches before every run so they
+    measure the database path.
+
+    Args:
+        model (FootballTeamModel): Model filled by generate_roster
+        size (int): Number of members in the roster
+
+    Returns:
+        list: (name, callable, repeats) tuples
+    """
+    rng = random.Random(size)
+    counter = iter(range(size + 1, sys.maxsize))
+    deletable = iter(range(1, size + 1))
+
+    def cold(func):
+        def run():
+            for cache in list(model.team_caches.values()):
+                cache.clear()
+            model.profile_cache.clear()
+            return func()
+        return run
+
+    def register_user():
+        user_id = next(counter)
+        model.register_user(f"new{user_id}", PASSWORD, "Bench", "Mark", "2000-01-01", "Player")
+
+    def update_user_profile():
+        user_id = rng.randint(1, size)
+        original = model.get_user_data(user_id)
+        if original:
+            user_data = original.to_dict(PROFILE_COLUMNS)
+            user_data['email'] = f"updated{rng.random()}@example.com"
+            model.update_user_profile(user_id, user_data, original)
+
+    index = RosterIndex.from_items(item for batch in model.iter_team_batches() for item in batch.items())
+
+    return [
+        ('register_user', register_user, 5),
+        ('verify_user', lambda: model.verify_user(f"user{rng.randint(1, size)}", PASSWORD), 5),
+        ('get_user_data', cold(lambda: model.get_user_data(rng.randint(1, size))), 50),
+        ('update_user_profile', update_user_profile, 20),
+        ('delete_user', lambda: model.delete_user(next(deletable)), 20),
+        ('get_team_data', cold(model.get_team_data), 5),
+        ('iter_team_data_first_page', cold(lambda: list(islice(model.iter_team_data(batch_size=200), 200))), 20),
+        ('stream_team_data', lambda: sum(1 for _ in model.stream_team_data()), 5),
+        ('squad_report', cold(lambda: squad_report(model)), 20),
+        ('suggest_lineups', lambda: suggest_lineups(model), 5),
+        ('roster_index_search', lambda: index.search("ma", plays='ST', preferred_foot='Left'), 50),
+    ]
+
+
+def view_benchmarks(model):
+    """
+    Build the team view benchmark if a display is available.
+
+    Args:
+        model (FootballTeamModel): Model filled by generate_roster
+
+    Returns:
+        list: (name, callable, repeats) tuples; empty when Tk cannot start
+    """
+    import tkinter as tk
+    from view import FootballTeamView
+
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print("No display available, skipping view benchmarks", file=sys.stderr)
+        return []
+    root.withdraw()
+    view = FootballTeamView(root)
+
+    def build_team_view():
+        first_page = list(next(model.iter_team_batches(batch_size=200)).items())
+        team_window, _, _, _, _, _, _ = view.create_team_view_window(first_page)
+        team_window.update_idletasks()
+        team_window.destroy()
+
+    return [('create_team_view_window', build_team_view, 5)]
+
+
+def run(sizes, include_view=True, seed=0):
+    """
+    Run every benchmark for every roster size on a fresh in-memory database.
+
+    Args:
+        sizes (list): Roster sizes to generate
+        include_view (bool): Whether to benchmark the team view build
+        seed (int): Random seed for the roster generator
+
+    Returns:
+        list: BenchmarkResult objects
+    """
+    results = []
+    for size in sizes:
+        model = FootballTeamModel(SQLiteBackend())
+        generate_roster(model, size, seed)
+        benchmarks = model_benchmarks(model, size)
+        if include_view:
+            benchmarks += view_benchmarks(model)
+        for name, func, repeats in benchmarks:
+            samples, peak = measure(func, repeats)
+            results.append(BenchmarkResult(name, size, samples, peak))
+        model.close_connection()
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Find benchmarks whose median latency regressed against a baseline.
+
+    Args:
+        results (list): BenchmarkResult objects
+        baseline (dict): Summaries keyed by BenchmarkResult.key
+        tolerance (float): Allowed ratio between new and baseline p50
+
+    Returns:
+        list: (key, baseline p50 ms, new p50 ms) for each regression
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.key)
+        if reference is None:
+            continue
+        p50 = result.to_dict()['p50_ms']
+        if p50 > reference['p50_ms'] * tolerance:
+            regressions.append((result.key, reference['p50_ms'], p50))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model operations and the team view on SQLite.")
+    parser.add_argument('--sizes', default='100,1000,10000',
+                        help="Comma-separated roster sizes, from 100 up to 1000000 (default: 100,1000,10000)")
+    parser.add_argument('--no-view', action='store_true', help="Skip the team view benchmark")
+    parser.add_argument('--save-baseline', metavar='FILE', help="Write the results as a baseline JSON file")
+    parser.add_argument('--baseline', metavar='FILE', help="Compare against a baseline JSON file")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed p50 slowdown factor before a regression is reported")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = run(sizes, include_view=not args.no_view)
+
+    print(f"{'benchmark':<28}{'size':>9}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'peak KiB':>11}")
+    for result in results:
+        summary = result.to_dict()
+        print(f"{result.name:<28}{result.size:>9}{summary['p50_ms']:>11.2f}{summary['p95_ms']:>11.2f}"
+              f"{summary['p99_ms']:>11.2f}{summary['peak_kib']:>11.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as file:
+            json.dump({result.key: result.to_dict() for result in results}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: p50 {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded cache with least-recently-used eviction and a
+    time-to-live per entry.
+
+    Every invalidation bumps a generation counter. A reader takes the
+    generation before querying the database and passes it to set(); if the
+    cache was invalidated in the meantime, the possibly stale value is
+    dropped instead of stored.
+    """
+
+    def __init__(self, maxsize=128, ttl=60.0):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries
+            ttl (float): Seconds an entry stays valid after it is stored
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Look up an entry.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            object: The cached value, or default
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, generation=None):
+        """
+        Store an entry, evicting the least recently used one if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            generation (int, optional): Generation read before the value was
+                loaded; the value is not stored if the cache changed since
+        """
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Remove one entry.
+
+        Args:
+            key: Cache key
+        """
+        with self.lock:
+            self.generation += 1
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove every entry.
+        """
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
@@ -0,0 +1,399 @@
+# cli.py
+
+import argparse
+import json
+import sys
+import time
+
+from analytics import squad_report
+from exporter import EXPORT_FORMATS, export_roster, write_csv, write_jsonl
+from importer import BulkImporter, iter_records
+from lineup import FORMATIONS, suggest_lineups
+from migrations import DEFAULT_TEAM_ID
+from model import PROFILE_COLUMNS, TEAM_COLUMNS, FootballTeamModel
+from storage import SQLiteBackend, StorageError
+from unit_of_work import UnitOfWork
+from validation import PROFILE_SCHEMA, REGISTRATION_FIELDS, REGISTRATION_SCHEMA, format_errors, registration_record
+
+
+def register(model, record, team_id=DEFAULT_TEAM_ID):
+    """
+    Validate and register one user.
+
+    Args:
+        model (FootballTeamModel): Model to write to
+        record (dict): Values keyed by REGISTRATION_FIELDS
+        team_id (int): ID of the team the user joins
+
+    Returns:
+        str or None: Error message, or None on success
+    """
+    record = registration_record(record)
+    errors = REGISTRATION_SCHEMA.validate(record)
+    if errors:
+        return format_errors(errors, "; ")
+    if not model.register_user(*(record[field] for field in REGISTRATION_FIELDS), team_id):
+        return "Could not register user"
+    return None
+
+
+def field_text(value):
+    """
+    Convert a profile value from a file or the database to form text.
+
+    Args:
+        value: Value of any type; None (JSON null) means an empty field
+
+    Returns:
+        str: The value as text
+    """
+    return '' if value is None else str(value)
+
+
+def update(model, user_id, fields):
+    """
+    Validate and apply a partial profile update.
+
+    Args:
+        model (FootballTeamModel): Model to write to
+        user_id (int): ID of the user
+        fields (dict): New values for some of the PROFILE_COLUMNS
+
+    Returns:
+        str or None: Error message, or None on success
+    """
+    unknown = [key for key in fields if key not in PROFILE_COLUMNS]
+    if unknown:
+        return f"Unknown profile fields: {', '.join(unknown)}"
+
+    original = model.get_user_data(user_id)
+    if not original:
+        return "User not found"
+
+    record = {key: field_text(value) for key, value in original.to_dict(PROFILE_COLUMNS).items()}
+    record.update({key: field_text(value) for key, value in fields.items()})
+    errors = PROFILE_SCHEMA.validate(record)
+    if errors:
+        return format_errors(errors, "; ")
+    if not model.update_user_profile(user_id, record, original):
+        return "Could not update profile"
+    return None
+
+
+def delete(model, user_id):
+    """
+    Delete one user.
+
+    Args:
+        model (FootballTeamModel): Model to write to
+        user_id (int): ID of the user
+
+    Returns:
+        str or None: Error message, or None on success
+    """
+    if not model.delete_user(user_id):
+        return "Could not delete account"
+    return None
+
+
+class BatchReport:
+    """
+    Outcome of a batch run: operations applied, failures and throughput.
+    """
+
+    def __init__(self):
+        self.succeeded = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    def add(self, line_number, error):
+        """
+        Record the outcome of one operation.
+
+        Args:
+            line_number (int): Line of the operation in the batch file
+            error (str or None): Error message, or None on success
+        """
+        if error:
+            self.errors.append((line_number, error))
+        else:
+            self.succeeded += 1
+
+    def summary(self):
+        """
+        Build a human-readable summary of the run.
+
+        Returns:
+            str: Summary, followed by one line per failed operation
+        """
+        total = self.succeeded + len(self.errors)
+        rate = total / self.elapsed if self.elapsed else 0.0
+        lines = [f"Applied {self.succeeded} of {total} operations in {self.elapsed:.2f}s ({rate:.1f} ops/s)"]
+        lines.extend(f"  line {line_number}: {message}" for line_number, message in sorted(self.errors))
+        return "\n".join(lines)
+
+
+def run_batch(model, lines, chunk_size=500, workers=None, team_id=DEFAULT_TEAM_ID):
+    """
+    Apply a batch of operations given as JSON Lines.
+
+    Each line is an object with an "op" of "register" (plus the registration
+    fields), "update" (with "id" and a "fields" object) or "delete" (with
+    "id"). Consecutive registrations are handed to the bulk importer so
+    their passwords are hashed in parallel and inserted in chunks; the order
+    of operations is otherwise preserved.
+
+    Args:
+        model (FootballTeamModel): Model to write to
+        lines (iterable): Lines of the batch file
+        chunk_size (int): Registrations per transaction
+        workers (int, optional): Password hashing processes
+        team_id (int): ID of the team registered users join
+
+    Returns:
+        BatchReport: Per-line failures and throughput
+    """
+    report = BatchReport()
+    start = time.perf_counter()
+    registrations = []
+
+    def flush_registrations():
+        if registrations:
+            result = BulkImporter(model, chunk_size, workers, team_id).run(registrations)
+            report.succeeded += result.inserted
+            report.errors.extend(result.errors)
+            registrations.clear()
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            operation = json.loads(line)
+            op = operation.get('op')
+            if op == 'register':
+                registrations.append((line_number, operation))
+                continue
+            flush_registrations()
+            if op == 'update':
+                report.add(line_number, update(model, int(operation['id']), operation.get('fields', {})))
+            elif op == 'delete':
+                report.add(line_number, delete(model, int(operation['id'])))
+            else:
+                report.add(line_number, f"Unknown operation: {op}")
+        except (ValueError, KeyError, TypeError, AttributeError) as err:
+            report.add(line_number, f"Invalid operation: {err}")
+        except StorageError as err:
+            report.add(line_number, f"Could not apply operation: {err}")
+    flush_registrations()
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def run_atomic_batch(model, lines, team_id=DEFAULT_TEAM_ID):
+    """
+    Apply a batch of operations as one unit of work.
+
+    Every operation is queued and the batch is committed in one transaction
+    with grouped statements, so either all operations are applied or none
+    are. If any line is invalid, nothing is written.
+
+    Args:
+        model (FootballTeamModel): Model to write to
+        lines (iterable): Lines of the batch file, as for run_batch
+        team_id (int): ID of the team registered users join
+
+    Returns:
+        BatchReport: Per-line failures and throughput
+    """
+    report = BatchReport()
+    start = time.perf_counter()
+    unit = UnitOfWork(model)
+    queued = []
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            operation = json.loads(line)
+            op = operation.get('op')
+            if op == 'register':
+                record = registration_record(operation)
+                unit.register(*(record[field] for field in REGISTRATION_FIELDS), team_id)
+            elif op == 'update':
+                user_id = int(operation['id'])
+                fields = operation.get('fields', {})
+                unknown = [key for key in fields if key not in PROFILE_COLUMNS]
+                if unknown:
+                    raise ValueError(f"Unknown profile fields: {', '.join(unknown)}")
+                original = model.get_user_data(user_id)
+                if not original:
+                    raise ValueError("User not found")
+                unit.update(user_id, {key: field_text(value) for key, value in fields.items()}, original)
+            elif op == 'delete':
+                unit.delete(int(operation['id']))
+            else:
+                raise ValueError(f"Unknown operation: {op}")
+            queued.append(line_number)
+        except (ValueError, KeyError, TypeError, AttributeError) as err:
+            report.add(line_number, f"Invalid operation: {err}")
+        except StorageError as err:
+            report.add(line_number, f"Could not apply operation: {err}")
+
+    if report.errors:
+        failure = "Not applied: the batch has invalid operations"
+    elif not unit.commit():
+        failure = "Not applied: the batch was rolled back"
+    else:
+        failure = None
+    for line_number in queued:
+        report.add(line_number, failure)
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def field_assignment(text):
+    """
+    Parse a FIELD=VALUE argument.
+
+    Args:
+        text (str): Argument as given
+
+    Returns:
+        tuple: (field, value)
+
+    Raises:
+        argparse.ArgumentTypeError: If the argument has no '=' or no field name
+    """
+    field, separator, value = text.partition('=')
+    if not separator or not field.strip():
+        raise argparse.ArgumentTypeError(f"expected FIELD=VALUE, got {text!r}")
+    return field.strip(), value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Football Team Manager without the GUI.")
+    parser.add_argument('--sqlite', metavar='FILE', help="Use an SQLite database instead of MySQL")
+    parser.add_argument('--team', type=int, default=DEFAULT_TEAM_ID,
+                        help="ID of the team to register into, list, import into, export, analyze "
+                             "or pick lineups from")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    register_parser = commands.add_parser('register', help="Register a user")
+    for field in REGISTRATION_FIELDS:
+        register_parser.add_argument(f"--{field.replace('_', '-')}", dest=field, required=True)
+
+    update_parser = commands.add_parser('update', help="Update fields of a user's profile")
+    update_parser.add_argument('id', type=int)
+    update_parser.add_argument('--set', metavar='FIELD=VALUE', type=field_assignment, action='append', default=[],
+                               dest='fields',
+                               help="Profile field to change; may be repeated")
+
+    delete_parser = commands.add_parser('delete', help="Delete a user")
+    delete_parser.add_argument('id', type=int)
+
+    list_parser = commands.add_parser('list', help="Print the roster")
+    list_parser.add_argument('--columns', help="Comma-separated roster columns")
+    list_parser.add_argument('--format', choices=('csv', 'jsonl'), default='csv')
+
+    import_parser = commands.add_parser('import', help="Bulk import users from CSV, JSON or JSON Lines")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--chunk-size', type=int, default=500)
+    import_parser.add_argument('--workers', type=int)
+
+    export_parser = commands.add_parser('export', help="Export the roster to a file")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--format', choices=EXPORT_FORMATS)
+    export_parser.add_argument('--columns', help="Comma-separated roster columns")
+
+    batch_parser = commands.add_parser('batch', help="Apply operations from a JSON Lines file ('-' for stdin)")
+    batch_parser.add_argument('path')
+    batch_parser.add_argument('--chunk-size', type=int, default=500)
+    batch_parser.add_argument('--workers', type=int)
+    batch_parser.add_argument('--atomic', action='store_true',
+                              help="Apply all operations in one transaction, or none if any fails")
+
+    stats_parser = commands.add_parser('stats', help="Print squad statistics")
+    stats_parser.add_argument('--format', choices=('text', 'json'), default='text')
+
+    lineup_parser = commands.add_parser('lineup', help="Suggest starting lineups")
+    lineup_parser.add_argument('--formation', action='append', choices=list(FORMATIONS), dest='formations',
+                               help="Formation to consider; may be repeated (default: all)")
+    lineup_parser.add_argument('--top', type=int, default=3, help="Number of lineups to print")
+    lineup_parser.add_argument('--format', choices=('text', 'json'), default='text')
+
+    teams_parser = commands.add_parser('teams', help="List teams, or create one")
+    teams_parser.add_argument('--add', metavar='NAME', help="Name of a team to create")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    model = FootballTeamModel(SQLiteBackend(args.sqlite) if args.sqlite else None)
+    columns = tuple(args.columns.split(',')) if getattr(args, 'columns', None) else TEAM_COLUMNS
+    error = None
+
+    try:
+        if args.command == 'register':
+            error = register(model, vars(args), args.team)
+        elif args.command == 'update':
+            error = update(model, args.id, dict(args.fields))
+        elif args.command == 'delete':
+            error = delete(model, args.id)
+        elif args.command == 'list':
+            writer = write_csv if args.format == 'csv' else write_jsonl
+            writer(model.iter_team_data(columns, team_id=args.team), columns, sys.stdout)
+        elif args.command == 'import':
+            report = BulkImporter(model, args.chunk_size, args.workers, args.team).run(iter_records(args.path))
+            print(report.summary())
+            error = "Some records were rejected" if report.errors else None
+        elif args.command == 'export':
+            count = export_roster(model, args.path, args.format, columns, args.team)
+            print(f"Exported {count} members to {args.path}")
+        elif args.command == 'batch':
+            def apply(lines):
+                if args.atomic:
+                    return run_atomic_batch(model, lines, args.team)
+                return run_batch(model, lines, args.chunk_size, args.workers, args.team)
+
+            if args.path == '-':
+                report = apply(sys.stdin)
+            else:
+                with open(args.path, encoding='utf-8') as file:
+                    report = apply(file)
+            print(report.summary())
+            error = "Some operations failed" if report.errors else None
+        elif args.command == 'stats':
+            report = squad_report(model, team_id=args.team)
+            print(json.dumps(report.to_dict(), indent=2) if args.format == 'json' else report.summary())
+        elif args.command == 'lineup':
+            lineups = suggest_lineups(model, args.formations, args.top, args.team)
+            if not lineups:
+                error = "The team has no players"
+            elif args.format == 'json':
+                print(json.dumps([lineup.to_dict() for lineup in lineups], indent=2))
+            else:
+                print("\n\n".join(lineup.summary() for lineup in lineups))
+        elif args.command == 'teams':
+            if args.add:
+                team_id = model.create_team(args.add)
+                if team_id is None:
+                    error = "Could not create team"
+                else:
+                    print(f"Created team {team_id}: {args.add}")
+            else:
+                for team_id, name in model.get_teams():
+                    print(f"{team_id}\t{name}")
+    finally:
+        model.close_connection()
+
+    if error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,200 +1,605 @@
-# controller.py
-
-from model import FootballTeamModel
-from view import FootballTeamView
-import tkinter as tk
-
-class FootballTeamController:
-    """
-    The Controller component of the Football Team Manager application.
-    Handles the communication between the Model and the View.
-    """
-
-    def __init__(self, root):
-        """
-        Initialize the controller.
-
-        Args:
-            root: The root window of the application
-        """
-        self.root = root
-        self.model = FootballTeamModel()
-        self.view = FootballTeamView(root)
-        self.bind_events()
-
-    def bind_events(self):
-        """
-        Bind events to the buttons in the main window.
-        """
-        # Ensure that you get the buttons correctly
-        register_button, login_button, view_team_button, exit_button = self.view.create_main_window()
-
-        
-        # Debugging prints
-        print("Buttons created")
-        print(f"Register button: {register_button}")
-        print(f"Login button: {login_button}")
-        print(f"View Team button: {view_team_button}")
-        print(f"Exit button: {exit_button}")
-
-        register_button.config(command=self.open_registration_window)
-        login_button.config(command=self.open_login_window)
-        view_team_button.config(command=self.view_team)
-        exit_button.config(command=self.exit_program)
-        
-    def open_registration_window(self):
-        """
-        Open the registration window and bind its events.
-        """
-        registration_window, entries, register_button = self.view.create_registration_window()
-        register_button.config(command=lambda: self.register_user(entries, registration_window))
-
-    def register_user(self, entries, registration_window):
-        """
-        Handle user registration.
-
-        Args:
-            entries (dict): Dictionary containing user input data
-            registration_window (tk.Toplevel): The registration window
-        """
-        username = entries['username'].get()
-        password = entries['password'].get()
-        first_name = entries['first_name'].get()
-        last_name = entries['last_name'].get()
-        dob = entries['date_of_birth'].get()
-        position = entries['position'].get()
-
-        # Check for empty fields
-        if not all([username, password, first_name, last_name, dob, position]):
-            self.view.show_error("Error", "All fields are required")
-            return
-
-        # Check that first and last names do not contain digits
-        if any(char.isdigit() for char in first_name) or any(char.isdigit() for char in last_name):
-            self.view.show_error("Error", "First name and last name should not contain numbers")
-            return
-
-        # Register user
-        if self.model.register_user(username, password, first_name, last_name, dob, position):
-            self.view.show_message("Success", "User registered successfully")
-            registration_window.destroy()
-        else:
-            self.view.show_error("Error", "Could not register user")
-
-    def open_login_window(self):
-        """
-        Open the login window and bind its events.
-        """
-        login_window, username_entry, password_entry, login_button = self.view.create_login_window()
-        login_button.config(command=lambda: self.login_user(username_entry.get(), password_entry.get(), login_window))
-
-    def login_user(self, username, password, login_window):
-        """
-        Handle user login.
-
-        Args:
-            username (str): User's username
-            password (str): User's password
-            login_window (tk.Toplevel): The login window
-        """
-        user_id = self.model.verify_user(username, password)
-        if user_id:
-            self.view.show_message("Success", "Login successful")
-            self.open_profile_window(user_id)
-            login_window.destroy()
-        else:
-            self.view.show_error("Error", "Invalid username or password")
-
-    def open_profile_window(self, user_id):
-        """
-        Open the user profile window and bind its events.
-
-        Args:
-            user_id (int): ID of the logged-in user
-        """
-        user_data = self.model.get_user_data(user_id)
-        if not user_data:
-            self.view.show_error("Error", "User not found")
-            return
-
-        profile_window, entries, save_button, delete_button = self.view.create_profile_window(user_data)
-        
-
-
-
-        save_button.config(command=lambda: self.save_profile_changes(user_id, entries, profile_window))
-        delete_button.config(command=lambda: self.delete_account(user_id, profile_window))
-
-    def save_profile_changes(self, user_id, entries, profile_window):
-        """
-        Handle saving of profile changes.
-
-        Args:
-            user_id (int): ID of the user
-            entries (dict): Dictionary containing updated user data
-            profile_window (tk.Toplevel): The profile window
-        """
-        update_data = []
-        for key, entry in entries.items():
-            value = entry.get()
-            if key == 'email':
-                if value and '@' not in value:
-                    self.view.show_error("Error", "Email must contain @")
-                    return
-            elif key == 'jersey_number':
-                if value and (not value.isdigit() or not (1 <= int(value) <= 99)):
-                    self.view.show_error("Error", "Jersey number must be a number between 1 and 99")
-                    return
-            elif key in ['height']:
-                if not value.isdigit() and value:
-                    self.view.show_error("Error", f"{key.replace('_', ' ').title()} must be a number")
-                    return
-            elif key in ['primary_position', 'secondary_position']:
-                if value and value not in ['ST', 'CF', 'RW', 'LW', 'CAM', 'CM', 'CDM', 'RM', 'LM', 'CB', 'RB', 'LB', 'GK']:
-                    self.view.show_error("Error", f"{key.replace('_', ' ').title()} must be one of the specified positions")
-                    return
-            elif key == 'preferred_foot':
-                if value and value not in ['Right', 'Left']:
-                    self.view.show_error("Error", "Preferred Foot must be either 'Right' or 'Left'")
-                    return
-            update_data.append(value)
-
-        if self.model.update_user_profile(user_id, update_data):
-            self.view.show_message("Success", "Profile updated successfully")
-            profile_window.destroy()
-        else:
-            self.view.show_error("Error", "Could not update profile")
-
-    def delete_account(self, user_id, profile_window):
-        """
-        Handle account deletion.
-
-        Args:
-            user_id (int): ID of the user to delete
-            profile_window (tk.Toplevel): The profile window
-        """
-        if self.view.ask_yes_no("Confirm Deletion", "Are you sure you want to delete this account?"):
-            if self.model.delete_user(user_id):
-                self.view.show_message("Success", "Account deleted successfully")
-                profile_window.destroy()
-            else:
-                self.view.show_error("Error", "Could not delete account")
-
-    def view_team(self):
-        """
-        Handle team view display.
-        """
-        team_data = self.model.get_team_data()
-        self.view.create_team_view_window(team_data)
-
-    def exit_program(self):
-        """
-        Handle program exit.
-        """
-        self.model.close_connection()
-        self.view.master.quit()
-
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = FootballTeamController(root)
+# controller.py
+
+import startup
+
+import logging
+from itertools import islice
+
+import metrics
+from analytics import squad_report
+from auth import SessionManager
+from exporter import export_roster
+from lineup import suggest_lineups
+from migrations import DEFAULT_TEAM_ID
+from model import PROFILE_COLUMNS, FootballTeamModel
+from search import RosterIndex
+from snapshot import RosterSnapshot
+from storage import StorageError
+from tasks import TaskRunner
+from validation import PROFILE_SCHEMA, REGISTRATION_FIELDS, REGISTRATION_SCHEMA, format_errors
+from view import FootballTeamView
+import tkinter as tk
+
+startup.mark("imports")
+
+logger = logging.getLogger("football_team.controller")
+
+# Number of roster rows fetched and shown per page in the team view
+TEAM_PAGE_SIZE = 200
+
+# Milliseconds between background refreshes of the local roster snapshot
+SNAPSHOT_REFRESH_MS = 30000
+
+
+class FootballTeamController:
+    """
+    The Controller component of the Football Team Manager application.
+    Handles the communication between the Model and the View.
+    """
+
+    def __init__(self, root):
+        """
+        Initialize the controller.
+
+        Args:
+            root: The root window of the application
+        """
+        self.root = root
+        self.metrics_path = metrics.configure_from_environment()
+        self.model = FootballTeamModel(snapshot=self.open_snapshot())
+        # Reload callbacks of the open team views, run when the snapshot is copied anew
+        self.team_views = set()
+        self.view = FootballTeamView(root)
+        self.tasks = TaskRunner(root)
+        self.sessions = SessionManager()
+        startup.mark("model and view")
+        self.bind_events()
+        startup.mark("main window built")
+
+        # Connect once the main window is on screen
+        self.root.after_idle(self.connect_database)
+
+    def connect_database(self):
+        """
+        Open the database connection in the background after startup.
+        """
+        startup.mark("main window shown")
+
+        def on_connected(_):
+            startup.mark("database connected")
+            startup.log_report()
+
+        def on_error(err):
+            startup.log_report()
+            message = f"Could not connect to database: {err}"
+            if self.model.snapshot is not None and self.model.snapshot.ready:
+                message += "\nThe team view shows the roster saved on this computer."
+            self.view.show_error("Error", message)
+
+        def on_done():
+            if self.model.snapshot is not None:
+                self.refresh_snapshot()
+
+        self.tasks.submit(self.model.backend.connect, on_success=on_connected, on_error=on_error, on_done=on_done)
+
+    def open_snapshot(self):
+        """
+        Open the local roster snapshot.
+
+        Returns:
+            RosterSnapshot or None: The snapshot, or None if its file cannot be opened
+        """
+        try:
+            return RosterSnapshot.from_environment()
+        except StorageError as err:
+            logger.warning("Could not open the roster snapshot: %s", err)
+            return None
+
+    def refresh_snapshot(self):
+        """
+        Refresh the local roster snapshot in the background, and again every
+        SNAPSHOT_REFRESH_MS.
+
+        Changes found by a refresh reach open team views as change events.
+        If the snapshot had to be copied anew, the views reload instead.
+        """
+        def on_success(events):
+            if events is None:
+                for reload in list(self.team_views):
+                    reload()
+
+        def on_done():
+            self.root.after(SNAPSHOT_REFRESH_MS, self.refresh_snapshot)
+
+        self.tasks.submit(self.model.refresh_snapshot, on_success=on_success,
+                          on_error=lambda err: logger.info("Could not refresh the roster snapshot: %s", err),
+                          on_done=on_done)
+
+    def bind_events(self):
+        """
+        Bind events to the buttons in the main window.
+        """
+        # Ensure that you get the buttons correctly
+        register_button, login_button, view_team_button, exit_button = self.view.create_main_window()
+
+        
+        # Debugging prints
+        print("Buttons created")
+        print(f"Register button: {register_button}")
+        print(f"Login button: {login_button}")
+        print(f"View Team button: {view_team_button}")
+        print(f"Exit button: {exit_button}")
+
+        register_button.config(command=self.open_registration_window)
+        login_button.config(command=self.open_login_window)
+        view_team_button.config(command=self.view_team)
+        exit_button.config(command=self.exit_program)
+
+    def run_in_background(self, window, func, *args, on_success=None, button=None):
+        """
+        Run a blocking model call on the worker pool.
+
+        The window shows a busy indicator until the call finishes. Closing
+        the window cancels the call, and its result is then ignored.
+
+        Args:
+            window (tk.Misc): Window that shows the busy indicator
+            func (callable): Model method to call
+            *args: Arguments passed to func
+            on_success (callable, optional): Called on the main loop with the result
+            button (tk.Button, optional): Button to disable while the call runs
+
+        Returns:
+            Task: Handle of the background call
+        """
+        self.view.set_busy(window, True, button)
+        task = self.tasks.submit(
+            func, *args,
+            on_success=on_success,
+            on_error=lambda err: self.view.show_error("Error", f"Unexpected error: {err}"),
+            on_done=lambda: self.view.set_busy(window, False, button)
+        )
+        if window is not self.root:
+            window.bind('<Destroy>', lambda event: task.cancel() if event.widget is window else None, add='+')
+        return task
+
+    def open_registration_window(self):
+        """
+        Load the teams, then open the registration window and bind its events.
+        """
+        def on_teams(teams):
+            registration_window, entries, register_button = self.view.create_registration_window(teams)
+            register_button.config(command=lambda: self.register_user(entries, registration_window, teams,
+                                                                      register_button))
+
+        self.run_in_background(self.root, self.model.get_teams, on_success=on_teams)
+
+    def register_user(self, entries, registration_window, teams, register_button=None):
+        """
+        Handle user registration.
+
+        Args:
+            entries (dict): Dictionary containing user input data
+            registration_window (tk.Toplevel): The registration window
+            teams (list): (team ID, name) tuples offered by the form
+            register_button (tk.Button, optional): Button disabled while registering
+        """
+        record = {field: entries[field].get() for field in REGISTRATION_FIELDS}
+
+        errors = REGISTRATION_SCHEMA.validate(record)
+        if errors:
+            self.view.show_error("Error", format_errors(errors))
+            return
+
+        team_ids = {name: team_id for team_id, name in teams}
+        team_id = team_ids.get(entries['team'].get())
+        if team_id is None:
+            self.view.show_error("Error", "Please choose a team")
+            return
+
+        # Register user
+        def on_registered(success):
+            if success:
+                self.view.show_message("Success", "User registered successfully")
+                registration_window.destroy()
+            else:
+                self.view.show_error("Error", "Could not register user")
+
+        self.run_in_background(registration_window, self.model.register_user,
+                               *(record[field] for field in REGISTRATION_FIELDS), team_id,
+                               on_success=on_registered, button=register_button)
+
+    def open_login_window(self):
+        """
+        Open the login window and bind its events.
+        """
+        login_window, username_entry, password_entry, login_button = self.view.create_login_window()
+        login_button.config(command=lambda: self.login_user(username_entry.get(), password_entry.get(), login_window, login_button))
+
+    def login_user(self, username, password, login_window, login_button=None):
+        """
+        Handle user login.
+
+        Args:
+            username (str): User's username
+            password (str): User's password
+            login_window (tk.Toplevel): The login window
+            login_button (tk.Button, optional): Button disabled while verifying
+        """
+        def on_verified(user_id):
+            if user_id:
+                self.view.show_message("Success", "Login successful")
+                self.open_profile_window(self.sessions.create(user_id))
+                login_window.destroy()
+            else:
+                self.view.show_error("Error", "Invalid username or password")
+
+        self.run_in_background(login_window, self.model.verify_user, username, password,
+                               on_success=on_verified, button=login_button)
+
+    def session_user(self, token, window=None):
+        """
+        Resolve a session token, ending the session's window if it expired.
+
+        Args:
+            token (str): Session token issued at login
+            window (tk.Toplevel, optional): Window to close if the session expired
+
+        Returns:
+            int or None: ID of the logged-in user, or None if the session expired
+        """
+        user_id = self.sessions.validate(token)
+        if user_id is None:
+            self.view.show_error("Error", "Your session has expired, please log in again")
+            if window is not None:
+                window.destroy()
+        return user_id
+
+    def open_profile_window(self, token):
+        """
+        Open the user profile window and bind its events.
+
+        Args:
+            token (str): Session token of the logged-in user
+        """
+        user_id = self.session_user(token)
+        if user_id is None:
+            return
+
+        def on_loaded(user_data):
+            if not user_data:
+                self.view.show_error("Error", "User not found")
+                return
+
+            profile_window, entries, save_button, delete_button = self.view.create_profile_window(user_data)
+
+            save_button.config(command=lambda: self.save_profile_changes(token, entries, profile_window, save_button, user_data))
+            delete_button.config(command=lambda: self.delete_account(token, profile_window, delete_button))
+            # Closing the profile window logs the user out
+            profile_window.bind('<Destroy>', lambda event: self.sessions.revoke(token)
+                                if event.widget is profile_window else None, add='+')
+
+        self.run_in_background(self.root, self.model.get_user_data, user_id, on_success=on_loaded)
+
+    def save_profile_changes(self, token, entries, profile_window, save_button=None, original=None):
+        """
+        Handle saving of profile changes.
+
+        Args:
+            token (str): Session token of the logged-in user
+            entries (dict): Dictionary containing updated user data
+            profile_window (tk.Toplevel): The profile window
+            save_button (tk.Button, optional): Button disabled while saving
+            original (Member, optional): Profile as loaded when the window opened;
+                only fields that differ from it are saved
+        """
+        record = {key: entries[key].get() for key in PROFILE_COLUMNS}
+
+        errors = PROFILE_SCHEMA.validate(record)
+        if errors:
+            self.view.show_error("Error", format_errors(errors))
+            return
+
+        user_id = self.session_user(token, profile_window)
+        if user_id is None:
+            return
+
+        def on_saved(success):
+            if success:
+                self.view.show_message("Success", "Profile updated successfully")
+                profile_window.destroy()
+            else:
+                self.view.show_error("Error", "Could not update profile")
+
+        self.run_in_background(profile_window, self.model.update_user_profile, user_id, record, original,
+                               on_success=on_saved, button=save_button)
+
+    def delete_account(self, token, profile_window, delete_button=None):
+        """
+        Handle account deletion.
+
+        Args:
+            token (str): Session token of the user to delete
+            profile_window (tk.Toplevel): The profile window
+            delete_button (tk.Button, optional): Button disabled while deleting
+        """
+        user_id = self.session_user(token, profile_window)
+        if user_id is None:
+            return
+
+        def on_deleted(success):
+            if success:
+                self.sessions.revoke_user(user_id)
+                self.view.show_message("Success", "Account deleted successfully")
+                profile_window.destroy()
+            else:
+                self.view.show_error("Error", "Could not delete account")
+
+        if self.view.ask_yes_no("Confirm Deletion", "Are you sure you want to delete this account?"):
+            self.run_in_background(profile_window, self.model.delete_user, user_id,
+                                   on_success=on_deleted, button=delete_button)
+
+    def team_rows(self, team_id, local=False):
+        """
+        Iterate over a team's roster, one cached batch at a time.
+
+        Args:
+            team_id (int): ID of the team
+            local (bool): Whether to read the local snapshot instead of the database
+
+        Returns:
+            iterator: (user ID, row) pairs in roster order
+        """
+        return (item for batch in self.model.iter_team_batches(batch_size=TEAM_PAGE_SIZE, team_id=team_id,
+                                                               local=local)
+                for item in batch.items())
+
+    def view_team(self, team_id=DEFAULT_TEAM_ID):
+        """
+        Handle team view display.
+
+        The window subscribes to the model's change events, so registrations,
+        profile saves and deletions in the shown team show up in it without
+        reopening it. The team selector switches the window to another team.
+
+        When the local snapshot holds a roster, the window is built from it
+        at once and a snapshot refresh reconciles it with the database in
+        the background; otherwise the first page is fetched from the database.
+
+        Args:
+            team_id (int): ID of the team shown first
+        """
+        snapshot = self.model.snapshot
+        if snapshot is not None and snapshot.ready:
+            rows = self.team_rows(team_id, local=True)
+            self.open_team_window(self.model.get_teams(local=True), list(islice(rows, TEAM_PAGE_SIZE)), rows,
+                                  team_id, local=True)
+            self.tasks.submit(self.model.refresh_snapshot,
+                              on_error=lambda err: logger.info("Could not refresh the roster snapshot: %s", err))
+            return
+
+        rows = self.team_rows(team_id)
+
+        # The first page is fetched off the main loop, and so are later
+        # pages, which the view asks for as the user scrolls
+        def load_first_page():
+            return self.model.get_teams(), list(islice(rows, TEAM_PAGE_SIZE))
+
+        def on_first_page(result):
+            teams, first_page = result
+            self.open_team_window(teams, first_page, rows, team_id)
+
+        self.run_in_background(self.root, load_first_page, on_success=on_first_page)
+
+    def open_team_window(self, teams, first_page, rows, team_id, local=False):
+        """
+        Build the team view window and bind its events.
+
+        Args:
+            teams (list): (team ID, name) tuples offered by the team selector
+            first_page (list): First (user ID, row) pairs of the roster
+            rows (iterator): The remaining (user ID, row) pairs
+            team_id (int): ID of the shown team
+            local (bool): Whether rows are read from the local snapshot
+        """
+        team_window, export_button, stats_button, lineup_button, team_selector, search_bar, roster = \
+            self.view.create_team_view_window(first_page, page_size=TEAM_PAGE_SIZE, teams=teams, team_id=team_id,
+                                              fetch_page=self.page_fetcher(rows, team_id, local, len(first_page)))
+        # Team shown in the window, where its rows are read, the pending team
+        # switch, and the search index with the build that fills it, if any
+        state = {'team_id': team_id, 'local': local, 'switch': None, 'search': search_bar,
+                 'index': None, 'indexing': None, 'pending': []}
+
+        export_button.config(command=lambda: self.export_team(team_window, export_button, state['team_id']))
+        stats_button.config(command=lambda: self.show_statistics(team_window, stats_button, state['team_id']))
+        lineup_button.config(command=lambda: self.show_lineups(team_window, lineup_button, state['team_id']))
+        team_selector.bind('<<ComboboxSelected>>', lambda event: self.switch_team(
+            team_window, roster, state, teams[team_selector.current()][0]))
+        search_bar.on_change(lambda: self.search_team(team_window, roster, state))
+
+        # Checked on the main loop, so events queued before a switch are
+        # not applied to the next team
+        def apply_event(event):
+            if event.team_id is None or event.team_id == state['team_id']:
+                roster.apply_event(event)
+                if state['index'] is not None:
+                    state['index'].apply_event(event)
+                    if roster.matches is not None:
+                        self.search_team(team_window, roster, state)
+                elif state['indexing'] is not None:
+                    state['pending'].append(event)
+
+        def reload():
+            self.switch_team(team_window, roster, state, state['team_id'])
+
+        unsubscribe = self.model.events.subscribe(lambda event: self.tasks.call_soon(apply_event, event))
+        self.team_views.add(reload)
+
+        def on_destroy(event):
+            if event.widget is team_window:
+                unsubscribe()
+                self.team_views.discard(reload)
+
+        team_window.bind('<Destroy>', on_destroy, add='+')
+
+    def switch_team(self, team_window, roster, state, team_id):
+        """
+        Handle choosing another team in the team view.
+
+        Args:
+            team_window (tk.Toplevel): The team view window
+            roster (RosterTable): Table showing the team
+            state (dict): Shown team ID, row source and pending switch of the window
+            team_id (int): ID of the chosen team
+        """
+        if state['switch'] is not None:
+            state['switch'].cancel()
+        if state['indexing'] is not None:
+            state['indexing'].cancel()
+        state.update(index=None, indexing=None, pending=[])
+        state['search'].clear()
+        rows = self.team_rows(team_id, state['local'])
+
+        def on_first_page(first_page):
+            state['team_id'] = team_id
+            state['switch'] = None
+            roster.reset(first_page, self.page_fetcher(rows, team_id, state['local'], len(first_page)))
+
+        state['switch'] = self.run_in_background(team_window, lambda: list(islice(rows, TEAM_PAGE_SIZE)),
+                                                 on_success=on_first_page)
+
+    def page_fetcher(self, rows, team_id, local, read):
+        """
+        Build the callback a team view's RosterTable calls to fetch its next page.
+
+        Pages are read on the worker pool. After a failed read the roster is
+        read again from the start, skipping the rows already shown, so the
+        next request retries the same page.
+
+        Args:
+            rows (iterator): The (user ID, row) pairs following the shown ones
+            team_id (int): ID of the shown team
+            local (bool): Whether rows are read from the local snapshot
+            read (int): Number of rows already shown
+
+        Returns:
+            callable: fetch_page(on_page, on_error), returning the Task
+        """
+        # Only touched by the one page read running at a time
+        source = {'rows': rows, 'read': read}
+
+        def next_page():
+            if source['rows'] is None:
+                source['rows'] = islice(self.team_rows(team_id, local), source['read'], None)
+            try:
+                page = list(islice(source['rows'], TEAM_PAGE_SIZE))
+            except Exception:
+                source['rows'] = None
+                raise
+            source['read'] += len(page)
+            return page
+
+        def fetch_page(on_page, on_error):
+            def failed(err):
+                logger.warning("Could not load the next roster page: %s", err)
+                on_error(err)
+            return self.tasks.submit(next_page, on_success=on_page, on_error=failed)
+
+        return fetch_page
+
+    def search_team(self, team_window, roster, state):
+        """
+        Filter the team view to the members matching its search bar.
+
+        The team's search index is built in the background on first use,
+        from the same source as the shown rows; later searches are answered
+        from it on the main loop.
+
+        Args:
+            team_window (tk.Toplevel): The team view window
+            roster (RosterTable): Table showing the team
+            state (dict): Shown team ID, row source, search bar and search index of the window
+        """
+        search_bar = state['search']
+        if not search_bar.active():
+            roster.filter(None)
+            return
+        if state['index'] is not None:
+            text, filters = search_bar.query()
+            roster.filter(state['index'].search(text, **filters), state['index'].rows)
+            return
+        if state['indexing'] is not None and not state['indexing'].done():
+            return
+
+        team_id = state['team_id']
+        state['pending'] = []
+
+        def on_indexed(index):
+            # Changes published while the roster was read; applying them again is harmless
+            for event in state['pending']:
+                index.apply_event(event)
+            state.update(index=index, indexing=None, pending=[])
+            self.search_team(team_window, roster, state)
+
+        state['indexing'] = self.run_in_background(
+            team_window, lambda: RosterIndex.from_items(self.team_rows(team_id, state['local'])),
+            on_success=on_indexed)
+
+    def export_team(self, team_window, export_button=None, team_id=DEFAULT_TEAM_ID):
+        """
+        Handle exporting the roster to a file.
+
+        Args:
+            team_window (tk.Toplevel): The team view window
+            export_button (tk.Button, optional): Button disabled while exporting
+            team_id (int): ID of the team to export
+        """
+        path = self.view.ask_export_path()
+        if not path:
+            return
+
+        self.run_in_background(team_window, lambda: export_roster(self.model, path, team_id=team_id),
+                               on_success=lambda count: self.view.show_message(
+                                   "Success", f"Exported {count} members to {path}"),
+                               button=export_button)
+
+    def show_statistics(self, team_window, stats_button=None, team_id=DEFAULT_TEAM_ID):
+        """
+        Handle showing squad statistics.
+
+        Args:
+            team_window (tk.Toplevel): The team view window
+            stats_button (tk.Button, optional): Button disabled while computing
+            team_id (int): ID of the team to analyze
+        """
+        self.run_in_background(team_window, lambda: squad_report(self.model, team_id=team_id),
+                               on_success=self.view.create_statistics_window, button=stats_button)
+
+    def show_lineups(self, team_window, lineup_button=None, team_id=DEFAULT_TEAM_ID):
+        """
+        Handle suggesting starting lineups.
+
+        Args:
+            team_window (tk.Toplevel): The team view window
+            lineup_button (tk.Button, optional): Button disabled while computing
+            team_id (int): ID of the team to pick from
+        """
+        self.run_in_background(team_window, lambda: suggest_lineups(self.model, team_id=team_id),
+                               on_success=self.view.create_lineup_window, button=lineup_button)
+
+    def exit_program(self):
+        """
+        Handle program exit.
+        """
+        self.tasks.shutdown()
+        self.model.close_connection()
+        if self.metrics_path:
+            metrics.registry.write(self.metrics_path)
+        self.view.master.quit()
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    root = tk.Tk()
+    startup.mark("Tk root window")
+    app = FootballTeamController(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,85 @@
+# events.py
+
+import logging
+import threading
+
+
+logger = logging.getLogger("football_team.events")
+
+INSERT = 'insert'
+UPDATE = 'update'
+DELETE = 'delete'
+
+
+class ChangeEvent:
+    """
+    A committed change to one user.
+
+    Attributes:
+        kind (str): INSERT, UPDATE or DELETE
+        user_id (int): ID of the changed user
+        values (dict): Column values after the change: the inserted columns
+            for an insert, the whole profile for an update when the model
+            knows it (otherwise the written columns), empty for a delete
+        team_id (int or None): Team of the user, or None if the model does not know it
+    """
+
+    __slots__ = ('kind', 'user_id', 'values', 'team_id')
+
+    def __init__(self, kind, user_id, values=None, team_id=None):
+        self.kind = kind
+        self.user_id = user_id
+        self.values = values or {}
+        self.team_id = team_id
+
+    def __repr__(self):
+        return f"ChangeEvent({self.kind!r}, {self.user_id!r}, {self.values!r}, team_id={self.team_id!r})"
+
+
+class EventBus:
+    """
+    Delivers change events to subscribers.
+
+    Handlers run synchronously on the publishing thread, which is usually a
+    worker thread; handlers that touch Tk must hand the event over to the
+    main loop themselves. A failing handler is logged and does not stop
+    delivery to the others.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, handler):
+        """
+        Register a handler.
+
+        Args:
+            handler (callable): Called with each published ChangeEvent
+
+        Returns:
+            callable: Function that removes the handler again
+        """
+        with self.lock:
+            self.subscribers.append(handler)
+
+        def unsubscribe():
+            with self.lock:
+                if handler in self.subscribers:
+                    self.subscribers.remove(handler)
+        return unsubscribe
+
+    def publish(self, event):
+        """
+        Deliver an event to every handler.
+
+        Args:
+            event (ChangeEvent): Event to deliver
+        """
+        with self.lock:
+            handlers = list(self.subscribers)
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception:
+                logger.exception("Change event handler failed for %r", event)
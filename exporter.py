@@ -0,0 +1,237 @@
+# exporter.py
+
+import argparse
+import csv
+import json
+import struct
+import zlib
+from itertools import islice
+
+from migrations import DEFAULT_TEAM_ID
+from records import TEAM_COLUMNS, Roster
+
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'columnar')
+
+# Extension used for each export format
+FORMAT_EXTENSIONS = {'csv': '.csv', 'jsonl': '.jsonl', 'columnar': '.ftmc'}
+
+COLUMNAR_MAGIC = b"FTMC1\n"
+
+
+def format_for_path(path):
+    """
+    Guess the export format from a file name.
+
+    Args:
+        path (str): Output file path
+
+    Returns:
+        str: One of EXPORT_FORMATS
+    """
+    for fmt, extension in FORMAT_EXTENSIONS.items():
+        if path.endswith(extension):
+            return fmt
+    raise ValueError(f"Cannot tell export format from file name: {path}")
+
+
+def write_csv(rows, columns, file):
+    """
+    Write rows as CSV with a header line.
+
+    Args:
+        rows (iterable): Roster tuples
+        columns (tuple): Column names
+        file: Text file opened with newline=''
+
+    Returns:
+        int: Number of rows written
+    """
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows, columns, file):
+    """
+    Write rows as JSON Lines, one object per member.
+
+    Args:
+        rows (iterable): Roster tuples
+        columns (tuple): Column names
+        file: Text file
+
+    Returns:
+        int: Number of rows written
+    """
+    count = 0
+    for row in rows:
+        file.write(json.dumps(dict(zip(columns, row)), default=str))
+        file.write("\n")
+        count += 1
+    return count
+
+
+def write_columnar(rows, columns, file, group_size=10000):
+    """
+    Write rows in the compact columnar format.
+
+    The file starts with COLUMNAR_MAGIC and a JSON header line listing the
+    columns. It is followed by row groups, each stored as a 4-byte length
+    and a zlib-compressed JSON list holding one value array per column.
+    Only one row group is held in memory at a time. A Roster is written
+    straight from its columns without building row tuples.
+
+    Args:
+        rows (iterable): Roster tuples, or a Roster
+        columns (tuple): Column names
+        file: Binary file
+        group_size (int): Rows per row group
+
+    Returns:
+        int: Number of rows written
+    """
+    file.write(COLUMNAR_MAGIC)
+    file.write(json.dumps({"columns": list(columns)}).encode('utf-8') + b"\n")
+
+    if isinstance(rows, Roster):
+        positions = [rows.positions[column] for column in columns]
+        for start in range(0, len(rows), group_size):
+            _write_row_group(file, [rows.data[i][start:start + group_size] for i in positions])
+        return len(rows)
+
+    rows = iter(rows)
+    count = 0
+    while True:
+        group = list(islice(rows, group_size))
+        if not group:
+            return count
+        _write_row_group(file, [list(values) for values in zip(*group)])
+        count += len(group)
+
+
+def _write_row_group(file, values):
+    data = zlib.compress(json.dumps(values, default=str).encode('utf-8'))
+    file.write(struct.pack('>I', len(data)))
+    file.write(data)
+
+
+def read_columnar(path):
+    """
+    Read a file written by write_columnar.
+
+    Args:
+        path (str): Path of a .ftmc file
+
+    Returns:
+        tuple: Column names, and an iterator over the roster tuples that
+            decompresses one row group at a time
+    """
+    with open(path, 'rb') as file:
+        if file.readline() != COLUMNAR_MAGIC:
+            raise ValueError(f"Not a columnar roster export: {path}")
+        columns = tuple(json.loads(file.readline())["columns"])
+        offset = file.tell()
+    return columns, _iter_row_groups(path, offset)
+
+
+def read_columnar_roster(path):
+    """
+    Load a file written by write_columnar into a Roster.
+
+    Row groups are appended column by column, without building row tuples.
+
+    Args:
+        path (str): Path of a .ftmc file
+
+    Returns:
+        Roster: Members in file order, without IDs
+    """
+    columns, _ = read_columnar(path)
+    roster = Roster(columns)
+    with open(path, 'rb') as file:
+        file.readline()
+        file.readline()
+        for group in _iter_column_groups(file):
+            roster.extend_columns(group)
+    return roster
+
+
+def _iter_row_groups(path, offset):
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        for group in _iter_column_groups(file):
+            yield from zip(*group)
+
+
+def _iter_column_groups(file):
+    while True:
+        header = file.read(4)
+        if not header:
+            return
+        (length,) = struct.unpack('>I', header)
+        yield json.loads(zlib.decompress(file.read(length)))
+
+
+def export_roster(model, path, fmt=None, columns=TEAM_COLUMNS, team_id=DEFAULT_TEAM_ID):
+    """
+    Export the roster to a file without loading it into memory.
+
+    Rows are streamed from the model's server-side cursor straight into
+    the writer for the chosen format.
+
+    Args:
+        model (FootballTeamModel): Model to read the roster from
+        path (str): Output file path
+        fmt (str, optional): One of EXPORT_FORMATS; guessed from path if omitted
+        columns (tuple): Columns to export, a subset of TEAM_COLUMNS
+        team_id (int): ID of the team to export
+
+    Returns:
+        int: Number of members exported
+    """
+    fmt = fmt or format_for_path(path)
+    columns = tuple(columns)
+    rows = model.stream_team_data(columns, team_id=team_id)
+    try:
+        if fmt == 'csv':
+            with open(path, 'w', newline='', encoding='utf-8') as file:
+                return write_csv(rows, columns, file)
+        if fmt == 'jsonl':
+            with open(path, 'w', encoding='utf-8') as file:
+                return write_jsonl(rows, columns, file)
+        if fmt == 'columnar':
+            with open(path, 'wb') as file:
+                return write_columnar(rows, columns, file)
+        raise ValueError(f"Unknown export format: {fmt}")
+    finally:
+        rows.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the team roster.")
+    parser.add_argument('path', help="Output file (.csv, .jsonl or .ftmc)")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help="Output format; guessed from the file name by default")
+    parser.add_argument('--columns', help="Comma-separated columns to export (default: all roster columns)")
+    parser.add_argument('--sqlite', metavar='FILE', help="Export from an SQLite database instead of MySQL")
+    parser.add_argument('--team', type=int, default=DEFAULT_TEAM_ID, help="ID of the team to export")
+    args = parser.parse_args()
+
+    from model import FootballTeamModel
+    from storage import SQLiteBackend
+
+    columns = tuple(args.columns.split(',')) if args.columns else TEAM_COLUMNS
+    model = FootballTeamModel(SQLiteBackend(args.sqlite) if args.sqlite else None)
+    try:
+        count = export_roster(model, args.path, args.format, columns, args.team)
+    finally:
+        model.close_connection()
+    print(f"Exported {count} members to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# id_allocator.py
+
+
+class IdAllocator:
+    """
+    Hands out user IDs in constant time.
+
+    IDs released by deleted users are kept in the id_free_list table and are
+    reused lowest first. When the free list is empty, the next ID comes from
+    a high-water mark stored in id_sequence. Both tables are read and written
+    with the caller's cursor, so an ID is only reserved if the surrounding
+    insert transaction commits.
+    """
+
+    def __init__(self, sequence_name="users", lock_clause=""):
+        """
+        Initialize the allocator.
+
+        Args:
+            sequence_name (str): Row of id_sequence holding the high-water mark
+            lock_clause (str): Row-locking suffix for SELECTs, e.g. " FOR UPDATE"
+        """
+        self.sequence_name = sequence_name
+        self.lock_clause = lock_clause
+
+    def allocate(self, cursor):
+        """
+        Reserve one ID inside the current transaction.
+
+        Args:
+            cursor: Cursor of an open transaction
+
+        Returns:
+            int: The reserved ID
+        """
+        cursor.execute("SELECT id FROM id_free_list ORDER BY id LIMIT 1" + self.lock_clause)
+        row = cursor.fetchone()
+        if row:
+            cursor.execute("DELETE FROM id_free_list WHERE id = %s", (row[0],))
+            return row[0]
+        return self._advance(cursor, 1)
+
+    def allocate_many(self, cursor, count):
+        """
+        Reserve several IDs inside the current transaction.
+
+        Free-list IDs are used first; the rest come from a single move of
+        the high-water mark.
+
+        Args:
+            cursor: Cursor of an open transaction
+            count (int): Number of IDs to reserve
+
+        Returns:
+            list: The reserved IDs
+        """
+        if count <= 0:
+            return []
+        cursor.execute("SELECT id FROM id_free_list ORDER BY id LIMIT %s" + self.lock_clause, (count,))
+        ids = [row[0] for row in cursor.fetchall()]
+        if ids:
+            cursor.executemany("DELETE FROM id_free_list WHERE id = %s", [(user_id,) for user_id in ids])
+        remaining = count - len(ids)
+        if remaining:
+            first_id = self._advance(cursor, remaining)
+            ids.extend(range(first_id, first_id + remaining))
+        return ids
+
+    def release(self, cursor, user_id):
+        """
+        Return an ID to the free list inside the current transaction.
+
+        Args:
+            cursor: Cursor of an open transaction
+            user_id (int): ID of the deleted user
+        """
+        cursor.execute("INSERT INTO id_free_list (id) VALUES (%s)", (user_id,))
+
+    def release_many(self, cursor, user_ids):
+        """
+        Return several IDs to the free list with one statement.
+
+        Args:
+            cursor: Cursor of an open transaction
+            user_ids (list): IDs of the deleted users
+        """
+        if user_ids:
+            cursor.executemany("INSERT INTO id_free_list (id) VALUES (%s)", [(user_id,) for user_id in user_ids])
+
+    def _advance(self, cursor, count):
+        """
+        Move the high-water mark forward by count IDs.
+
+        Args:
+            cursor: Cursor of an open transaction
+            count (int): Number of IDs to reserve
+
+        Returns:
+            int: First ID of the reserved range
+        """
+        cursor.execute("UPDATE id_sequence SET next_id = next_id + %s WHERE name = %s",
+                       (count, self.sequence_name))
+        if cursor.rowcount:
+            cursor.execute("SELECT next_id FROM id_sequence WHERE name = %s", (self.sequence_name,))
+            return cursor.fetchone()[0] - count
+
+        # First allocation: start above the highest existing ID
+        cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM users")
+        first_id = cursor.fetchone()[0]
+        cursor.execute("INSERT INTO id_sequence (name, next_id) VALUES (%s, %s)",
+                       (self.sequence_name, first_id + count))
+        return first_id
@@ -0,0 +1,191 @@
+# importer.py
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+
+from auth import hash_password
+from migrations import DEFAULT_TEAM_ID
+from validation import REGISTRATION_SCHEMA, format_errors, registration_record
+
+
+def iter_records(path):
+    """
+    Read registration records from a CSV, JSON Lines or JSON file.
+
+    CSV and JSON Lines files are streamed. A .json file holding a single
+    array has to be parsed as a whole by the json module.
+
+    Args:
+        path (str): Path of a .csv, .jsonl or .json file
+
+    Yields:
+        tuple: Line number (or array position) and the record as parsed,
+            or the ValueError of a JSON Lines line that is not valid JSON
+    """
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+    elif path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as file:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except ValueError as err:
+                        record = err
+                    yield line_number, record
+    elif path.endswith('.json'):
+        with open(path, encoding='utf-8') as file:
+            for index, record in enumerate(json.load(file), start=1):
+                yield index, record
+    else:
+        raise ValueError(f"Unsupported import format: {path}")
+
+
+class ImportReport:
+    """
+    Outcome of a bulk import: rows inserted, rows rejected and throughput.
+    """
+
+    def __init__(self):
+        self.inserted = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        """
+        float: Inserted rows per second of wall time.
+        """
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, line_number, message):
+        """
+        Record a rejected row.
+
+        Args:
+            line_number (int): Position of the row in the input file
+            message (str): Reason the row was rejected
+        """
+        self.errors.append((line_number, message))
+
+    def summary(self):
+        """
+        Build a human-readable summary of the import.
+
+        Returns:
+            str: Summary, followed by one line per rejected row
+        """
+        lines = [f"Imported {self.inserted} users, rejected {len(self.errors)} "
+                 f"in {self.elapsed:.2f}s ({self.rows_per_second:.1f} rows/s)"]
+        lines.extend(f"  line {line_number}: {message}" for line_number, message in sorted(self.errors))
+        return "\n".join(lines)
+
+
+class BulkImporter:
+    """
+    Imports registration records in bulk.
+
+    Records are streamed from the input file in chunks. Each chunk is
+    validated in one call against the registration schema. Its passwords are hashed in
+    parallel on a process pool, and the chunk is written with
+    FootballTeamModel.insert_users in one transaction.
+    """
+
+    def __init__(self, model, chunk_size=500, workers=None, team_id=DEFAULT_TEAM_ID):
+        """
+        Initialize the importer.
+
+        Args:
+            model (FootballTeamModel): Model used to insert the users
+            chunk_size (int): Number of records per transaction
+            workers (int, optional): Hashing processes; defaults to the CPU count
+            team_id (int): ID of the team the users join
+        """
+        self.model = model
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.team_id = team_id
+
+    def run(self, records):
+        """
+        Import records.
+
+        Args:
+            records (iterable): (line_number, record dict) pairs, e.g. from iter_records;
+                anything other than a dict is reported as a rejected row
+
+        Returns:
+            ImportReport: Inserted count, per-row errors and throughput
+        """
+        report = ImportReport()
+        start = time.perf_counter()
+        records = iter(records)
+        workers = self.workers or os.cpu_count() or 1
+        rounds = self.model.hasher.rounds
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while True:
+                chunk = list(islice(records, self.chunk_size))
+                if not chunk:
+                    break
+                for line_number, record in chunk:
+                    if isinstance(record, ValueError):
+                        report.add_error(line_number, f"Invalid JSON: {record}")
+                    elif not isinstance(record, dict):
+                        report.add_error(line_number, "Record must be an object")
+                chunk = [(line_number, record) for line_number, record in chunk if isinstance(record, dict)]
+
+                records_in_chunk = [registration_record(record) for _, record in chunk]
+                invalid = REGISTRATION_SCHEMA.validate_many(records_in_chunk)
+                valid = []
+                for index, ((line_number, _), record) in enumerate(zip(chunk, records_in_chunk)):
+                    if index in invalid:
+                        report.add_error(line_number, format_errors(invalid[index], "; "))
+                    else:
+                        valid.append((line_number, record))
+
+                hashes = pool.map(hash_password, [record['password'] for _, record in valid], repeat(rounds),
+                                  chunksize=max(1, len(valid) // (4 * workers)))
+                rows = [(record['username'], hashed, record['first_name'], record['last_name'],
+                         record['date_of_birth'], record['position'])
+                        for (_, record), hashed in zip(valid, hashes)]
+
+                errors = self.model.insert_users(rows, self.team_id) if rows else {}
+                for index, message in sorted(errors.items()):
+                    report.add_error(valid[index][0], message)
+                report.inserted += len(rows) - len(errors)
+
+        report.elapsed = time.perf_counter() - start
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from a CSV, JSON or JSON Lines file.")
+    parser.add_argument('path', help="File with username, password, first_name, last_name, date_of_birth and position")
+    parser.add_argument('--sqlite', metavar='FILE', help="Import into an SQLite database instead of MySQL")
+    parser.add_argument('--chunk-size', type=int, default=500, help="Records per transaction")
+    parser.add_argument('--workers', type=int, help="Number of password hashing processes")
+    parser.add_argument('--team', type=int, default=DEFAULT_TEAM_ID, help="ID of the team the users join")
+    args = parser.parse_args()
+
+    from model import FootballTeamModel
+    from storage import SQLiteBackend
+
+    model = FootballTeamModel(SQLiteBackend(args.sqlite) if args.sqlite else None)
+    try:
+        report = BulkImporter(model, args.chunk_size, args.workers, args.team).run(iter_records(args.path))
+    finally:
+        model.close_connection()
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
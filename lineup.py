@@ -0,0 +1,378 @@
+# lineup.py
+
+import heapq
+import time
+
+from metrics import timed
+from migrations import DEFAULT_TEAM_ID
+
+
+# Roster columns read to pick lineups
+LINEUP_COLUMNS = ('first_name', 'last_name', 'position', 'primary_position', 'secondary_position',
+                  'preferred_foot', 'height', 'jersey_number')
+
+# Score of a player in a slot of their primary or secondary position
+PRIMARY_SCORE = 10.0
+SECONDARY_SCORE = 7.0
+
+# Score of a player whose primary or secondary position is related to the slot's
+RELATED_PRIMARY_SCORE = 4.0
+RELATED_SECONDARY_SCORE = 2.0
+
+# Bonus for a player whose preferred foot matches the slot's side
+FOOT_BONUS = 1.0
+
+# Bonus for height in slots that need it, growing from TALL_FROM to TALL_TO cm
+HEIGHT_BONUS = 1.5
+TALL_FROM, TALL_TO = 175, 195
+TALL_POSITIONS = frozenset(('GK', 'CB'))
+
+# Positions a player can cover reasonably well
+RELATED_POSITIONS = {
+    'ST': ('CF',), 'CF': ('ST', 'CAM'), 'RW': ('RM', 'LW'), 'LW': ('LM', 'RW'),
+    'CAM': ('CM', 'CF'), 'CM': ('CAM', 'CDM'), 'CDM': ('CM', 'CB'), 'RM': ('RW', 'RB'),
+    'LM': ('LW', 'LB'), 'CB': ('CDM',), 'RB': ('RM', 'CB'), 'LB': ('LM', 'CB'), 'GK': (),
+}
+
+# Preferred foot suiting each side of the pitch
+SIDE_FEET = {'L': 'Left', 'R': 'Right'}
+
+
+class Slot:
+    """
+    One place in a formation.
+
+    Attributes:
+        name (str): Label such as "LCB"
+        position (str): Position played in the slot
+        side (str or None): 'L' or 'R' for slots on one side of the pitch
+    """
+
+    __slots__ = ('name', 'position', 'side')
+
+    def __init__(self, name, position, side=None):
+        self.name = name
+        self.position = position
+        self.side = side
+
+    def __repr__(self):
+        return f"Slot({self.name!r}, {self.position!r}, {self.side!r})"
+
+
+def _formation(*slots):
+    return tuple(Slot(*slot) for slot in slots)
+
+
+_GK = ('GK', 'GK')
+_BACK_FOUR = (('RB', 'RB', 'R'), ('RCB', 'CB', 'R'), ('LCB', 'CB', 'L'), ('LB', 'LB', 'L'))
+_BACK_THREE = (('RCB', 'CB', 'R'), ('CB', 'CB'), ('LCB', 'CB', 'L'))
+_TWO_STRIKERS = (('RST', 'ST', 'R'), ('LST', 'ST', 'L'))
+_FRONT_THREE = (('RW', 'RW', 'R'), ('ST', 'ST'), ('LW', 'LW', 'L'))
+
+FORMATIONS = {
+    '4-4-2': _formation(_GK, *_BACK_FOUR, ('RM', 'RM', 'R'), ('RCM', 'CM', 'R'), ('LCM', 'CM', 'L'),
+                        ('LM', 'LM', 'L'), *_TWO_STRIKERS),
+    '4-3-3': _formation(_GK, *_BACK_FOUR, ('RCM', 'CM', 'R'), ('CDM', 'CDM'), ('LCM', 'CM', 'L'), *_FRONT_THREE),
+    '4-2-3-1': _formation(_GK, *_BACK_FOUR, ('RDM', 'CDM', 'R'), ('LDM', 'CDM', 'L'), ('RW', 'RW', 'R'),
+                          ('CAM', 'CAM'), ('LW', 'LW', 'L'), ('ST', 'ST')),
+    '3-5-2': _formation(_GK, *_BACK_THREE, ('RM', 'RM', 'R'), ('RCM', 'CM', 'R'), ('CDM', 'CDM'),
+                        ('LCM', 'CM', 'L'), ('LM', 'LM', 'L'), *_TWO_STRIKERS),
+    '3-4-3': _formation(_GK, *_BACK_THREE, ('RM', 'RM', 'R'), ('RCM', 'CM', 'R'), ('LCM', 'CM', 'L'),
+                        ('LM', 'LM', 'L'), *_FRONT_THREE),
+    '5-3-2': _formation(_GK, ('RB', 'RB', 'R'), *_BACK_THREE, ('LB', 'LB', 'L'), ('RCM', 'CM', 'R'),
+                        ('CM', 'CM'), ('LCM', 'CM', 'L'), *_TWO_STRIKERS),
+}
+
+
+class Player:
+    """
+    The profile values of a squad member that lineups are picked from.
+    """
+
+    __slots__ = ('user_id', 'name', 'primary', 'secondary', 'foot', 'height', 'jersey')
+
+    def __init__(self, user_id, name, primary=None, secondary=None, foot=None, height=None, jersey=None):
+        self.user_id = user_id
+        self.name = name
+        self.primary = primary
+        self.secondary = secondary
+        self.foot = foot
+        self.height = height
+        self.jersey = jersey
+
+    @classmethod
+    def from_row(cls, user_id, row):
+        """
+        Create a player from a roster row.
+
+        Args:
+            user_id (int): ID of the member
+            row (tuple): Values in LINEUP_COLUMNS order
+
+        Returns:
+            Player: The player
+        """
+        first_name, last_name, _, primary, secondary, foot, height, jersey = row
+        return cls(user_id, f"{first_name} {last_name}", primary or None, secondary or None, foot or None,
+                   _number(height), _number(jersey))
+
+    def __repr__(self):
+        return f"Player({self.user_id!r}, {self.name!r})"
+
+
+def _number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def slot_score(slot, player):
+    """
+    Rate how well a player suits a slot.
+
+    Args:
+        slot (Slot): Slot of a formation
+        player (Player): Candidate player
+
+    Returns:
+        float: Score; 0 for a player with no position related to the slot
+    """
+    if player.primary == slot.position:
+        score = PRIMARY_SCORE
+    elif player.secondary == slot.position:
+        score = SECONDARY_SCORE
+    elif slot.position in RELATED_POSITIONS.get(player.primary, ()):
+        score = RELATED_PRIMARY_SCORE
+    elif slot.position in RELATED_POSITIONS.get(player.secondary, ()):
+        score = RELATED_SECONDARY_SCORE
+    else:
+        return 0.0
+
+    if slot.side is not None and player.foot == SIDE_FEET[slot.side]:
+        score += FOOT_BONUS
+    if slot.position in TALL_POSITIONS and player.height is not None:
+        score += HEIGHT_BONUS * min(max(player.height - TALL_FROM, 0) / (TALL_TO - TALL_FROM), 1.0)
+    return score
+
+
+def best_assignment(scores):
+    """
+    Solve the rectangular assignment problem with the Hungarian algorithm.
+
+    Finds the one-to-one assignment of rows to columns with the highest
+    total score in O(rows^2 * columns) time, with rows <= columns; a
+    matrix with more rows than columns is solved transposed.
+
+    Args:
+        scores (list): Rows of equal length; scores[i][j] is the score of
+            assigning row i to column j
+
+    Returns:
+        list: Column assigned to each row, or None for rows left out
+            because there are fewer columns than rows
+    """
+    rows = len(scores)
+    if rows == 0:
+        return []
+    cols = len(scores[0])
+    if rows > cols:
+        result = [None] * rows
+        for col, row in enumerate(best_assignment([list(column) for column in zip(*scores)])):
+            result[row] = col
+        return result
+
+    # Potentials u (rows) and v (columns) and the row matched to each
+    # column, all 1-based with index 0 as the augmenting path's start
+    inf = float('inf')
+    u = [0.0] * (rows + 1)
+    v = [0.0] * (cols + 1)
+    match = [0] * (cols + 1)
+    way = [0] * (cols + 1)
+    for row in range(1, rows + 1):
+        match[0] = row
+        col0 = 0
+        min_slack = [inf] * (cols + 1)
+        used = [False] * (cols + 1)
+        while True:
+            used[col0] = True
+            row0 = match[col0]
+            costs = scores[row0 - 1]
+            delta = inf
+            col1 = 0
+            for col in range(1, cols + 1):
+                if not used[col]:
+                    slack = -costs[col - 1] - u[row0] - v[col]
+                    if slack < min_slack[col]:
+                        min_slack[col] = slack
+                        way[col] = col0
+                    if min_slack[col] < delta:
+                        delta = min_slack[col]
+                        col1 = col
+            for col in range(cols + 1):
+                if used[col]:
+                    u[match[col]] += delta
+                    v[col] -= delta
+                else:
+                    min_slack[col] -= delta
+            col0 = col1
+            if match[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            match[col0] = match[col1]
+            col0 = col1
+
+    result = [None] * rows
+    for col in range(1, cols + 1):
+        if match[col]:
+            result[match[col] - 1] = col - 1
+    return result
+
+
+class Lineup:
+    """
+    A formation with one player (or nobody) picked for each slot.
+    """
+
+    def __init__(self, formation, picks):
+        """
+        Initialize the lineup.
+
+        Args:
+            formation (str): Formation name, a key of FORMATIONS
+            picks (list): (Slot, Player or None, score) for each slot
+        """
+        self.formation = formation
+        self.picks = picks
+        self.elapsed = 0.0
+
+    @property
+    def score(self):
+        """
+        float: Total score of the picked players.
+        """
+        return sum(score for _, _, score in self.picks)
+
+    @property
+    def unfilled(self):
+        """
+        list: Names of the slots nobody was picked for.
+        """
+        return [slot.name for slot, player, _ in self.picks if player is None]
+
+    def to_dict(self):
+        """
+        Summarize the lineup for JSON output.
+
+        Returns:
+            dict: Formation, total score and every pick
+        """
+        return {
+            'formation': self.formation,
+            'score': round(self.score, 2),
+            'picks': [{'slot': slot.name, 'position': slot.position,
+                       'id': player.user_id if player else None, 'name': player.name if player else None,
+                       'jersey_number': player.jersey if player else None,
+                       'score': round(score, 2)} for slot, player, score in self.picks],
+        }
+
+    def summary(self):
+        """
+        Build a human-readable summary of the lineup.
+
+        Returns:
+            str: Formation and score, then one line per slot with the
+                player's name and jersey number, if any
+        """
+        lines = [f"{self.formation} (score {self.score:.1f})"]
+        for slot, player, score in self.picks:
+            if player is None:
+                name = "-"
+            elif player.jersey is None:
+                name = player.name
+            else:
+                name = f"{player.name} (#{player.jersey})"
+            lines.append(f"  {slot.name:<5}{name:<40}{score:>6.1f}")
+        return "\n".join(lines)
+
+
+def pick_lineup(players, formation):
+    """
+    Pick the highest-scoring lineup of a formation.
+
+    Only each slot's best len(slots) players are considered: a slot's
+    optimal pick is always among them, since the other slots can take at
+    most len(slots) - 1 of them. The assignment problem therefore stays
+    small however large the squad is.
+
+    Args:
+        players (list): Player objects available for selection
+        formation (str): Formation name, a key of FORMATIONS
+
+    Returns:
+        Lineup: The lineup with the highest total score
+
+    Raises:
+        KeyError: If the formation is unknown
+    """
+    slots = FORMATIONS[formation]
+    scores = [[slot_score(slot, player) for player in players] for slot in slots]
+    candidates = sorted({index for row in scores
+                         for index in heapq.nlargest(len(slots), range(len(players)), key=row.__getitem__)})
+    assignment = best_assignment([[row[index] for index in candidates] for row in scores])
+
+    picks = []
+    for slot, row, column in zip(slots, scores, assignment):
+        if column is None:
+            picks.append((slot, None, 0.0))
+        else:
+            index = candidates[column]
+            picks.append((slot, players[index], row[index]))
+    return Lineup(formation, picks)
+
+
+def best_lineups(players, formations=None, limit=3):
+    """
+    Pick the best lineup of each formation and rank them.
+
+    Args:
+        players (list): Player objects available for selection
+        formations (list, optional): Formation names; defaults to all of FORMATIONS
+        limit (int): Number of lineups to return
+
+    Returns:
+        list: Up to limit Lineup objects, highest score first; empty if
+            there are no players
+    """
+    if not players:
+        return []
+    lineups = []
+    for formation in formations or FORMATIONS:
+        start = time.perf_counter()
+        lineup = pick_lineup(players, formation)
+        lineup.elapsed = time.perf_counter() - start
+        lineups.append(lineup)
+    lineups.sort(key=lambda lineup: lineup.score, reverse=True)
+    return lineups[:limit]
+
+
+@timed('model')
+def suggest_lineups(model, formations=None, limit=3, team_id=DEFAULT_TEAM_ID):
+    """
+    Suggest starting lineups from a team's players.
+
+    Coaches are left out; every player is considered available.
+
+    Args:
+        model (FootballTeamModel): Model to read the roster from
+        formations (list, optional): Formation names; defaults to all of FORMATIONS
+        limit (int): Number of lineups to return
+        team_id (int): ID of the team
+
+    Returns:
+        list: Up to limit Lineup objects, highest score first
+    """
+    roster = model.get_team_data(LINEUP_COLUMNS, team_id)
+    players = [Player.from_row(user_id, row) for user_id, row in roster.items() if row[2] != 'Coach']
+    return best_lineups(players, formations, limit)
@@ -0,0 +1,362 @@
+# metrics.py
+
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+slow_query_log = logging.getLogger("football_team.slow_queries")
+
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+(\w+)', re.IGNORECASE)
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed upper bounds, as used by Prometheus.
+    """
+
+    def __init__(self, buckets):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets (tuple): Sorted upper bounds of the buckets
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """
+        Record one value.
+
+        Args:
+            value (float): Observed value
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        """
+        Summarize the histogram.
+
+        Returns:
+            dict: Count, sum and cumulative count per upper bound
+        """
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {'count': self.count, 'sum': self.sum, 'buckets': buckets}
+
+
+class MetricsRegistry:
+    """
+    Collects timings of model calls, view builds and SQL statements.
+
+    Durations and row counts are kept in histograms, and errors and other
+    events in counters, each labelled by operation. Statements slower than
+    slow_query_threshold are logged to the football_team.slow_queries logger.
+    """
+
+    def __init__(self, slow_query_threshold=None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            slow_query_threshold (float, optional): Seconds above which a
+                statement is logged; None disables the slow-query log
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self.durations = {}
+        self.rows = {}
+        self.errors = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def observe(self, kind, name, seconds, rows=None, error=False):
+        """
+        Record one operation.
+
+        Args:
+            kind (str): Operation family: "model", "view" or "query"
+            name (str): Operation label, e.g. a method name or statement
+            seconds (float): Duration
+            rows (int, optional): Number of rows read or written
+            error (bool): Whether the operation failed
+        """
+        key = (kind, name)
+        with self.lock:
+            self.durations.setdefault(key, Histogram(DURATION_BUCKETS)).observe(seconds)
+            if rows is not None:
+                self.rows.setdefault(key, Histogram(ROW_BUCKETS)).observe(rows)
+            if error:
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def increment(self, kind, name, amount=1):
+        """
+        Count an event that has no duration, such as a statement being prepared.
+
+        Args:
+            kind (str): Event family, e.g. "statement_prepares" or "connection"
+            name (str): Event label, e.g. a statement label
+            amount (int): Number of events
+        """
+        key = (kind, name)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe_statement(self, sql, seconds, rows=None, error=False):
+        """
+        Record one SQL statement and log it if it was slow.
+
+        Args:
+            sql (str): Statement text
+            seconds (float): Execution time
+            rows (int, optional): Number of rows read or affected
+            error (bool): Whether the statement failed
+        """
+        self.observe("query", statement_label(sql), seconds, rows, error)
+        if self.slow_query_threshold is not None and seconds >= self.slow_query_threshold:
+            slow_query_log.warning("Slow query (%.1f ms): %s", seconds * 1000, " ".join(sql.split()))
+
+    def reset(self):
+        """
+        Drop everything recorded so far.
+        """
+        with self.lock:
+            self.durations.clear()
+            self.rows.clear()
+            self.errors.clear()
+            self.counters.clear()
+
+    def to_dict(self):
+        """
+        Build a JSON-serializable snapshot.
+
+        Returns:
+            dict: Histograms and error counts grouped by kind and name
+        """
+        snapshot = {}
+        with self.lock:
+            for (kind, name), histogram in self.durations.items():
+                entry = snapshot.setdefault(kind, {}).setdefault(name, {})
+                entry['duration_seconds'] = histogram.to_dict()
+                entry['errors'] = self.errors.get((kind, name), 0)
+                if (kind, name) in self.rows:
+                    entry['rows'] = self.rows[(kind, name)].to_dict()
+            for (kind, name), count in self.counters.items():
+                snapshot.setdefault(kind, {}).setdefault(name, {})['total'] = count
+        return snapshot
+
+    def to_prometheus(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text
+        """
+        lines = []
+        with self.lock:
+            for metric, series in (('duration_seconds', self.durations), ('rows', self.rows)):
+                for kind in sorted({kind for kind, _ in series}):
+                    full_name = f"football_team_{kind}_{metric}"
+                    lines.append(f"# TYPE {full_name} histogram")
+                    for (series_kind, name), histogram in sorted(series.items()):
+                        if series_kind != kind:
+                            continue
+                        label = f'name="{_escape(name)}"'
+                        for bound, count in histogram.to_dict()['buckets'].items():
+                            lines.append(f'{full_name}_bucket{{{label},le="{bound}"}} {count}')
+                        lines.append(f"{full_name}_sum{{{label}}} {histogram.sum}")
+                        lines.append(f"{full_name}_count{{{label}}} {histogram.count}")
+            for kind in sorted({kind for kind, _ in self.errors}):
+                full_name = f"football_team_{kind}_errors_total"
+                lines.append(f"# TYPE {full_name} counter")
+                for (error_kind, name), count in sorted(self.errors.items()):
+                    if error_kind == kind:
+                        lines.append(f'{full_name}{{name="{_escape(name)}"}} {count}')
+            for kind in sorted({kind for kind, _ in self.counters}):
+                full_name = f"football_team_{kind}_total"
+                lines.append(f"# TYPE {full_name} counter")
+                for (counter_kind, name), count in sorted(self.counters.items()):
+                    if counter_kind == kind:
+                        lines.append(f'{full_name}{{name="{_escape(name)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Write a snapshot to a file: JSON for .json paths, Prometheus text otherwise.
+
+        Args:
+            path (str): Output file path
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            if path.endswith('.json'):
+                json.dump(self.to_dict(), file, indent=2)
+            else:
+                file.write(self.to_prometheus())
+
+
+# Registry used by the model, the view and the storage backends
+registry = MetricsRegistry()
+
+
+def configure_from_environment():
+    """
+    Apply the opt-in metrics settings from environment variables.
+
+    FOOTBALL_TEAM_SLOW_QUERY_MS enables the slow-query log with the given
+    threshold in milliseconds. FOOTBALL_TEAM_METRICS_FILE names the file a
+    snapshot should be written to on exit.
+
+    Returns:
+        str or None: Path for the metrics snapshot, if configured
+    """
+    threshold = os.environ.get("FOOTBALL_TEAM_SLOW_QUERY_MS")
+    if threshold:
+        registry.slow_query_threshold = float(threshold) / 1000
+    return os.environ.get("FOOTBALL_TEAM_METRICS_FILE") or None
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def statement_label(sql):
+    """
+    Reduce a SQL statement to a short label such as "SELECT users".
+
+    Args:
+        sql (str): Statement text
+
+    Returns:
+        str: Statement verb and first table name
+    """
+    verb = sql.split(None, 1)[0].upper() if sql.strip() else ""
+    match = _TABLE.search(sql)
+    return f"{verb} {match.group(1)}" if match else verb
+
+
+def timed(kind):
+    """
+    Decorator recording the duration and failures of a method in the registry.
+
+    Generator methods are timed from the first to the last item produced.
+
+    Args:
+        kind (str): Operation family, e.g. "model" or "view"
+
+    Returns:
+        callable: Decorator
+    """
+    def decorator(func):
+        name = func.__name__
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                rows = 0
+                error = False
+                try:
+                    for item in func(*args, **kwargs):
+                        rows += 1
+                        yield item
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    registry.observe(kind, name, time.perf_counter() - start, rows, error)
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            error = False
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                registry.observe(kind, name, time.perf_counter() - start, error=error)
+        return wrapper
+    return decorator
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy that times every statement and counts the rows it returns.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._sql = None
+        self._seconds = 0.0
+        self._rows = 0
+        self._counting = False
+
+    def flush(self):
+        """
+        Record the last executed statement, including the rows fetched so far.
+        """
+        if self._sql is not None:
+            registry.observe_statement(self._sql, self._seconds, self._rows)
+            self._sql = None
+
+    def _run(self, method, sql, params):
+        self.flush()
+        start = time.perf_counter()
+        try:
+            result = method(sql, params)
+        except Exception:
+            registry.observe_statement(sql, time.perf_counter() - start, error=True)
+            raise
+        self._sql = sql
+        self._seconds = time.perf_counter() - start
+        # DML and buffered SELECTs report their row count up front;
+        # otherwise the rows are counted as they are fetched
+        rowcount = self._cursor.rowcount
+        self._counting = rowcount < 0
+        self._rows = max(rowcount, 0)
+        return result
+
+    def execute(self, sql, params=()):
+        return self._run(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self._run(self._cursor.executemany, sql, seq_of_params)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None and self._counting:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size):
+        rows = self._cursor.fetchmany(size)
+        if self._counting:
+            self._rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if self._counting:
+            self._rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
@@ -0,0 +1,426 @@
+# migrations.py
+
+import argparse
+import sys
+import unicodedata
+from datetime import datetime, timezone
+from functools import lru_cache
+
+
+# Order in which the roster lists members: coaches first, then by last name
+ROSTER_ORDER = "role_rank, last_name, id"
+
+# Collation of users.last_name on SQLite, registered by SQLiteBackend. Like
+# MySQL's default utf8mb4 collation it ignores case and accents, so both
+# backends return rosters in the same order, the order of name_key
+NAME_COLLATION = "roster_name"
+
+# Index that serves ROSTER_ORDER within a team
+ROSTER_INDEX = "idx_users_team_roster"
+
+# Team that existing members and members registered without a team belong to
+DEFAULT_TEAM_ID = 1
+
+MIGRATIONS_TABLE = """CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at VARCHAR(32) NOT NULL
+)"""
+
+USERS_TABLE = """CREATE TABLE IF NOT EXISTS users (
+    id {id_type} PRIMARY KEY,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    date_of_birth DATE NOT NULL,
+    position VARCHAR(20) NOT NULL,
+    email VARCHAR(100),
+    street VARCHAR(100),
+    building_number VARCHAR(20),
+    postal_code VARCHAR(20),
+    city VARCHAR(50),
+    jersey_number INT,
+    primary_position VARCHAR(20),
+    secondary_position VARCHAR(20),
+    height INT,
+    preferred_foot VARCHAR(10),
+    version INT NOT NULL DEFAULT 0
+)"""
+
+ID_TABLES = (
+    """CREATE TABLE IF NOT EXISTS id_free_list (
+    id INT PRIMARY KEY
+)""",
+    """CREATE TABLE IF NOT EXISTS id_sequence (
+    name VARCHAR(50) PRIMARY KEY,
+    next_id INT NOT NULL
+)""",
+)
+
+TEAMS_TABLE = """CREATE TABLE IF NOT EXISTS teams (
+    id INT PRIMARY KEY,
+    name VARCHAR(50) UNIQUE NOT NULL
+)"""
+
+DEFAULT_TEAM = f"INSERT INTO teams (id, name) VALUES ({DEFAULT_TEAM_ID}, 'First Team')"
+
+ROLE_RANK = "CASE WHEN position = 'Coach' THEN 0 ELSE 1 END"
+
+# Indexes of migration 3, replaced by the team-scoped indexes of migration 4
+GLOBAL_INDEXES = ('idx_users_roster', 'idx_users_jersey_number', 'idx_users_primary_position',
+                  'idx_users_secondary_position')
+
+# Change log read by RosterSnapshot.refresh; triggers add a row for every
+# written user, so readers can tell what changed since a given seq
+CHANGES_TABLE = """CREATE TABLE roster_changes (
+    seq {seq_type},
+    user_id INT NOT NULL,
+    team_id INT NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)"""
+
+# Trigger name suffix, event, and the row whose ID and team are logged
+CHANGE_TRIGGERS = (('insert', 'INSERT', 'NEW'), ('update', 'UPDATE', 'NEW'), ('delete', 'DELETE', 'OLD'))
+
+# Stored columns of users, copied when SQLite rebuilds the table
+USER_COLUMNS = ('id', 'username', 'password', 'first_name', 'last_name', 'date_of_birth', 'position', 'email',
+                'street', 'building_number', 'postal_code', 'city', 'jersey_number', 'primary_position',
+                'secondary_position', 'height', 'preferred_foot', 'version', 'team_id')
+
+# users as of migration 7 on SQLite, which cannot change the collation of an
+# existing column and therefore copies the table
+SQLITE_USERS_REBUILD = f"""CREATE TABLE users_rebuild (
+    id INTEGER PRIMARY KEY,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL COLLATE {NAME_COLLATION},
+    date_of_birth DATE NOT NULL,
+    position VARCHAR(20) NOT NULL,
+    email VARCHAR(100),
+    street VARCHAR(100),
+    building_number VARCHAR(20),
+    postal_code VARCHAR(20),
+    city VARCHAR(50),
+    jersey_number INT,
+    primary_position VARCHAR(20),
+    secondary_position VARCHAR(20),
+    height INT,
+    preferred_foot VARCHAR(10),
+    version INT NOT NULL DEFAULT 0,
+    role_rank INTEGER GENERATED ALWAYS AS ({ROLE_RANK}) VIRTUAL,
+    team_id INTEGER NOT NULL DEFAULT {DEFAULT_TEAM_ID} REFERENCES teams (id)
+)"""
+
+TEAM_INDEXES = (
+    f"CREATE INDEX {ROSTER_INDEX} ON users (team_id, {ROSTER_ORDER})",
+    "CREATE INDEX idx_users_team_jersey_number ON users (team_id, jersey_number)",
+    "CREATE INDEX idx_users_team_primary_position ON users (team_id, primary_position)",
+    "CREATE INDEX idx_users_team_secondary_position ON users (team_id, secondary_position)",
+)
+
+
+@lru_cache(maxsize=65536)
+def name_key(name):
+    """
+    Fold a name to the value roster order compares: without accents and case-folded.
+
+    Args:
+        name (str): Last name; None counts as empty
+
+    Returns:
+        str: Comparison key
+    """
+    decomposed = unicodedata.normalize('NFKD', str(name or ''))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def compare_names(first, second):
+    """
+    Compare two names for NAME_COLLATION.
+
+    Args:
+        first (str): Name
+        second (str): Name
+
+    Returns:
+        int: Negative, zero or positive as first sorts before, with or after second
+    """
+    first, second = name_key(first), name_key(second)
+    return (first > second) - (first < second)
+
+
+def table_columns(cursor, table):
+    """
+    Read the column names of a table.
+
+    Args:
+        cursor: Cursor of the database
+        table (str): Table name
+
+    Returns:
+        set: Column names
+    """
+    cursor.execute(f"SELECT * FROM {table} LIMIT 0")
+    cursor.fetchall()
+    return {column[0] for column in cursor.description}
+
+
+def change_trigger(dialect, name, event, row):
+    """
+    Build the statement creating a trigger that logs writes to users.
+
+    Args:
+        dialect (str): Dialect of the backend ('mysql' or 'sqlite')
+        name (str): Trigger name suffix
+        event (str): INSERT, UPDATE or DELETE
+        row (str): NEW or OLD
+
+    Returns:
+        str: CREATE TRIGGER statement
+    """
+    log = f"INSERT INTO roster_changes (user_id, team_id) VALUES ({row}.id, {row}.team_id)"
+    head = f"CREATE TRIGGER trg_users_{name} AFTER {event} ON users FOR EACH ROW"
+    if dialect == 'sqlite':
+        return f"{head} BEGIN {log}; END"
+    return f"{head} {log}"
+
+
+class Migration:
+    """
+    One versioned schema change.
+
+    Statements are given per SQL dialect, or once in 'statements' when they
+    are the same for every dialect.
+    """
+
+    def __init__(self, version, name, statements=(), needed=None, **dialects):
+        """
+        Initialize the migration.
+
+        Args:
+            version (int): Position in the migration history, starting at 1
+            name (str): Short description recorded in schema_migrations
+            statements (tuple): Statements for every dialect
+            needed (callable, optional): Called with a cursor; the statements
+                only run if it returns True. The migration is recorded either way.
+            **dialects: Statements for one dialect, keyed by dialect name
+        """
+        self.version = version
+        self.name = name
+        self.statements = tuple(statements)
+        self.needed = needed
+        self.dialects = dialects
+
+    def statements_for(self, dialect):
+        """
+        Get the statements to run on a database.
+
+        Args:
+            dialect (str): Dialect of the backend ('mysql' or 'sqlite')
+
+        Returns:
+            tuple: SQL statements
+        """
+        return tuple(self.dialects.get(dialect, ())) + self.statements
+
+    def __repr__(self):
+        return f"Migration({self.version}, {self.name!r})"
+
+
+MIGRATIONS = (
+    # Existing databases created from the old README schema already have
+    # these tables, so version 1 only records itself; migration 6 adds the
+    # column they lack
+    Migration(1, "Create users and user ID allocation tables",
+              mysql=(USERS_TABLE.format(id_type="INT"),) + ID_TABLES,
+              sqlite=(USERS_TABLE.format(id_type="INTEGER"),) + ID_TABLES),
+    # SQLite can only add virtual generated columns to an existing table;
+    # both kinds can be indexed
+    Migration(2, "Add generated role_rank column",
+              mysql=(f"ALTER TABLE users ADD COLUMN role_rank TINYINT AS ({ROLE_RANK}) STORED NOT NULL",),
+              sqlite=(f"ALTER TABLE users ADD COLUMN role_rank INTEGER GENERATED ALWAYS AS ({ROLE_RANK}) VIRTUAL",)),
+    Migration(3, "Add roster order and lookup indexes", statements=(
+        "CREATE INDEX idx_users_roster ON users (role_rank, last_name, id)",
+        "CREATE INDEX idx_users_jersey_number ON users (jersey_number)",
+        "CREATE INDEX idx_users_primary_position ON users (primary_position)",
+        "CREATE INDEX idx_users_secondary_position ON users (secondary_position)",
+    )),
+    # Every index leads with team_id, so a team's queries only read its own
+    # range of the index. Existing members join the default team.
+    Migration(4, "Add teams and team-scoped indexes",
+              mysql=(TEAMS_TABLE, DEFAULT_TEAM,
+                     f"ALTER TABLE users ADD COLUMN team_id INT NOT NULL DEFAULT {DEFAULT_TEAM_ID}")
+                    + TEAM_INDEXES
+                    + ("ALTER TABLE users ADD CONSTRAINT fk_users_team FOREIGN KEY (team_id) REFERENCES teams (id)",)
+                    + tuple(f"DROP INDEX {index} ON users" for index in GLOBAL_INDEXES),
+              sqlite=(TEAMS_TABLE, DEFAULT_TEAM,
+                      f"ALTER TABLE users ADD COLUMN team_id INTEGER NOT NULL DEFAULT {DEFAULT_TEAM_ID} REFERENCES teams (id)")
+                     + TEAM_INDEXES
+                     + tuple(f"DROP INDEX {index}" for index in GLOBAL_INDEXES)),
+    # AUTOINCREMENT keeps SQLite from reusing the seq of pruned rows
+    Migration(5, "Add roster change log",
+              mysql=(CHANGES_TABLE.format(seq_type="BIGINT AUTO_INCREMENT PRIMARY KEY"),)
+                    + tuple(change_trigger('mysql', *trigger) for trigger in CHANGE_TRIGGERS),
+              sqlite=(CHANGES_TABLE.format(seq_type="INTEGER PRIMARY KEY AUTOINCREMENT"),)
+                     + tuple(change_trigger('sqlite', *trigger) for trigger in CHANGE_TRIGGERS)),
+    # Tables created by version 1 already have the column
+    Migration(6, "Add users.version to databases created before migrations",
+              statements=("ALTER TABLE users ADD COLUMN version INT NOT NULL DEFAULT 0",),
+              needed=lambda cursor: 'version' not in table_columns(cursor, 'users')),
+    # MySQL's default collation already ignores case and accents; dropping
+    # the old table also drops its indexes and triggers
+    Migration(7, "Order last names without regard to case and accents",
+              sqlite=(SQLITE_USERS_REBUILD,
+                      f"INSERT INTO users_rebuild ({', '.join(USER_COLUMNS)}) SELECT {', '.join(USER_COLUMNS)} FROM users",
+                      "DROP TABLE users",
+                      "ALTER TABLE users_rebuild RENAME TO users")
+                     + TEAM_INDEXES
+                     + tuple(change_trigger('sqlite', *trigger) for trigger in CHANGE_TRIGGERS)),
+)
+
+
+def applied_versions(backend):
+    """
+    Read the versions already applied to a database.
+
+    Args:
+        backend (StorageBackend): Backend of the database
+
+    Returns:
+        set: Applied migration versions
+    """
+    with backend.cursor() as cursor:
+        cursor.execute(MIGRATIONS_TABLE)
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {version for version, in cursor.fetchall()}
+
+
+def pending_migrations(backend, migrations=MIGRATIONS):
+    """
+    List the migrations not yet applied to a database.
+
+    Args:
+        backend (StorageBackend): Backend of the database
+        migrations (tuple): Full migration history
+
+    Returns:
+        list: Pending migrations in version order
+    """
+    applied = applied_versions(backend)
+    return sorted((migration for migration in migrations if migration.version not in applied),
+                  key=lambda migration: migration.version)
+
+
+def apply_migrations(backend, migrations=MIGRATIONS):
+    """
+    Bring a database up to the latest schema version.
+
+    Each migration runs in its own transaction together with the row that
+    records it. MySQL commits DDL statements implicitly, so a migration that
+    fails halfway on MySQL may have to be cleaned up by hand before it is
+    retried; on SQLite it is rolled back completely.
+
+    Args:
+        backend (StorageBackend): Backend of the database
+        migrations (tuple): Full migration history
+
+    Returns:
+        list: Migrations that were applied
+
+    Raises:
+        StorageError: If a migration fails
+    """
+    pending = pending_migrations(backend, migrations)
+    for migration in pending:
+        with backend.transaction() as cursor:
+            if migration.needed is None or migration.needed(cursor):
+                for statement in migration.statements_for(backend.dialect):
+                    cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+                           (migration.version, migration.name,
+                            datetime.now(timezone.utc).isoformat(timespec='seconds')))
+    return pending
+
+
+def query_plan(backend, query, params=()):
+    """
+    Ask the database how it would run a query.
+
+    Args:
+        backend (StorageBackend): Backend of the database
+        query (str): Query with %s placeholders
+        params (tuple): Query parameters
+
+    Returns:
+        list: One line per plan step
+    """
+    with backend.cursor() as cursor:
+        if backend.dialect == 'sqlite':
+            cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute("EXPLAIN " + query, params)
+        names = [column[0] for column in cursor.description]
+        return [f"{row['table']}: type={row['type']} key={row['key']} {row['Extra'] or ''}".strip()
+                for row in (dict(zip(names, row)) for row in cursor.fetchall())]
+
+
+def check_roster_index(backend):
+    """
+    Confirm that the roster queries read the roster index in order instead
+    of sorting the table.
+
+    Both the first page and a following page of the keyset pagination used
+    by FootballTeamModel.iter_team_batches are checked, for the default team.
+
+    Args:
+        backend (StorageBackend): Backend of the database
+
+    Returns:
+        tuple: (bool, list) whether every query uses the index without a
+            sort, and the plan lines of the queries
+    """
+    queries = (
+        (f"SELECT id, first_name FROM users WHERE team_id = %s ORDER BY {ROSTER_ORDER} LIMIT %s",
+         (DEFAULT_TEAM_ID, 200)),
+        (f"""SELECT id, first_name FROM users WHERE team_id = %s AND ({ROSTER_ORDER}) > (%s, %s, %s)
+                ORDER BY {ROSTER_ORDER} LIMIT %s""", (DEFAULT_TEAM_ID, 1, "", 0, 200)),
+    )
+    ok = True
+    lines = []
+    for query, params in queries:
+        plan = query_plan(backend, query, params)
+        text = " ".join(plan)
+        ok = ok and ROSTER_INDEX in text and "TEMP B-TREE" not in text and "filesort" not in text
+        lines.extend(plan)
+    return ok, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument('--sqlite', metavar='FILE', help="Use an SQLite database instead of MySQL")
+    parser.add_argument('--check', action='store_true', help="Check that the roster query uses its index")
+    args = parser.parse_args()
+
+    from model import FootballTeamModel
+    from storage import SQLiteBackend
+
+    # Backends apply pending migrations as they connect
+    model = FootballTeamModel(SQLiteBackend(args.sqlite) if args.sqlite else None)
+    try:
+        model.backend.connect()
+        applied = applied_versions(model.backend)
+        print(f"Schema version {max(applied, default=0)} ({len(applied)} migrations applied)")
+        if args.check:
+            ok, plan = check_roster_index(model.backend)
+            print("\n".join(plan))
+            print("Roster query uses its index" if ok else "Roster query does not use its index")
+            return 0 if ok else 1
+    finally:
+        model.close_connection()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,168 +1,670 @@
-# model.py
-
-import mysql.connector
-import bcrypt
-
-
-
-class FootballTeamModel:
-    """
-    The Model component of the Football Team Manager application.
-    Handles all database operations and data manipulation.
-    """
-
-    def __init__(self):
-        """
-        Initialize the model by establishing a database connection.
-        """
-        try:
-            self.db = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="",
-                database="football_team"
-            )
-            self.cursor = self.db.cursor()
-        except mysql.connector.Error as err:
-            raise Exception(f"Could not connect to database: {err}")
-
-    def close_connection(self):
-        """
-        Close the database connection.
-        """
-        self.db.close()
-
-    def register_user(self, username, password, first_name, last_name, dob, position):
-        """
-        Register a new user in the database.
-
-        Args:
-            username (str): User's username
-            password (str): User's password
-            first_name (str): User's first name
-            last_name (str): User's last name
-            dob (str): User's date of birth
-            position (str): User's position
-
-        Returns:
-            bool: True if registration successful, False otherwise
-        """
-        try:
-            
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-
-            self.cursor.execute("SELECT id FROM users ORDER BY id")
-            used_ids = set(id for (id,) in self.cursor.fetchall())
-
-            first_available_id = 1
-            while first_available_id in used_ids:
-                first_available_id += 1
-
-            query = """INSERT INTO users 
-                    (id, username, password, first_name, last_name, date_of_birth, position) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)"""
-            self.cursor.execute(query, (first_available_id, username, hashed_password, first_name, last_name, dob, position))
-            self.db.commit()
-            return True
-        except mysql.connector.Error as err:
-            print(f"Could not register user: {err}")
-            return False
-
-    def verify_user(self, username, password):
-        """
-        Verify user credentials.
-
-        Args:
-            username (str): User's username
-            password (str): User's password
-
-        Returns:
-            int or None: User ID if verification successful, None otherwise
-        """
-        try:
-            query = "SELECT id, password FROM users WHERE username = %s"
-            self.cursor.execute(query, (username,))
-            result = self.cursor.fetchone()
-
-            if result and bcrypt.checkpw(password.encode('utf-8'), result[1].encode('utf-8')):
-                return result[0]
-            return None
-        except mysql.connector.Error as err:
-            print(f"Could not verify user: {err}")
-            return None
-
-    def get_user_data(self, user_id):
-        """
-        Fetch user data from the database.
-
-        Args:
-            user_id (int): User's ID
-
-        Returns:
-            tuple or None: User data if found, None otherwise
-        """
-        query = """SELECT username, first_name, last_name, date_of_birth, position, 
-                email, street, building_number, postal_code, city, jersey_number,
-                primary_position, secondary_position, height, preferred_foot
-                FROM users WHERE id = %s"""
-        self.cursor.execute(query, (user_id,))
-        return self.cursor.fetchone()
-
-    def update_user_profile(self, user_id, user_data):
-        """
-        Update user profile in the database.
-
-        Args:
-            user_id (int): User's ID
-            user_data (list): Updated user data
-
-        Returns:
-            bool: True if update successful, False otherwise
-        """
-        try:
-            query = """UPDATE users SET username=%s, first_name=%s, last_name=%s, date_of_birth=%s, 
-                    position=%s, email=%s, street=%s, building_number=%s, 
-                    postal_code=%s, city=%s,jersey_number=%s, primary_position=%s, secondary_position=%s, 
-                    height=%s, preferred_foot=%s WHERE id=%s"""
-            
-            update_data = user_data + [user_id]
-            self.cursor.execute(query, tuple(update_data))
-            self.db.commit()
-            return True
-        except mysql.connector.Error as err:
-            print(f"Could not update profile: {err}")
-            return False
-
-    def delete_user(self, user_id):
-        """
-        Delete a user from the database.
-
-        Args:
-            user_id (int): User's ID
-
-        Returns:
-            bool: True if deletion successful, False otherwise
-        """
-        try:
-            query = "DELETE FROM users WHERE id = %s"
-            self.cursor.execute(query, (user_id,))
-            self.db.commit()
-            return True
-        except mysql.connector.Error as err:
-            print(f"Could not delete account: {err}")
-            return False
-
-    def get_team_data(self):
-        """
-        Fetch team data from the database.
-
-        Returns:
-            list: List of tuples containing team member data
-        """
-        query = """SELECT first_name, last_name, date_of_birth, position, email,  
-                        street, building_number, postal_code, city, jersey_number, primary_position, secondary_position, 
-                        height, preferred_foot 
-                FROM users 
-                ORDER BY CASE WHEN position='Coach' THEN 0 ELSE 1 END, last_name"""
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
\ No newline at end of file
+# model.py
+
+import logging
+import threading
+import time
+
+from auth import PasswordHasher
+from cache import LRUCache
+from events import DELETE, INSERT, UPDATE, ChangeEvent, EventBus
+from id_allocator import IdAllocator
+from metrics import timed
+from migrations import DEFAULT_TEAM_ID, ROSTER_ORDER
+from records import PROFILE_COLUMNS, TEAM_COLUMNS, Member, Roster
+from storage import MySQLBackend, StorageError
+from validation import PROFILE_SCHEMA, REGISTRATION_SCHEMA, TEAM_SCHEMA, format_errors
+
+
+logger = logging.getLogger("football_team.model")
+
+# Seconds roster reads stay on the local snapshot after the database failed
+OFFLINE_RETRY_SECONDS = 30.0
+
+INSERT_USER = """INSERT INTO users 
+        (id, username, password, first_name, last_name, date_of_birth, position, team_id) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
+
+
+class FootballTeamModel:
+    """
+    The Model component of the Football Team Manager application.
+    Handles all database operations and data manipulation.
+    """
+
+    def __init__(self, backend=None, cache_size=256, cache_ttl=60.0, hasher=None, snapshot=None):
+        """
+        Initialize the model with a storage backend.
+
+        Args:
+            backend (StorageBackend, optional): Backend to use. Defaults to a
+                pooled MySQL backend for the local football_team database.
+            cache_size (int): Maximum number of cached profiles, and of cached
+                roster batches per team
+            cache_ttl (float): Seconds a cached entry stays valid
+            hasher (PasswordHasher, optional): Password hasher. Defaults to one
+                configured from the environment.
+            snapshot (RosterSnapshot, optional): Local roster copy that serves
+                roster and team reads while the database is unreachable
+        """
+        if backend is None:
+            backend = MySQLBackend(
+                host="localhost",
+                user="root",
+                password="",
+                database="football_team"
+            )
+        self.backend = backend
+        self.id_allocator = IdAllocator(lock_clause=backend.lock_clause)
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        # Roster caches keyed by team ID, so a write only invalidates its own team
+        self.team_caches = {}
+        self.team_caches_lock = threading.Lock()
+        self.profile_cache = LRUCache(cache_size, cache_ttl)
+        self.hasher = hasher or PasswordHasher.from_environment()
+        # Publishes a ChangeEvent after every committed insert, update and delete
+        self.events = EventBus()
+        self.snapshot = snapshot
+        # Until this time.monotonic() value, roster reads go straight to the snapshot
+        self.offline_until = 0.0
+
+    def close_connection(self):
+        """
+        Close the database connection.
+        """
+        self.backend.close()
+        if self.snapshot is not None:
+            self.snapshot.close()
+
+    @property
+    def offline(self):
+        """
+        bool: Whether roster reads are served by the snapshot because the database failed recently.
+        """
+        return self.snapshot is not None and time.monotonic() < self.offline_until
+
+    def read_rows(self, query, params=(), local=False):
+        """
+        Run a read-only query on the database, or on the local snapshot.
+
+        The snapshot answers when asked to, and while the database is
+        unreachable: after a failed read, reads skip the database for
+        OFFLINE_RETRY_SECONDS instead of waiting for its retries each time.
+
+        Args:
+            query (str): Query with %s placeholders
+            params (tuple): Query parameters
+            local (bool): Whether to read the snapshot even if the database is up
+
+        Returns:
+            tuple: (list, bool) the rows, and whether they came from the database
+
+        Raises:
+            StorageError: If the database fails and there is no ready snapshot
+        """
+        snapshot = self.snapshot
+        if snapshot is not None and (local or self.offline) and snapshot.ready:
+            return snapshot.query(query, params), False
+        try:
+            with self.backend.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall(), True
+        except StorageError as err:
+            if snapshot is None or not snapshot.ready:
+                raise
+            logger.warning("Database unavailable, reading the local snapshot: %s", err)
+            self.offline_until = time.monotonic() + OFFLINE_RETRY_SECONDS
+            return snapshot.query(query, params), False
+
+    @timed('model')
+    def refresh_snapshot(self):
+        """
+        Bring the local snapshot up to date and announce remote changes.
+
+        Members written by other clients since the last refresh are
+        published as change events, so open team views pick them up; the
+        model's own writes were announced already and repeat harmlessly.
+
+        Returns:
+            list or None: Published ChangeEvent objects, or None if the
+                snapshot was copied completely (or there is no snapshot)
+
+        Raises:
+            StorageError: If the database or the snapshot file fails
+        """
+        if self.snapshot is None:
+            return None
+        events = self.snapshot.refresh(self.backend)
+        self.offline_until = 0.0
+        if events is None:
+            with self.team_caches_lock:
+                caches = list(self.team_caches.values())
+            for cache in caches + [self.profile_cache]:
+                cache.clear()
+            return None
+        for event in events:
+            self.invalidate_caches(event.user_id, event.team_id)
+            self.events.publish(event)
+        return events
+
+    def team_cache(self, team_id):
+        """
+        Get the roster cache of a team, creating it on first use.
+
+        Args:
+            team_id (int): Team ID
+
+        Returns:
+            LRUCache: Cache of the team's roster batches and reports
+        """
+        with self.team_caches_lock:
+            cache = self.team_caches.get(team_id)
+            if cache is None:
+                cache = self.team_caches[team_id] = LRUCache(self.cache_size, self.cache_ttl)
+            return cache
+
+    def invalidate_caches(self, user_id, team_id=None):
+        """
+        Drop cached data affected by a committed write to a user.
+
+        Args:
+            user_id (int): ID of the user that was written
+            team_id (int, optional): Team of the user; every team's roster
+                cache is cleared if omitted
+        """
+        if team_id is None:
+            with self.team_caches_lock:
+                caches = list(self.team_caches.values())
+        else:
+            caches = [self.team_cache(team_id)]
+        for cache in caches:
+            cache.clear()
+        self.profile_cache.invalidate(user_id)
+
+    @timed('model')
+    def register_user(self, username, password, first_name, last_name, dob, position, team_id=DEFAULT_TEAM_ID):
+        """
+        Register a new user in the database.
+
+        Args:
+            username (str): User's username
+            password (str): User's password
+            first_name (str): User's first name
+            last_name (str): User's last name
+            dob (str): User's date of birth
+            position (str): User's position
+            team_id (int): ID of the team the user joins
+
+        Returns:
+            bool: True if registration successful, False otherwise
+        """
+        errors = REGISTRATION_SCHEMA.validate({
+            'username': username, 'password': password, 'first_name': first_name,
+            'last_name': last_name, 'date_of_birth': dob, 'position': position})
+        if errors:
+            print(f"Could not register user: {format_errors(errors, '; ')}")
+            return False
+
+        try:
+            hashed_password = self.hasher.hash(password)
+
+            with self.backend.transaction() as cursor:
+                self.require_teams(cursor, (team_id,))
+                user_id = self.id_allocator.allocate(cursor)
+                cursor.execute(INSERT_USER, (user_id, username, hashed_password, first_name, last_name, dob, position,
+                                             team_id))
+            self.invalidate_caches(user_id, team_id)
+            self.publish_insert(user_id, (username, hashed_password, first_name, last_name, dob, position), team_id)
+            return True
+        except StorageError as err:
+            print(f"Could not register user: {err}")
+            return False
+
+    @timed('model')
+    def insert_users(self, rows, team_id=DEFAULT_TEAM_ID):
+        """
+        Insert several users with already hashed passwords.
+
+        All rows are inserted with one executemany in a single transaction.
+        If that fails (for example on a duplicate username), the rows are
+        retried one by one so only the offending rows are rejected.
+
+        Args:
+            rows (list): Tuples of (username, hashed_password, first_name,
+                last_name, dob, position)
+            team_id (int): ID of the team the users join
+
+        Returns:
+            dict: Error message for each rejected row, keyed by its index in rows;
+                every row is rejected if the team does not exist
+        """
+        try:
+            with self.backend.cursor() as cursor:
+                self.require_teams(cursor, (team_id,))
+        except StorageError as err:
+            return {index: str(err) for index in range(len(rows))}
+
+        errors = {}
+        try:
+            with self.backend.transaction() as cursor:
+                user_ids = self.id_allocator.allocate_many(cursor, len(rows))
+                cursor.executemany(INSERT_USER, [(user_id, *row, team_id) for user_id, row in zip(user_ids, rows)])
+            inserted = list(zip(user_ids, rows))
+        except StorageError:
+            inserted = []
+            for index, row in enumerate(rows):
+                try:
+                    with self.backend.transaction() as cursor:
+                        user_id = self.id_allocator.allocate(cursor)
+                        cursor.execute(INSERT_USER, (user_id, *row, team_id))
+                    inserted.append((user_id, row))
+                except StorageError as err:
+                    errors[index] = str(err)
+
+        self.team_cache(team_id).clear()
+        for user_id, row in inserted:
+            self.profile_cache.invalidate(user_id)
+            self.publish_insert(user_id, row, team_id)
+        return errors
+
+    def require_teams(self, cursor, team_ids):
+        """
+        Make sure teams exist before members are added to them.
+
+        The database does not enforce this on SQLite, where foreign keys are off.
+
+        Args:
+            cursor: Cursor to query with, such as that of the inserting transaction
+            team_ids (iterable): IDs of the teams
+
+        Raises:
+            StorageError: If a team does not exist
+        """
+        team_ids = sorted(set(team_ids))
+        if not team_ids:
+            return
+        cursor.execute(f"SELECT id FROM teams WHERE id IN ({', '.join(['%s'] * len(team_ids))})", tuple(team_ids))
+        missing = set(team_ids) - {team_id for team_id, in cursor.fetchall()}
+        if missing:
+            raise StorageError(f"Team does not exist: {', '.join(str(team_id) for team_id in sorted(missing))}")
+
+    def publish_insert(self, user_id, row, team_id):
+        """
+        Announce a newly inserted user.
+
+        Args:
+            user_id (int): ID of the new user
+            row (tuple): (username, hashed_password, first_name, last_name, dob, position)
+            team_id (int): ID of the user's team
+        """
+        username, _, first_name, last_name, dob, position = row
+        self.events.publish(ChangeEvent(INSERT, user_id, {
+            'username': username, 'first_name': first_name, 'last_name': last_name,
+            'date_of_birth': dob, 'position': position}, team_id))
+
+    @timed('model')
+    def verify_user(self, username, password):
+        """
+        Verify user credentials.
+
+        If the stored hash was made with a different work factor than the
+        hasher's current one, it is replaced by a new hash of the password.
+
+        Args:
+            username (str): User's username
+            password (str): User's password
+
+        Returns:
+            int or None: User ID if verification successful, None otherwise
+        """
+        try:
+            query = "SELECT id, password FROM users WHERE username = %s"
+            with self.backend.cursor() as cursor:
+                cursor.execute(query, (username,))
+                result = cursor.fetchone()
+
+            if not result or not self.hasher.verify(password, result[1]):
+                return None
+            user_id, hashed_password = result
+        except StorageError as err:
+            print(f"Could not verify user: {err}")
+            return None
+
+        if self.hasher.needs_rehash(hashed_password):
+            self.rehash_password(user_id, password, hashed_password)
+        return user_id
+
+    def rehash_password(self, user_id, password, old_hash):
+        """
+        Replace a stored password hash with one made with the current work factor.
+
+        The hash is only replaced if it has not changed since it was read.
+
+        Args:
+            user_id (int): User's ID
+            password (str): The verified plain-text password
+            old_hash (str): Hash the password was verified against
+
+        Returns:
+            bool: True if the hash was replaced, False otherwise
+        """
+        query = "UPDATE users SET password = %s WHERE id = %s AND password = %s"
+        try:
+            with self.backend.transaction() as cursor:
+                cursor.execute(query, (self.hasher.hash(password), user_id, old_hash))
+                return cursor.rowcount > 0
+        except StorageError as err:
+            print(f"Could not rehash password: {err}")
+            return False
+
+    @timed('model')
+    def get_user_data(self, user_id):
+        """
+        Fetch user data from the database.
+
+        Args:
+            user_id (int): User's ID
+
+        Returns:
+            Member or None: The user's profile, row version and team if found, None otherwise
+        """
+        query = """SELECT username, first_name, last_name, date_of_birth, position, 
+                email, street, building_number, postal_code, city, jersey_number,
+                primary_position, secondary_position, height, preferred_foot, version, team_id
+                FROM users WHERE id = %s"""
+        user_data = self.profile_cache.get(user_id)
+        if user_data is not None:
+            return user_data
+
+        generation = self.profile_cache.generation
+        with self.backend.cursor() as cursor:
+            cursor.execute(query, (user_id,))
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        user_data = Member.from_row(PROFILE_COLUMNS + ('version', 'team_id'), row)
+        user_data.id = user_id
+        self.profile_cache.set(user_id, user_data, generation)
+        return user_data
+
+    @timed('model')
+    def update_user_profile(self, user_id, user_data, original=None):
+        """
+        Update user profile in the database.
+
+        When the originally loaded profile is given, only the columns whose
+        values changed are written, and only if the row still has the
+        version it was loaded with. A save without changes does not touch
+        the database. Written values are checked against the profile schema.
+
+        Args:
+            user_id (int): User's ID
+            user_data (dict): Updated values keyed by profile column
+            original (Member, optional): Profile as returned by get_user_data
+
+        Returns:
+            bool: True if update successful, False otherwise
+        """
+        # Column names are written into the query, so only profile columns pass
+        unknown = [column for column in user_data if column not in PROFILE_COLUMNS]
+        if unknown:
+            print(f"Could not update profile: unknown fields: {', '.join(map(str, unknown))}")
+            return False
+
+        if original is None:
+            changes = dict(user_data)
+        else:
+            changes = changed_columns(original, user_data)
+            if not changes:
+                return True
+
+        errors = PROFILE_SCHEMA.validate(changes, partial=True)
+        if errors:
+            print(f"Could not update profile: {format_errors(errors, '; ')}")
+            return False
+
+        try:
+            assignments = ", ".join(f"{column}=%s" for column in changes)
+            query = f"UPDATE users SET {assignments}, version=version+1 WHERE id=%s"
+            params = list(changes.values()) + [user_id]
+            if original is not None:
+                query += " AND version=%s"
+                params.append(original.version)
+
+            with self.backend.transaction() as cursor:
+                cursor.execute(query, tuple(params))
+                updated = cursor.rowcount
+            team_id = original.team_id if original is not None else None
+            self.invalidate_caches(user_id, team_id)
+            if updated:
+                values = changes if original is None else {**original.to_dict(PROFILE_COLUMNS), **changes}
+                self.events.publish(ChangeEvent(UPDATE, user_id, values, team_id))
+            if original is not None and not updated:
+                print("Could not update profile: it was changed by someone else")
+                return False
+            return True
+        except StorageError as err:
+            print(f"Could not update profile: {err}")
+            return False
+
+    @timed('model')
+    def delete_user(self, user_id):
+        """
+        Delete a user from the database.
+
+        Args:
+            user_id (int): User's ID
+
+        Returns:
+            bool: True if deletion successful, False otherwise
+        """
+        try:
+            with self.backend.transaction() as cursor:
+                cursor.execute("SELECT team_id FROM users WHERE id = %s" + self.backend.lock_clause, (user_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    return True
+                cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+                self.id_allocator.release(cursor, user_id)
+            team_id = row[0]
+            self.invalidate_caches(user_id, team_id)
+            self.events.publish(ChangeEvent(DELETE, user_id, team_id=team_id))
+            return True
+        except StorageError as err:
+            print(f"Could not delete account: {err}")
+            return False
+
+    @timed('model')
+    def get_teams(self, local=False):
+        """
+        Fetch every team.
+
+        Args:
+            local (bool): Whether to read the local snapshot instead of the database
+
+        Returns:
+            list: (team ID, name) tuples ordered by ID
+        """
+        rows, _ = self.read_rows("SELECT id, name FROM teams ORDER BY id", local=local)
+        return [tuple(row) for row in rows]
+
+    @timed('model')
+    def create_team(self, name):
+        """
+        Create a team.
+
+        Teams are numbered separately from users. User IDs stay global, so
+        a member keeps the same ID whichever team they are in.
+
+        Args:
+            name (str): Unique team name
+
+        Returns:
+            int or None: ID of the new team, or None if it could not be created
+        """
+        errors = TEAM_SCHEMA.validate({'name': name})
+        if errors:
+            print(f"Could not create team: {format_errors(errors, '; ')}")
+            return None
+
+        try:
+            with self.backend.transaction() as cursor:
+                cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM teams" + self.backend.lock_clause)
+                team_id = cursor.fetchone()[0]
+                cursor.execute("INSERT INTO teams (id, name) VALUES (%s, %s)", (team_id, name))
+            return team_id
+        except StorageError as err:
+            print(f"Could not create team: {err}")
+            return None
+
+    @timed('model')
+    def get_team_data(self, columns=TEAM_COLUMNS, team_id=DEFAULT_TEAM_ID):
+        """
+        Fetch team data from the database.
+
+        Args:
+            columns (tuple): Columns to return, a subset of TEAM_COLUMNS
+            team_id (int): ID of the team
+
+        Returns:
+            Roster: All team members in roster order, with their IDs
+        """
+        roster = Roster(columns)
+        for batch in self.iter_team_batches(columns, team_id=team_id):
+            roster.concat(batch)
+        return roster
+
+    @timed('model')
+    def stream_team_data(self, columns=TEAM_COLUMNS, batch_size=1000, team_id=DEFAULT_TEAM_ID):
+        """
+        Stream team data in roster order through a server-side cursor.
+
+        Unlike iter_team_data, the whole roster is read by a single query and
+        nothing is cached, which suits one-off full scans such as exports.
+        One connection is held until the generator is exhausted or closed.
+
+        Args:
+            columns (tuple): Columns to return, a subset of TEAM_COLUMNS
+            batch_size (int): Number of rows fetched from the server at a time
+            team_id (int): ID of the team
+
+        Yields:
+            tuple: Team member data with the requested columns
+        """
+        self.check_team_columns(columns)
+        query = f"""SELECT {', '.join(columns)} FROM users WHERE team_id = %s
+                ORDER BY {ROSTER_ORDER}"""
+        with self.backend.cursor(buffered=False) as cursor:
+            cursor.execute(query, (team_id,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+
+    def check_team_columns(self, columns):
+        """
+        Reject column names that are not roster columns.
+
+        Args:
+            columns (tuple): Requested column names
+
+        Raises:
+            ValueError: If a column is not in TEAM_COLUMNS
+        """
+        unknown = [column for column in columns if column not in TEAM_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown roster columns: {', '.join(unknown)}")
+
+    @timed('model')
+    def iter_team_data(self, columns=TEAM_COLUMNS, batch_size=500, team_id=DEFAULT_TEAM_ID):
+        """
+        Stream team data from the database in roster order.
+
+        Args:
+            columns (tuple): Columns to return, a subset of TEAM_COLUMNS
+            batch_size (int): Number of rows fetched per query
+            team_id (int): ID of the team
+
+        Yields:
+            tuple: Team member data with the requested columns
+        """
+        for batch in self.iter_team_batches(columns, batch_size, team_id):
+            yield from batch.rows()
+
+    def iter_team_batches(self, columns=TEAM_COLUMNS, batch_size=500, team_id=DEFAULT_TEAM_ID, local=False):
+        """
+        Fetch team data from the database in roster order, one batch at a time.
+
+        Rows are fetched in batches using keyset pagination on
+        (role, last_name, id): each batch is a separate query that resumes
+        after the last row of the previous one, so no connection is held
+        between batches and memory use does not grow with the roster.
+        Only the first batch, which a team view opens on, is cached until the
+        next write to the team; caching every batch would keep a full pass
+        over a large roster in memory.
+
+        Batches come from the local snapshot when asked to, or while the
+        database is unreachable; those are not cached.
+
+        Args:
+            columns (tuple): Columns to return, a subset of TEAM_COLUMNS
+            batch_size (int): Number of rows fetched per query
+            team_id (int): ID of the team
+            local (bool): Whether to read the local snapshot instead of the database
+
+        Yields:
+            Roster: Up to batch_size members with the requested columns and their IDs
+        """
+        self.check_team_columns(columns)
+
+        # The generated role_rank column and the roster index let the
+        # database read each batch in order instead of sorting the table
+        select = f"SELECT {', '.join(columns)}, {ROSTER_ORDER} FROM users WHERE team_id = %s"
+        order = f" ORDER BY {ROSTER_ORDER} LIMIT %s"
+        after = f" AND ({ROSTER_ORDER}) > (%s, %s, %s)"
+        width = len(columns)
+        cache = self.team_cache(team_id)
+
+        key = None
+        while True:
+            cache_key = (columns, batch_size)
+            cached = None if local or key is not None else cache.get(cache_key)
+            if cached is None:
+                generation = cache.generation
+                if key is None:
+                    rows, live = self.read_rows(select + order, (team_id, batch_size), local)
+                else:
+                    rows, live = self.read_rows(select + after + order, (team_id,) + key + (batch_size,), local)
+                batch = Roster.from_rows(columns, (row[:width] for row in rows), (row[-1] for row in rows))
+                last_key = tuple(rows[-1][-3:]) if rows else None
+                if live and key is None:
+                    cache.set(cache_key, (batch, last_key), generation)
+            else:
+                batch, last_key = cached
+
+            yield batch
+            if len(batch) < batch_size:
+                return
+            key = last_key
+
+
+def changed_columns(original, user_data):
+    """
+    Compare edited profile values against the profile as it was loaded.
+
+    Values are compared as text, since form fields return strings while the
+    database returns dates and integers; None and the empty string are equal.
+
+    Args:
+        original (Member): Profile as returned by get_user_data
+        user_data (dict): Edited values keyed by profile column
+
+    Returns:
+        dict: New value for each changed column, in the order of user_data
+    """
+    def as_text(value):
+        return '' if value is None else str(value)
+
+    return {column: new for column, new in user_data.items()
+            if as_text(getattr(original, column)) != as_text(new)}
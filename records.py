@@ -0,0 +1,269 @@
+# records.py
+
+from array import array
+from itertools import islice
+
+
+# Columns of a roster row, in the order returned by the model's roster methods
+TEAM_COLUMNS = ('first_name', 'last_name', 'date_of_birth', 'position', 'email',
+                'street', 'building_number', 'postal_code', 'city', 'jersey_number',
+                'primary_position', 'secondary_position', 'height', 'preferred_foot')
+
+# Columns of a profile, in the order shown in the profile form
+PROFILE_COLUMNS = ('username', 'first_name', 'last_name', 'date_of_birth', 'position',
+                   'email', 'street', 'building_number', 'postal_code', 'city', 'jersey_number',
+                   'primary_position', 'secondary_position', 'height', 'preferred_foot')
+
+# Attributes of a Member
+MEMBER_FIELDS = ('id',) + PROFILE_COLUMNS + ('version', 'team_id')
+
+# Roster columns with few distinct values; a Roster keeps one copy of each value
+SHARED_COLUMNS = frozenset(('position', 'city', 'primary_position', 'secondary_position', 'preferred_foot'))
+
+
+class Member:
+    """
+    One team member.
+
+    Attributes are the user ID, the PROFILE_COLUMNS, the row version and
+    the ID of the member's team.
+    Slots keep the record small; attributes that were not loaded are None.
+    """
+
+    __slots__ = MEMBER_FIELDS
+
+    def __init__(self, **values):
+        """
+        Create a member.
+
+        Args:
+            **values: Attribute values keyed by MEMBER_FIELDS
+        """
+        for field in MEMBER_FIELDS:
+            setattr(self, field, values.pop(field, None))
+        if values:
+            raise TypeError(f"Unknown member fields: {', '.join(values)}")
+
+    @classmethod
+    def from_row(cls, columns, row):
+        """
+        Create a member from a database row.
+
+        Args:
+            columns (tuple): Names of the row's columns
+            row (tuple): Column values
+
+        Returns:
+            Member: New member
+        """
+        return cls(**dict(zip(columns, row)))
+
+    def values(self, columns=PROFILE_COLUMNS):
+        """
+        Get several attributes at once.
+
+        Args:
+            columns (tuple): Attribute names
+
+        Returns:
+            tuple: Attribute values in the given order
+        """
+        return tuple(getattr(self, column) for column in columns)
+
+    def to_dict(self, columns=MEMBER_FIELDS):
+        """
+        Get several attributes keyed by name.
+
+        Args:
+            columns (tuple): Attribute names
+
+        Returns:
+            dict: Attribute values keyed by name
+        """
+        return {column: getattr(self, column) for column in columns}
+
+    def __eq__(self, other):
+        if not isinstance(other, Member):
+            return NotImplemented
+        return self.values(MEMBER_FIELDS) == other.values(MEMBER_FIELDS)
+
+    def __repr__(self):
+        return f"Member(id={self.id!r}, username={self.username!r}, " \
+               f"first_name={self.first_name!r}, last_name={self.last_name!r})"
+
+
+class Roster:
+    """
+    Column-oriented container for team members.
+
+    Each column is stored as one list and user IDs as an integer array, so
+    a roster costs a list slot per value instead of a tuple per member.
+    Values of SHARED_COLUMNS are deduplicated, so every member of a city or
+    position points to the same string. Iterating yields one tuple per
+    member, built on the fly; indexing returns a Member.
+    """
+
+    def __init__(self, columns=TEAM_COLUMNS):
+        """
+        Create an empty roster.
+
+        Args:
+            columns (tuple): Names of the stored columns
+        """
+        self.columns = tuple(columns)
+        self.positions = {column: i for i, column in enumerate(self.columns)}
+        self.data = tuple([] for _ in self.columns)
+        self.ids = array('q')
+        self.shared = {column: {} for column in self.columns if column in SHARED_COLUMNS}
+
+    @classmethod
+    def from_rows(cls, columns, rows, ids=None):
+        """
+        Build a roster from row tuples.
+
+        Args:
+            columns (tuple): Names of the row columns
+            rows (iterable): Row tuples
+            ids (iterable, optional): User ID of each row
+
+        Returns:
+            Roster: New roster
+        """
+        roster = cls(columns)
+        roster.extend(rows, ids)
+        return roster
+
+    def append(self, row, user_id=None):
+        """
+        Add one member.
+
+        Args:
+            row (tuple): Values in column order
+            user_id (int, optional): ID of the member
+        """
+        self.extend((row,), None if user_id is None else (user_id,))
+
+    def extend(self, rows, ids=None):
+        """
+        Add several members.
+
+        Args:
+            rows (iterable): Row tuples in column order
+            ids (iterable, optional): User ID of each row; give IDs for
+                every member of a roster or for none
+        """
+        start = len(self)
+        for row in rows:
+            for column, value in zip(self.data, row):
+                column.append(value)
+        self.share_values(start)
+        if ids is not None:
+            self.ids.extend(ids)
+
+    def extend_columns(self, values, ids=None):
+        """
+        Add several members given column by column.
+
+        Args:
+            values (list): One sequence of values per column, in column order
+            ids (iterable, optional): User ID of each member
+        """
+        start = len(self)
+        for column, column_values in zip(self.data, values):
+            column.extend(column_values)
+        self.share_values(start)
+        if ids is not None:
+            self.ids.extend(ids)
+
+    def share_values(self, start):
+        """
+        Replace repeated values of SHARED_COLUMNS with one shared copy.
+
+        Args:
+            start (int): First position to process
+        """
+        for name, pool in self.shared.items():
+            column = self.data[self.positions[name]]
+            for i in range(start, len(column)):
+                value = column[i]
+                column[i] = pool.setdefault(value, value)
+
+    def concat(self, other):
+        """
+        Append all members of another roster with the same columns.
+
+        Args:
+            other (Roster): Roster to append
+        """
+        if other.columns != self.columns:
+            raise ValueError("Rosters have different columns")
+        self.extend_columns(other.data, other.ids)
+
+    def column(self, name):
+        """
+        Get all values of one column.
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            list: The stored column itself, not a copy
+        """
+        return self.data[self.positions[name]]
+
+    def row(self, index):
+        """
+        Get one member's values.
+
+        Args:
+            index (int): Position in the roster
+
+        Returns:
+            tuple: Values in column order
+        """
+        return tuple(column[index] for column in self.data)
+
+    def rows(self, start=0, stop=None):
+        """
+        Iterate over members' values.
+
+        Args:
+            start (int): First position
+            stop (int, optional): Position to stop before; defaults to the end
+
+        Returns:
+            iterator: Tuples in column order
+        """
+        if start == 0 and stop is None:
+            return zip(*self.data)
+        return zip(*(islice(column, start, stop) for column in self.data))
+
+    def items(self):
+        """
+        Iterate over members' IDs and values.
+
+        Returns:
+            iterator: (user ID, tuple in column order) pairs
+        """
+        return zip(self.ids, self.rows())
+
+    def __len__(self):
+        return len(self.data[0]) if self.data else len(self.ids)
+
+    def __iter__(self):
+        return self.rows()
+
+    def __getitem__(self, index):
+        """
+        Get one member as a record.
+
+        Args:
+            index (int): Position in the roster
+
+        Returns:
+            Member: Member with the roster's columns and ID set
+        """
+        member = Member.from_row(self.columns, self.row(index))
+        if self.ids:
+            member.id = self.ids[index]
+        return member
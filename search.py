@@ -0,0 +1,280 @@
+# search.py
+
+import re
+
+from events import DELETE, INSERT
+from migrations import name_key
+from records import TEAM_COLUMNS
+
+
+# Position of each column in a roster row
+COLUMN_INDEX = {column: i for i, column in enumerate(TEAM_COLUMNS)}
+
+# Columns with an inverted index from value to member IDs
+INDEXED_COLUMNS = ('position', 'primary_position', 'secondary_position', 'preferred_foot')
+
+NAME_COLUMNS = (COLUMN_INDEX['first_name'], COLUMN_INDEX['last_name'])
+JERSEY = COLUMN_INDEX['jersey_number']
+
+_WORD_SEPARATORS = re.compile(r"[\s\-']+")
+
+
+def words(text):
+    """
+    Split a name or a search text into words folded like the roster order,
+    without case or accents, so "emile" finds "Émile".
+
+    Args:
+        text (str): Text to split; None counts as empty
+
+    Returns:
+        list: Non-empty folded words
+    """
+    return [name_key(word) for word in _WORD_SEPARATORS.split(str(text or '')) if word]
+
+
+class _Node:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+class PrefixTrie:
+    """
+    Maps words to member IDs and finds the members with a word starting
+    with a prefix.
+
+    Every node keeps the IDs of its whole subtree, so a lookup walks down
+    the prefix and never visits the subtree below it.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+
+    def add(self, word, user_id):
+        """
+        Index a word of a member.
+
+        Args:
+            word (str): Folded word, as returned by words()
+            user_id (int): ID of the member
+        """
+        node = self.root
+        for char in word:
+            node = node.children.setdefault(char, _Node())
+            node.ids.add(user_id)
+
+    def remove(self, word, user_id):
+        """
+        Forget a word of a member, dropping nodes no other member uses.
+
+        Args:
+            word (str): Folded word, as returned by words()
+            user_id (int): ID of the member
+        """
+        node = self.root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                return
+            child.ids.discard(user_id)
+            if not child.ids:
+                del node.children[char]
+                return
+            node = child
+
+    def find(self, prefix):
+        """
+        Look up the members with a word starting with a prefix.
+
+        Args:
+            prefix (str): Folded prefix, as returned by words()
+
+        Returns:
+            set: Member IDs; must not be modified
+        """
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+
+class RosterIndex:
+    """
+    In-memory indexes over one team's roster for search as you type.
+
+    Names are kept in a PrefixTrie, the INDEXED_COLUMNS in inverted indexes
+    from value to IDs and jersey numbers in a map from number to IDs. A
+    search intersects the ID sets of its criteria, smallest first, so it
+    costs as much as the smallest result rather than a scan of the roster.
+
+    The index keeps a copy of every row and follows change events, so it
+    can stay in step with a team view.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.names = PrefixTrie()
+        self.columns = {column: {} for column in INDEXED_COLUMNS}
+        self.jerseys = {}
+
+    @classmethod
+    def from_items(cls, items):
+        """
+        Index a roster.
+
+        Args:
+            items (iterable): (user ID, tuple in TEAM_COLUMNS order) pairs,
+                such as Roster.items()
+
+        Returns:
+            RosterIndex: The index
+        """
+        index = cls()
+        for user_id, row in items:
+            index.add(user_id, row)
+        return index
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, user_id, row):
+        """
+        Index a member, replacing any previous row of the member.
+
+        Args:
+            user_id (int): ID of the member
+            row (tuple): Values in TEAM_COLUMNS order
+        """
+        self.remove(user_id)
+        self.rows[user_id] = row
+        for word in self.name_words(row):
+            self.names.add(word, user_id)
+        for column, values in self.columns.items():
+            value = row[COLUMN_INDEX[column]]
+            if value not in (None, ''):
+                values.setdefault(value, set()).add(user_id)
+        number = self.jersey(row)
+        if number is not None:
+            self.jerseys.setdefault(number, set()).add(user_id)
+
+    def remove(self, user_id):
+        """
+        Drop a member from the index.
+
+        Args:
+            user_id (int): ID of the member
+        """
+        row = self.rows.pop(user_id, None)
+        if row is None:
+            return
+        for word in self.name_words(row):
+            self.names.remove(word, user_id)
+        for column, values in self.columns.items():
+            self.discard(values, row[COLUMN_INDEX[column]], user_id)
+        self.discard(self.jerseys, self.jersey(row), user_id)
+
+    def update(self, user_id, changes):
+        """
+        Apply changed values to an indexed member.
+
+        A member that is not indexed yet is added if changes holds every
+        roster column, and ignored otherwise.
+
+        Args:
+            user_id (int): ID of the member
+            changes (dict): New values keyed by column; non-roster columns are ignored
+        """
+        row = self.rows.get(user_id)
+        if row is None:
+            if all(column in changes for column in TEAM_COLUMNS):
+                self.add(user_id, tuple(changes[column] for column in TEAM_COLUMNS))
+            return
+        row = list(row)
+        for column, value in changes.items():
+            index = COLUMN_INDEX.get(column)
+            if index is not None:
+                row[index] = value
+        self.add(user_id, tuple(row))
+
+    def apply_event(self, event):
+        """
+        Apply a committed change to the index.
+
+        Args:
+            event (ChangeEvent): Change published by the model
+        """
+        if event.kind == INSERT:
+            self.add(event.user_id, tuple(event.values.get(column) for column in TEAM_COLUMNS))
+        elif event.kind == DELETE:
+            self.remove(event.user_id)
+        else:
+            self.update(event.user_id, event.values)
+
+    def search(self, text='', plays=None, **filters):
+        """
+        Find the members matching every given criterion.
+
+        Args:
+            text (str): Search words. A word of digits matches the jersey
+                number; any other word must start a word of the member's
+                first or last name.
+            plays (str, optional): Position the member plays as primary or
+                secondary position
+            **filters: Exact values for INDEXED_COLUMNS
+
+        Returns:
+            set or None: IDs of the matching members, or None if no criterion was given
+
+        Raises:
+            ValueError: If a filter names a column that is not indexed
+        """
+        candidates = []
+        for word in words(text):
+            if word.isdecimal():
+                candidates.append(self.jerseys.get(int(word), set()))
+            else:
+                candidates.append(self.names.find(word))
+        for column, value in filters.items():
+            if column not in self.columns:
+                raise ValueError(f"Column is not indexed: {column}")
+            if value:
+                candidates.append(self.columns[column].get(value, set()))
+
+        if plays:
+            primary = self.columns['primary_position'].get(plays, set())
+            secondary = self.columns['secondary_position'].get(plays, set())
+            if not candidates:
+                return primary | secondary
+        elif not candidates:
+            return None
+        candidates.sort(key=len)
+        result = candidates[0].intersection(*candidates[1:])
+        if plays:
+            # Checked per remaining member rather than by building the union
+            result = {user_id for user_id in result if user_id in primary or user_id in secondary}
+        return result
+
+    @staticmethod
+    def name_words(row):
+        return {word for index in NAME_COLUMNS for word in words(row[index])}
+
+    @staticmethod
+    def jersey(row):
+        value = row[JERSEY]
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def discard(index, value, user_id):
+        ids = index.get(value)
+        if ids is not None:
+            ids.discard(user_id)
+            if not ids:
+                del index[value]
@@ -0,0 +1,330 @@
+# snapshot.py
+
+import os
+import threading
+from datetime import date
+
+from events import DELETE, INSERT, UPDATE, ChangeEvent
+from records import TEAM_COLUMNS
+from storage import SQLiteBackend
+
+
+# Default location of the snapshot file
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".football_team_snapshot.db")
+
+# Columns copied into the snapshot; password hashes never leave the server
+SNAPSHOT_COLUMNS = ('id', 'team_id', 'username', 'version') + TEAM_COLUMNS
+
+# Largest number of IDs in one ... IN (...) statement
+CHUNK_SIZE = 500
+
+# Rows fetched from the server at a time during a full reload
+RELOAD_BATCH_SIZE = 5000
+
+# Change log entries re-read before the marker. Auto-increment values are
+# assigned before commit, so a transaction can commit after a later one;
+# re-reading a window catches it, and the diff makes re-reads free
+CHANGE_OVERLAP = 1000
+
+# Change log entries kept on the server; older ones are pruned by refresh
+CHANGE_LOG_SIZE = 100000
+
+STATE_TABLE = """CREATE TABLE IF NOT EXISTS snapshot_state (
+    name VARCHAR(50) PRIMARY KEY,
+    value INT NOT NULL
+)"""
+
+INSERT_MEMBER = f"""INSERT INTO users ({', '.join(SNAPSHOT_COLUMNS)}, password)
+        VALUES ({', '.join(['%s'] * len(SNAPSHOT_COLUMNS))}, '')"""
+
+# Connection-private table a full reload is copied into before it replaces users
+RELOAD_TABLE = f"CREATE TEMP TABLE snapshot_reload AS SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM users WHERE 0"
+
+INSERT_RELOAD = f"""INSERT INTO snapshot_reload ({', '.join(SNAPSHOT_COLUMNS)})
+        VALUES ({', '.join(['%s'] * len(SNAPSHOT_COLUMNS))})"""
+
+
+def snapshot_row(row):
+    """
+    Convert a server row to the values stored in the snapshot.
+
+    Args:
+        row (tuple): Values in SNAPSHOT_COLUMNS order
+
+    Returns:
+        tuple: The row with dates as ISO strings, as SQLite returns them
+    """
+    return tuple(value.isoformat() if isinstance(value, date) else value for value in row)
+
+
+def prune_changes(backend, keep=CHANGE_LOG_SIZE):
+    """
+    Delete all but the newest entries of the change log.
+
+    Snapshots whose marker falls before the kept entries reload completely
+    on their next refresh.
+
+    Args:
+        backend (StorageBackend): Backend of the server database
+        keep (int): Number of entries to keep
+
+    Returns:
+        int: Number of deleted entries
+    """
+    with backend.transaction() as cursor:
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM roster_changes")
+        newest = cursor.fetchone()[0]
+        cursor.execute("DELETE FROM roster_changes WHERE seq <= %s", (newest - keep,))
+        return cursor.rowcount
+
+
+class RosterSnapshot:
+    """
+    Local copy of every team's roster, kept in an SQLite file.
+
+    The file has the same schema as the server database, so the model's
+    roster queries run on it unchanged. It serves the team view at startup
+    before the server has answered, and every roster read while the server
+    is unreachable.
+
+    refresh() brings the copy up to date incrementally: the server logs the
+    ID of every written user in roster_changes, and only users logged after
+    the snapshot's marker are fetched again. The first refresh, and one
+    after the log was pruned past the marker, copies everything.
+    """
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH):
+        """
+        Open the snapshot file, creating it if needed.
+
+        Args:
+            path (str): Snapshot file path, or ":memory:" for a private snapshot
+
+        Raises:
+            StorageError: If the file cannot be opened
+        """
+        self.path = path
+        self.backend = SQLiteBackend(path)
+        with self.backend.transaction() as cursor:
+            cursor.execute(STATE_TABLE)
+        # Serializes refreshes; reads only take the backend's own lock
+        self.refresh_lock = threading.Lock()
+        # Kept in memory so checking it never waits for a refresh
+        self.loaded = self.marker is not None
+
+    @classmethod
+    def from_environment(cls):
+        """
+        Open the snapshot file named by FOOTBALL_TEAM_SNAPSHOT, or the default one.
+
+        Returns:
+            RosterSnapshot: The snapshot
+        """
+        return cls(os.environ.get("FOOTBALL_TEAM_SNAPSHOT") or DEFAULT_SNAPSHOT_PATH)
+
+    @property
+    def marker(self):
+        """
+        int or None: Last change log seq the snapshot includes, or None before the first refresh.
+        """
+        with self.backend.cursor() as cursor:
+            cursor.execute("SELECT value FROM snapshot_state WHERE name = 'last_change'")
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    @property
+    def ready(self):
+        """
+        bool: Whether the snapshot holds a complete copy to read from.
+        """
+        return self.loaded
+
+    def query(self, query, params=()):
+        """
+        Run a read-only query on the snapshot.
+
+        Args:
+            query (str): Query with %s placeholders
+            params (tuple): Query parameters
+
+        Returns:
+            list: Result rows
+        """
+        with self.backend.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+    def refresh(self, source):
+        """
+        Bring the snapshot up to date with the server.
+
+        Args:
+            source (StorageBackend): Backend of the server database
+
+        Returns:
+            list or None: ChangeEvent for every member that was added,
+                changed or removed since the last refresh, or None if the
+                snapshot was copied completely
+
+        Raises:
+            StorageError: If the server or the snapshot file fails
+        """
+        with self.refresh_lock:
+            marker = self.marker
+            oldest, newest = self.change_bounds(source)
+            if newest - oldest >= 2 * CHANGE_LOG_SIZE:
+                prune_changes(source)
+                # The marker may now fall in the pruned range
+                oldest, newest = self.change_bounds(source)
+
+            if marker is None or oldest > marker + 1:
+                self.reload(source, newest)
+                return None
+            if newest <= marker:
+                return []
+
+            with source.cursor() as cursor:
+                cursor.execute("SELECT DISTINCT user_id FROM roster_changes WHERE seq > %s AND seq <= %s",
+                               (max(marker - CHANGE_OVERLAP, 0), newest))
+                user_ids = [user_id for user_id, in cursor.fetchall()]
+            teams = self.fetch_teams(source)
+
+            remote, local = {}, {}
+            for start in range(0, len(user_ids), CHUNK_SIZE):
+                chunk = user_ids[start:start + CHUNK_SIZE]
+                remote.update((row[0], row) for row in self.fetch_members(source, chunk))
+                local.update((row[0], row) for row in self.fetch_members(self.backend, chunk))
+            changed = [user_id for user_id in user_ids if remote.get(user_id) != local.get(user_id)]
+
+            # One transaction, deletes first, so a username that moved from
+            # one member to another never exists twice
+            with self.backend.transaction() as cursor:
+                for start in range(0, len(changed), CHUNK_SIZE):
+                    chunk = changed[start:start + CHUNK_SIZE]
+                    marks = ", ".join(["%s"] * len(chunk))
+                    cursor.execute(f"DELETE FROM users WHERE id IN ({marks})", tuple(chunk))
+                cursor.executemany(INSERT_MEMBER, [remote[user_id] for user_id in changed if user_id in remote])
+                # Writes to the snapshot are logged by its own triggers; nobody reads them
+                cursor.execute("DELETE FROM roster_changes")
+                self.write_teams(cursor, teams)
+                self.write_marker(cursor, newest)
+            return [event for user_id in changed for event in self.change_events(user_id, local, remote)]
+
+    def change_bounds(self, source):
+        """
+        Read the oldest and newest seq of the server's change log.
+
+        Args:
+            source (StorageBackend): Backend of the server database
+
+        Returns:
+            tuple: (oldest, newest), both 0 when the log is empty
+        """
+        with source.cursor() as cursor:
+            cursor.execute("SELECT COALESCE(MIN(seq), 0), COALESCE(MAX(seq), 0) FROM roster_changes")
+            return tuple(cursor.fetchone())
+
+    def change_events(self, user_id, local, remote):
+        """
+        Describe how a member changed between the snapshot and the server.
+
+        Args:
+            user_id (int): ID of the member
+            local (dict): Snapshot rows in SNAPSHOT_COLUMNS order, keyed by ID
+            remote (dict): Server rows in SNAPSHOT_COLUMNS order, keyed by ID
+
+        Returns:
+            list: ChangeEvent objects; a member that moved to another team
+                is removed from the old team and added to the new one
+        """
+        old, new = local.get(user_id), remote.get(user_id)
+        if new is None:
+            return [ChangeEvent(DELETE, user_id, team_id=old[1])]
+        values = dict(zip(('username',) + TEAM_COLUMNS, new[2:3] + new[4:]))
+        if old is not None and old[1] == new[1]:
+            return [ChangeEvent(UPDATE, user_id, values, new[1])]
+        events = [ChangeEvent(DELETE, user_id, team_id=old[1])] if old is not None else []
+        return events + [ChangeEvent(INSERT, user_id, values, new[1])]
+
+    def reload(self, source, marker):
+        """
+        Replace the snapshot with a complete copy of the server's roster.
+
+        The server's rows are streamed into a temporary table, one batch
+        per transaction, and replace users in a last local transaction, so
+        reads of the snapshot only wait for one batch or the swap.
+
+        Args:
+            source (StorageBackend): Backend of the server database
+            marker (int): Newest change log seq, read before copying
+        """
+        teams = self.fetch_teams(source)
+        columns = ', '.join(SNAPSHOT_COLUMNS)
+        with self.backend.transaction() as local:
+            local.execute("DROP TABLE IF EXISTS temp.snapshot_reload")
+            local.execute(RELOAD_TABLE)
+        try:
+            with source.cursor(buffered=False) as cursor:
+                cursor.execute(f"SELECT {columns} FROM users")
+                while True:
+                    rows = cursor.fetchmany(RELOAD_BATCH_SIZE)
+                    if not rows:
+                        break
+                    with self.backend.transaction() as local:
+                        local.executemany(INSERT_RELOAD, [snapshot_row(row) for row in rows])
+
+            with self.backend.transaction() as local:
+                local.execute("DELETE FROM users")
+                local.execute(f"INSERT INTO users ({columns}, password) SELECT {columns}, '' FROM snapshot_reload")
+                local.execute("DELETE FROM roster_changes")
+                self.write_teams(local, teams)
+                self.write_marker(local, marker)
+            self.loaded = True
+        finally:
+            with self.backend.transaction() as local:
+                local.execute("DROP TABLE IF EXISTS temp.snapshot_reload")
+
+    def fetch_members(self, backend, user_ids):
+        """
+        Read some members in SNAPSHOT_COLUMNS order.
+
+        Args:
+            backend (StorageBackend): Server backend or the snapshot's own
+            user_ids (list): IDs of the members
+
+        Returns:
+            list: Rows of the members that exist, as stored in the snapshot
+        """
+        marks = ", ".join(["%s"] * len(user_ids))
+        with backend.cursor() as cursor:
+            cursor.execute(f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM users WHERE id IN ({marks})",
+                           tuple(user_ids))
+            return [snapshot_row(row) for row in cursor.fetchall()]
+
+    def fetch_teams(self, source):
+        """
+        Read every team from the server.
+
+        Args:
+            source (StorageBackend): Backend of the server database
+
+        Returns:
+            list: (team ID, name) tuples
+        """
+        with source.cursor() as cursor:
+            cursor.execute("SELECT id, name FROM teams")
+            return [tuple(row) for row in cursor.fetchall()]
+
+    def write_teams(self, cursor, teams):
+        cursor.execute("DELETE FROM teams")
+        cursor.executemany("INSERT INTO teams (id, name) VALUES (%s, %s)", teams)
+
+    def write_marker(self, cursor, marker):
+        cursor.execute("DELETE FROM snapshot_state WHERE name = 'last_change'")
+        cursor.execute("INSERT INTO snapshot_state (name, value) VALUES ('last_change', %s)", (marker,))
+
+    def close(self):
+        """
+        Close the snapshot file.
+        """
+        self.backend.close()
@@ -0,0 +1,53 @@
+# startup.py
+
+import logging
+import os
+import time
+
+import metrics
+
+
+logger = logging.getLogger("football_team.startup")
+
+# Reference point for all startup timings: when this module was first imported
+_started = time.perf_counter()
+_last = _started
+_phases = []
+
+
+def mark(phase):
+    """
+    Record that a startup phase has finished.
+
+    The time since the previous mark is stored under the phase name and
+    added to the metrics registry as a "startup" operation.
+
+    Args:
+        phase (str): Name of the finished phase
+    """
+    global _last
+    now = time.perf_counter()
+    _phases.append((phase, now - _last, now - _started))
+    metrics.registry.observe("startup", phase, now - _last)
+    _last = now
+
+
+def report():
+    """
+    Build a table of the recorded startup phases.
+
+    Returns:
+        str: One line per phase with its own and cumulative time
+    """
+    lines = [f"{'phase':<28}{'ms':>10}{'total ms':>12}"]
+    for phase, seconds, total in _phases:
+        lines.append(f"{phase:<28}{seconds * 1000:>10.1f}{total * 1000:>12.1f}")
+    return "\n".join(lines)
+
+
+def log_report():
+    """
+    Log the startup report if FOOTBALL_TEAM_STARTUP_REPORT is set.
+    """
+    if os.environ.get("FOOTBALL_TEAM_STARTUP_REPORT"):
+        logger.warning("Startup timings:\n%s", report())
@@ -0,0 +1,512 @@
+# storage.py
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+
+from metrics import InstrumentedCursor, registry, statement_label
+from migrations import NAME_COLLATION, apply_migrations, compare_names
+
+
+class StorageError(Exception):
+    """
+    Raised by a storage backend when the underlying database driver fails.
+    """
+
+
+class StorageBackend:
+    """
+    Base class for the storage backends used by FootballTeamModel.
+
+    A backend hands out a fresh cursor per operation, so callers never share
+    cursor state. Queries are always written with %s placeholders; backends
+    translate them for their driver if needed.
+
+    Pending schema migrations are applied the first time a backend
+    connects, so every entry point works on the current schema.
+    """
+
+    # SQL dialect, used to pick dialect-specific migration statements
+    dialect = None
+
+    # Row-locking suffix appended to SELECTs that reserve rows
+    lock_clause = ""
+
+    # Set once ensure_schema has started; guarded by the backend's schema_lock
+    schema_state = None
+
+    def connect(self):
+        """
+        Open the database connection ahead of the first operation.
+        Backends that connect lazily do it here; others do nothing.
+        """
+
+    def connection(self):
+        """
+        Context manager yielding a database connection for one operation.
+        """
+        raise NotImplementedError
+
+    def ensure_schema(self):
+        """
+        Apply pending migrations once per backend.
+
+        Other threads wait until the migrations are done. Operations the
+        migrations themselves run on this thread do not wait.
+        """
+        with self.schema_lock:
+            if self.schema_state is not None:
+                return
+            self.schema_state = 'migrating'
+            try:
+                apply_migrations(self)
+            except BaseException:
+                self.schema_state = None
+                raise
+            self.schema_state = 'ready'
+
+    def close(self):
+        """
+        Release every connection held by the backend.
+        """
+        raise NotImplementedError
+
+    def new_cursor(self, conn, buffered=True, transaction=False):
+        """
+        Open a cursor on a connection.
+
+        Args:
+            conn: Connection obtained from connection()
+            buffered (bool): Whether the whole result is fetched on execute
+            transaction (bool): Whether the cursor's statements form one transaction
+
+        Returns:
+            object: Driver cursor
+        """
+        return conn.cursor()
+
+    def close_cursor(self, conn, cursor):
+        """
+        Close a cursor, discarding any rows that were not read.
+
+        Args:
+            conn: Connection the cursor belongs to
+            cursor: Driver cursor
+        """
+        cursor.close()
+
+    def wrap_cursor(self, cursor):
+        """
+        Adapt a driver cursor to the %s placeholder style.
+
+        Args:
+            cursor: Cursor returned by the driver
+
+        Returns:
+            object: Cursor accepting %s-style queries
+        """
+        return cursor
+
+    @contextmanager
+    def cursor(self, buffered=True):
+        """
+        Yield a cursor for a read-only operation.
+
+        Args:
+            buffered (bool): False for a server-side cursor that streams rows
+                with fetchmany() instead of loading the whole result
+        """
+        with self.connection() as conn:
+            cursor = self.new_cursor(conn, buffered)
+            instrumented = InstrumentedCursor(self.wrap_cursor(cursor))
+            try:
+                yield instrumented
+            except self.driver_error as err:
+                raise StorageError(err) from err
+            finally:
+                instrumented.flush()
+                self.close_cursor(conn, cursor)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Yield a cursor whose statements are committed together on success
+        and rolled back if anything inside the block raises.
+        """
+        with self.connection() as conn:
+            cursor = self.new_cursor(conn, transaction=True)
+            instrumented = InstrumentedCursor(self.wrap_cursor(cursor))
+            try:
+                yield instrumented
+                conn.commit()
+            except BaseException as err:
+                conn.rollback()
+                if isinstance(err, self.driver_error):
+                    raise StorageError(err) from err
+                raise
+            finally:
+                instrumented.flush()
+                self.close_cursor(conn, cursor)
+
+
+class MySQLBackend(StorageBackend):
+    """
+    MySQL storage backend built on a bounded connection pool.
+
+    Each operation checks a connection out of the pool and returns it when
+    done. When every connection is busy, callers wait for one to be released
+    instead of failing. The pool pings a connection as it is checked out and
+    reconnects it if the server dropped it (for example after wait_timeout);
+    failed checkouts, and connections lost in the middle of a read, are
+    retried a bounded number of times with exponential backoff.
+
+    Statements run by buffered cursors are prepared once per connection and
+    reused from a per-connection cache, so sessions are not reset when a
+    connection goes back to the pool.
+
+    Neither mysql.connector nor the pool is loaded until the first
+    operation (or an explicit connect()), so creating the backend is cheap
+    and does not fail when the server is unreachable.
+    """
+
+    # Replaced by mysql.connector.Error once the driver is imported
+    driver_error = ()
+    dialect = 'mysql'
+    lock_clause = " FOR UPDATE"
+
+    # Client error numbers meaning the connection to the server is gone
+    disconnect_errors = frozenset((2006, 2013, 2055))
+
+    def __init__(self, pool_size=5, pool_name="football_team", max_retries=3, retry_delay=0.1,
+                 max_retry_delay=2.0, max_statements=64, **config):
+        """
+        Initialize the backend without connecting.
+
+        Args:
+            pool_size (int): Maximum number of open connections
+            pool_name (str): Name of the connection pool
+            max_retries (int): Connection attempts after the first one fails
+            retry_delay (float): Seconds to wait before the first retry; doubled on each retry
+            max_retry_delay (float): Longest wait between retries
+            max_statements (int): Prepared statements kept per connection
+            **config: Connection arguments passed to mysql.connector
+        """
+        self.pool_size = pool_size
+        self.pool_name = pool_name
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_statements = max_statements
+        self.config = config
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(pool_size)
+        # Prepared statement caches keyed by server connection ID
+        self.statements = OrderedDict()
+        self.schema_lock = threading.RLock()
+
+    def connect(self):
+        """
+        Import the driver, create the connection pool and apply pending
+        migrations if not done yet.
+
+        Returns:
+            MySQLConnectionPool: The connection pool
+        """
+        with self.pool_lock:
+            if self.pool is None:
+                import mysql.connector
+                from mysql.connector import pooling
+
+                self.driver_error = mysql.connector.Error
+                try:
+                    self.pool = pooling.MySQLConnectionPool(pool_name=self.pool_name, pool_size=self.pool_size,
+                                                            pool_reset_session=False, **self.config)
+                except mysql.connector.Error as err:
+                    raise StorageError(f"Could not connect to database: {err}") from err
+            pool = self.pool
+        if self.schema_state != 'ready':
+            self.ensure_schema()
+        return pool
+
+    def backoff(self, attempt):
+        """
+        Compute the wait before a retry.
+
+        Args:
+            attempt (int): Number of retries made so far
+
+        Returns:
+            float: Seconds to wait
+        """
+        return min(self.retry_delay * 2 ** attempt, self.max_retry_delay)
+
+    def is_disconnect(self, err):
+        """
+        Tell whether a driver error means the connection was lost.
+
+        Args:
+            err (Exception): Driver error
+
+        Returns:
+            bool: True if the statement may succeed on a new connection
+        """
+        return getattr(err, 'errno', None) in self.disconnect_errors
+
+    @contextmanager
+    def connection(self):
+        pool = self.connect()
+        self.slots.acquire()
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    conn = pool.get_connection()
+                    break
+                except self.driver_error as err:
+                    if attempt == self.max_retries:
+                        raise StorageError(f"Could not connect to database: {err}") from err
+                    registry.increment("connection", "checkout_retries")
+                    time.sleep(self.backoff(attempt))
+            try:
+                yield conn
+            finally:
+                conn.close()
+        finally:
+            self.slots.release()
+
+    def reconnect(self, conn):
+        """
+        Re-establish a lost connection, retrying with backoff.
+
+        Args:
+            conn: Connection obtained from connection()
+        """
+        self.statements.pop(conn.connection_id, None)
+        for attempt in range(self.max_retries + 1):
+            try:
+                conn.reconnect(attempts=1)
+                registry.increment("connection", "reconnects")
+                return
+            except self.driver_error as err:
+                if attempt == self.max_retries:
+                    raise StorageError(f"Could not reconnect to database: {err}") from err
+                time.sleep(self.backoff(attempt))
+
+    def prepared_statement(self, conn, query):
+        """
+        Get the prepared statement for a query on a connection, preparing it on first use.
+
+        Args:
+            conn: Connection obtained from connection()
+            query (str): Statement text with %s placeholders
+
+        Returns:
+            tuple: The statement text to execute and the prepared cursor
+                holding it; the driver reuses the statement only when given
+                this same string object
+        """
+        connection_id = conn.connection_id
+        with self.pool_lock:
+            cache = self.statements.get(connection_id)
+            if cache is None:
+                cache = self.statements[connection_id] = OrderedDict()
+                # Forget connections replaced by the pool's own reconnects
+                while len(self.statements) > 2 * self.pool_size:
+                    self.statements.popitem(last=False)
+
+        entry = cache.get(query)
+        if entry is not None:
+            cache.move_to_end(query)
+            registry.increment("statement_reuses", statement_label(query))
+            return entry
+
+        entry = cache[query] = (query, conn.cursor(prepared=True))
+        registry.increment("statement_prepares", statement_label(query))
+        if len(cache) > self.max_statements:
+            _, (_, evicted) = cache.popitem(last=False)
+            evicted.close()
+        return entry
+
+    def new_cursor(self, conn, buffered=True, transaction=False):
+        if buffered:
+            # Outside a transaction a statement whose connection was lost
+            # can safely be run again on the reconnected session
+            return _PreparedCursor(self, conn, retry=not transaction)
+        return conn.cursor(buffered=False)
+
+    def close_cursor(self, conn, cursor):
+        if conn.unread_result:
+            conn.consume_results()
+        cursor.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.statements.clear()
+            self.pool._remove_connections()
+
+
+# Statements that MySQL's binary protocol can prepare and that are worth caching
+PREPARABLE_VERBS = frozenset(('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE'))
+
+
+def _statement_verb(query):
+    return query.lstrip().split(None, 1)[0].upper() if query.strip() else ""
+
+
+class _PreparedCursor:
+    """
+    MySQL cursor running each statement through its connection's prepared
+    statement cache.
+
+    Results are fetched completely on execute, like a buffered cursor, so a
+    cached statement never leaves unread rows on the connection. executemany
+    uses a plain cursor, which sends multi-row INSERTs as a single statement.
+    Statements the server cannot prepare, such as CREATE TRIGGER and
+    EXPLAIN, also run on the plain cursor.
+    """
+
+    def __init__(self, backend, conn, retry):
+        """
+        Initialize the cursor.
+
+        Args:
+            backend (MySQLBackend): Backend owning the statement caches
+            conn: Connection obtained from connection()
+            retry (bool): Whether to reconnect and run a statement again if
+                the connection was lost
+        """
+        self._backend = backend
+        self._conn = conn
+        self._retry = retry
+        self._plain = None
+        self._rows = []
+        self._offset = 0
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, query, params=()):
+        try:
+            self._run(query, params)
+        except self._backend.driver_error as err:
+            if not (self._retry and self._backend.is_disconnect(err)):
+                raise
+            self._backend.reconnect(self._conn)
+            self._run(query, params)
+
+    def _run(self, query, params):
+        if _statement_verb(query) in PREPARABLE_VERBS:
+            sql, cursor = self._backend.prepared_statement(self._conn, query)
+        else:
+            sql, cursor = query, self._plain_cursor()
+        cursor.execute(sql, tuple(params))
+        self.description = cursor.description
+        self._rows = cursor.fetchall() if cursor.description else []
+        self._offset = 0
+        self.rowcount = len(self._rows) if cursor.description else cursor.rowcount
+        self.lastrowid = cursor.lastrowid
+
+    def _plain_cursor(self):
+        if self._plain is None:
+            self._plain = self._conn.cursor(buffered=True)
+        return self._plain
+
+    def executemany(self, query, seq_of_params):
+        self._plain_cursor().executemany(query, seq_of_params)
+        self.description = None
+        self._rows = []
+        self.rowcount = self._plain.rowcount
+        self.lastrowid = self._plain.lastrowid
+
+    def fetchone(self):
+        if self._offset >= len(self._rows):
+            return None
+        row = self._rows[self._offset]
+        self._offset += 1
+        return row
+
+    def fetchmany(self, size):
+        rows = self._rows[self._offset:self._offset + size]
+        self._offset += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._offset:]
+        self._offset = len(self._rows)
+        return rows
+
+    def close(self):
+        # Cached prepared statements stay open for the next operation
+        if self._plain is not None:
+            self._plain.close()
+
+
+@lru_cache(maxsize=512)
+def _sqlite_placeholders(query):
+    return query.replace('%s', '?')
+
+
+class _SQLiteCursor:
+    """
+    Thin cursor wrapper translating %s placeholders to sqlite3's ? style.
+
+    Translations are cached, so a repeated query reaches sqlite3 as the same
+    text and hits the connection's compiled statement cache.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        return self._cursor.execute(_sqlite_placeholders(query), params)
+
+    def executemany(self, query, seq_of_params):
+        return self._cursor.executemany(_sqlite_placeholders(query), seq_of_params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Embedded SQLite storage backend.
+
+    Runs the same queries as the MySQL backend in-process, which makes it
+    suitable for tests, benchmarks and offline deployments. The single
+    connection is serialized with a lock so it can be used from any thread.
+    sqlite3 keeps compiled statements in a per-connection cache, which is
+    sized to hold every statement the model runs.
+    """
+
+    driver_error = sqlite3.Error
+    dialect = 'sqlite'
+
+    def __init__(self, path=":memory:"):
+        """
+        Open the database file and apply pending migrations.
+
+        Args:
+            path (str): Database file path, or ":memory:" for a private database
+        """
+        self.lock = threading.RLock()
+        self.schema_lock = threading.RLock()
+        try:
+            self.db = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+            self.db.create_collation(NAME_COLLATION, compare_names)
+            self.ensure_schema()
+        except (sqlite3.Error, StorageError) as err:
+            raise StorageError(f"Could not open database: {err}") from err
+
+    @contextmanager
+    def connection(self):
+        with self.lock:
+            yield self.db
+
+    def wrap_cursor(self, cursor):
+        return _SQLiteCursor(cursor)
+
+    def close(self):
+        self.db.close()
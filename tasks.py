@@ -0,0 +1,142 @@
+# tasks.py
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Task:
+    """
+    Handle for a call running on the TaskRunner's worker pool.
+    """
+
+    def __init__(self, future, on_success, on_error, on_done):
+        self.future = future
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_done = on_done
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Cancel the task. If it is already running it finishes in the
+        background, but none of its callbacks are called.
+        """
+        self.cancelled = True
+        self.future.cancel()
+
+    def done(self):
+        """
+        Check whether the task has finished or been cancelled.
+
+        Returns:
+            bool: True if no callbacks are pending
+        """
+        return self.cancelled or self.future.done()
+
+
+class TaskRunner:
+    """
+    Runs blocking calls (bcrypt hashing, database round trips) on a worker
+    pool and delivers their results back on the Tk main loop.
+
+    Worker threads never touch Tk. The runner polls pending tasks with
+    root.after and calls their callbacks on the main thread. Worker threads
+    can also hand any call over to the main thread with call_soon.
+    """
+
+    def __init__(self, root, max_workers=4, poll_interval=20):
+        """
+        Initialize the task runner.
+
+        Args:
+            root: The root window whose event loop receives results
+            max_workers (int): Number of worker threads
+            poll_interval (int): Milliseconds between checks for finished tasks
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ftm-worker")
+        self.pending = []
+        self.calls = queue.SimpleQueue()
+        self.polling = False
+
+    def submit(self, func, *args, on_success=None, on_error=None, on_done=None):
+        """
+        Run func(*args) on the worker pool.
+
+        Args:
+            func (callable): Blocking function to run
+            *args: Arguments passed to func
+            on_success (callable, optional): Called with the result
+            on_error (callable, optional): Called with the raised exception
+            on_done (callable, optional): Called after either of the above
+
+        Returns:
+            Task: Handle that can be used to cancel the task
+        """
+        task = Task(self.executor.submit(func, *args), on_success, on_error, on_done)
+        self.pending.append(task)
+        self._start_polling()
+        return task
+
+    def call_soon(self, func, *args):
+        """
+        Run func(*args) on the main loop. Safe to call from any thread.
+
+        Calls made by a running task are delivered before that task's own
+        callbacks.
+
+        Args:
+            func (callable): Function to call
+            *args: Arguments passed to func
+        """
+        self.calls.put((func, args))
+        if threading.current_thread() is threading.main_thread():
+            self._start_polling()
+
+    def _start_polling(self):
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """
+        Deliver the results of finished tasks on the main thread.
+        """
+        # Collect finished tasks first, so the calls they made are run before their callbacks
+        finished = []
+        still_pending = []
+        for task in self.pending:
+            (finished if task.done() else still_pending).append(task)
+        self.pending = still_pending
+
+        while not self.calls.empty():
+            func, args = self.calls.get()
+            func(*args)
+
+        for task in finished:
+            if task.cancelled:
+                continue
+            error = task.future.exception()
+            if error is None:
+                if task.on_success:
+                    task.on_success(task.future.result())
+            elif task.on_error:
+                task.on_error(error)
+            if task.on_done:
+                task.on_done()
+
+        if self.pending or not self.calls.empty():
+            self.root.after(self.poll_interval, self._poll)
+        else:
+            self.polling = False
+
+    def shutdown(self):
+        """
+        Cancel pending tasks and stop the worker pool without waiting.
+        """
+        for task in self.pending:
+            task.cancel()
+        self.pending = []
+        self.executor.shutdown(wait=False, cancel_futures=True)
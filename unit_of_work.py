@@ -0,0 +1,373 @@
+# unit_of_work.py
+
+import threading
+
+from events import DELETE, UPDATE, ChangeEvent
+from metrics import timed
+from migrations import DEFAULT_TEAM_ID
+from model import INSERT_USER, changed_columns
+from records import PROFILE_COLUMNS
+from storage import StorageError
+from validation import PROFILE_SCHEMA, REGISTRATION_SCHEMA, format_errors
+
+
+# Largest number of IDs in one DELETE ... IN statement
+DELETE_CHUNK_SIZE = 500
+
+
+class ConflictError(StorageError):
+    """
+    Raised while committing when a versioned update finds that its row was
+    changed by someone else.
+    """
+
+
+class UnitOfWork:
+    """
+    Collects inserts, updates and deletes and writes them in one transaction.
+
+    Nothing touches the database until commit(). Operations are grouped by
+    kind: every registration is inserted by one executemany, updates that
+    set the same columns share one executemany, and deletes run as
+    DELETE ... IN statements. The groups are written in that order, so
+    updates and deletes refer to users that existed before the unit.
+
+    If any statement fails, or a versioned update finds that its row
+    changed, the whole unit is rolled back. Caches are invalidated and
+    change events published only once the transaction has committed.
+
+    As a context manager, the unit commits when the block ends normally and
+    is discarded when the block raises.
+    """
+
+    def __init__(self, model):
+        """
+        Initialize an empty unit of work.
+
+        Args:
+            model (FootballTeamModel): Model whose backend, caches and events are used
+        """
+        self.model = model
+        self.inserts = []
+        # Queued changes and the originally loaded profile, keyed by user ID
+        self.updates = {}
+        self.deletes = {}
+
+    def __len__(self):
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+    def register(self, username, password, first_name, last_name, dob, position, team_id=DEFAULT_TEAM_ID):
+        """
+        Queue the registration of a new user.
+
+        Args:
+            username (str): User's username
+            password (str): User's password; hashed when the unit is committed
+            first_name (str): User's first name
+            last_name (str): User's last name
+            dob (str): User's date of birth
+            position (str): User's position
+            team_id (int): ID of the team the user joins
+
+        Raises:
+            ValueError: If the registration is invalid
+        """
+        errors = REGISTRATION_SCHEMA.validate({
+            'username': username, 'password': password, 'first_name': first_name,
+            'last_name': last_name, 'date_of_birth': dob, 'position': position})
+        if errors:
+            raise ValueError(format_errors(errors, '; '))
+        self.inserts.append(((username, password, first_name, last_name, dob, position), team_id))
+
+    def update(self, user_id, user_data, original=None):
+        """
+        Queue a profile update.
+
+        As with FootballTeamModel.update_user_profile, only changed columns
+        are written when the original profile is given, and the update then
+        only applies if the row still has the original's version. Several
+        updates to one user are merged; the first original's version is kept.
+
+        Args:
+            user_id (int): User's ID
+            user_data (dict): Updated values keyed by profile column
+            original (Member, optional): Profile as returned by get_user_data
+
+        Raises:
+            ValueError: If a field is not a profile column, a value is invalid
+                or the user is queued for deletion
+        """
+        # Column names are written into the query, so only profile columns pass
+        unknown = [column for column in user_data if column not in PROFILE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown profile fields: {', '.join(map(str, unknown))}")
+        changes = dict(user_data) if original is None else changed_columns(original, user_data)
+        if not changes:
+            return
+        errors = PROFILE_SCHEMA.validate(changes, partial=True)
+        if errors:
+            raise ValueError(format_errors(errors, '; '))
+        if user_id in self.deletes:
+            raise ValueError(f"User {user_id} is already queued for deletion")
+
+        pending = self.updates.get(user_id)
+        if pending is None:
+            self.updates[user_id] = (changes, original)
+        else:
+            pending[0].update(changes)
+
+    def delete(self, user_id):
+        """
+        Queue the deletion of a user, dropping any update queued for it.
+
+        Args:
+            user_id (int): User's ID
+        """
+        self.updates.pop(user_id, None)
+        self.deletes[user_id] = None
+
+    def discard(self):
+        """
+        Drop every queued operation.
+        """
+        self.inserts = []
+        self.updates = {}
+        self.deletes = {}
+
+    @timed('model')
+    def commit(self):
+        """
+        Write every queued operation in one transaction.
+
+        The queue is emptied whether or not the commit succeeds.
+
+        Returns:
+            bool: True if everything was written, False if the unit was rolled back
+        """
+        if not len(self):
+            return True
+        inserts, updates, deletes = self.inserts, self.updates, list(self.deletes)
+        self.discard()
+
+        try:
+            # Hash before the transaction, so no locks are held during bcrypt
+            rows = [((row[0], self.model.hasher.hash(row[1])) + row[2:], team_id) for row, team_id in inserts]
+            with self.model.backend.transaction() as cursor:
+                inserted = self.write_inserts(cursor, rows)
+                self.write_updates(cursor, updates)
+                deleted = self.write_deletes(cursor, deletes)
+        except StorageError as err:
+            print(f"Could not commit changes: {err}")
+            return False
+
+        self.publish(inserted, updates, deleted)
+        return True
+
+    def write_inserts(self, cursor, rows):
+        """
+        Insert queued registrations with one executemany.
+
+        Args:
+            cursor: Cursor of the open transaction
+            rows (list): (row with hashed password, team ID) pairs
+
+        Returns:
+            list: (user ID, row, team ID) of each inserted user
+
+        Raises:
+            StorageError: If a team does not exist
+        """
+        if not rows:
+            return []
+        self.model.require_teams(cursor, (team_id for _, team_id in rows))
+        user_ids = self.model.id_allocator.allocate_many(cursor, len(rows))
+        cursor.executemany(INSERT_USER, [(user_id, *row, team_id) for user_id, (row, team_id) in zip(user_ids, rows)])
+        return [(user_id, row, team_id) for user_id, (row, team_id) in zip(user_ids, rows)]
+
+    def write_updates(self, cursor, updates):
+        """
+        Apply queued updates, one executemany per set of changed columns.
+
+        Args:
+            cursor: Cursor of the open transaction
+            updates (dict): (changes, original) pairs keyed by user ID
+
+        Raises:
+            ConflictError: If a versioned update matched no row
+        """
+        groups = {}
+        for user_id, (changes, original) in updates.items():
+            params = [*changes.values(), user_id]
+            if original is not None:
+                params.append(original.version)
+            groups.setdefault((tuple(changes), original is not None), []).append(tuple(params))
+
+        for (columns, versioned), params in groups.items():
+            assignments = ", ".join(f"{column}=%s" for column in columns)
+            query = f"UPDATE users SET {assignments}, version=version+1 WHERE id=%s"
+            if versioned:
+                query += " AND version=%s"
+            cursor.executemany(query, params)
+            if versioned and cursor.rowcount < len(params):
+                raise ConflictError("A profile was changed by someone else")
+
+    def write_deletes(self, cursor, user_ids):
+        """
+        Delete queued users and return their IDs to the allocator.
+
+        Args:
+            cursor: Cursor of the open transaction
+            user_ids (list): IDs of the users to delete
+
+        Returns:
+            list: (user ID, team ID) of each user that existed and was deleted
+        """
+        deleted = []
+        for start in range(0, len(user_ids), DELETE_CHUNK_SIZE):
+            chunk = user_ids[start:start + DELETE_CHUNK_SIZE]
+            marks = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"SELECT id, team_id FROM users WHERE id IN ({marks})" + self.model.backend.lock_clause,
+                           tuple(chunk))
+            found = [tuple(row) for row in cursor.fetchall()]
+            if found:
+                cursor.execute(f"DELETE FROM users WHERE id IN ({marks})", tuple(chunk))
+                self.model.id_allocator.release_many(cursor, [user_id for user_id, _ in found])
+            deleted.extend(found)
+        return deleted
+
+    def publish(self, inserted, updates, deleted):
+        """
+        Invalidate caches and announce the committed changes.
+
+        Args:
+            inserted (list): (user ID, row, team ID) of inserted users
+            updates (dict): (changes, original) pairs keyed by user ID
+            deleted (list): (user ID, team ID) of deleted users
+        """
+        model = self.model
+        for user_id, row, team_id in inserted:
+            model.invalidate_caches(user_id, team_id)
+            model.publish_insert(user_id, row, team_id)
+        for user_id, (changes, original) in updates.items():
+            team_id = original.team_id if original is not None else None
+            model.invalidate_caches(user_id, team_id)
+            values = changes if original is None else {**original.to_dict(PROFILE_COLUMNS), **changes}
+            model.events.publish(ChangeEvent(UPDATE, user_id, values, team_id))
+        for user_id, team_id in deleted:
+            model.invalidate_caches(user_id, team_id)
+            model.events.publish(ChangeEvent(DELETE, user_id, team_id=team_id))
+
+
+class WriteBehindBuffer:
+    """
+    Queues writes and commits them in the background, in batches.
+
+    Writes are collected in a UnitOfWork that a flusher thread commits every
+    flush_interval seconds, or as soon as max_pending operations are waiting.
+    Callers return immediately, so bulk workloads pay for one transaction
+    per batch instead of one per row.
+
+    Queued writes are not durable until their batch commits. flush() commits
+    everything queued so far, and close() flushes and stops the thread. A
+    failed batch is rolled back as a whole and counted in failed_batches.
+    """
+
+    def __init__(self, model, flush_interval=1.0, max_pending=1000):
+        """
+        Start the flusher thread.
+
+        Args:
+            model (FootballTeamModel): Model to write to
+            flush_interval (float): Longest time in seconds a write waits to be committed
+            max_pending (int): Number of queued operations that triggers an early flush
+        """
+        self.model = model
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.unit = UnitOfWork(model)
+        self.failed_batches = 0
+        self.closed = False
+        # Guards the current unit; flush_lock keeps batches in queue order
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="ftm-write-behind", daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+    def register(self, *args, **kwargs):
+        """
+        Queue a registration; see UnitOfWork.register.
+        """
+        self._queue(UnitOfWork.register, args, kwargs)
+
+    def update(self, *args, **kwargs):
+        """
+        Queue a profile update; see UnitOfWork.update.
+        """
+        self._queue(UnitOfWork.update, args, kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Queue a deletion; see UnitOfWork.delete.
+        """
+        self._queue(UnitOfWork.delete, args, kwargs)
+
+    def _queue(self, method, args, kwargs):
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("The write-behind buffer is closed")
+            method(self.unit, *args, **kwargs)
+            full = len(self.unit) >= self.max_pending
+        if full:
+            self.wakeup.set()
+
+    def flush(self):
+        """
+        Commit every queued write now.
+
+        Returns:
+            bool: True if the batch was committed or there was nothing to commit
+        """
+        with self.flush_lock:
+            with self.lock:
+                unit, self.unit = self.unit, UnitOfWork(self.model)
+            committed = unit.commit()
+            if not committed:
+                self.failed_batches += 1
+            return committed
+
+    def _run(self):
+        while not self.closed:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def close(self):
+        """
+        Stop accepting writes, commit the remaining ones and stop the thread.
+
+        Returns:
+            bool: True if the last batch was committed
+        """
+        with self.lock:
+            self.closed = True
+        self.wakeup.set()
+        self.thread.join()
+        return self.flush()
@@ -0,0 +1,283 @@
+# validation.py
+
+import re
+from datetime import date
+
+
+REGISTRATION_FIELDS = ('username', 'password', 'first_name', 'last_name', 'date_of_birth', 'position')
+
+ROLES = ('Player', 'Coach')
+
+POSITIONS = ('ST', 'CF', 'RW', 'LW', 'CAM', 'CM', 'CDM', 'RM', 'LM', 'CB', 'RB', 'LB', 'GK')
+
+FEET = ('Right', 'Left')
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+$')
+
+
+class Field:
+    """
+    Declarative description of one form field and the rules it must follow.
+    """
+
+    def __init__(self, name, kind='text', required=False, min_value=None, max_value=None,
+                 choices=None, no_digits=False, email=False, label=None, message=None):
+        """
+        Describe a field.
+
+        Args:
+            name (str): Record key
+            kind (str): 'text', 'int' or 'date'
+            required (bool): Whether an empty value is an error
+            min_value (int, optional): Smallest allowed value of an int field
+            max_value (int, optional): Largest allowed value of an int field
+            choices (tuple, optional): Allowed values
+            no_digits (bool): Reject values containing digits (names)
+            email (bool): Require an address of the form name@domain
+            label (str, optional): Name shown in messages; derived from name by default
+            message (str, optional): Message used for any rule violation other than
+                a missing value
+        """
+        self.name = name
+        self.kind = kind
+        self.required = required
+        self.min_value = min_value
+        self.max_value = max_value
+        self.choices = choices
+        self.no_digits = no_digits
+        self.email = email
+        self.label = label or name.replace('_', ' ').capitalize()
+        self.message = message
+
+    def compile(self):
+        """
+        Turn the field's rules into a single check function.
+
+        Only the rules that apply to this field end up in the function, and
+        choices are looked up in a frozenset.
+
+        Returns:
+            callable: Function taking a value and returning an error message or None
+        """
+        label = self.label
+        checks = []
+
+        if self.kind == 'int':
+            low, high = self.min_value, self.max_value
+            if low is not None and high is not None:
+                range_message = self.message or f"{label} must be a number between {low} and {high}"
+            else:
+                range_message = self.message or f"{label} must be a number"
+
+            def check_int(text):
+                # isdigit() would also accept characters such as '²' that int() rejects
+                if not (text.isascii() and text.isdecimal()):
+                    return range_message
+                number = int(text)
+                if (low is not None and number < low) or (high is not None and number > high):
+                    return range_message
+                return None
+            checks.append(check_int)
+        elif self.kind == 'date':
+            date_message = self.message or f"{label} must be a date in YYYY-MM-DD format"
+
+            def check_date(text):
+                try:
+                    date.fromisoformat(text)
+                except ValueError:
+                    return date_message
+                return None
+            checks.append(check_date)
+
+        if self.choices is not None:
+            allowed = frozenset(self.choices)
+            choice_message = self.message or f"{label} must be one of: {', '.join(self.choices)}"
+            checks.append(lambda text: None if text in allowed else choice_message)
+
+        if self.no_digits:
+            digits_message = self.message or f"{label} should not contain numbers"
+            checks.append(lambda text: digits_message if any(char.isdigit() for char in text) else None)
+
+        if self.email:
+            email_message = self.message or f"{label} must look like name@domain"
+            checks.append(lambda text: None if EMAIL_PATTERN.match(text) else email_message)
+
+        required_message = f"{label} is required" if self.required else None
+
+        def check(value):
+            text = '' if value is None else str(value)
+            if not text:
+                return required_message
+            for rule in checks:
+                error = rule(text)
+                if error:
+                    return error
+            return None
+        return check
+
+
+class Schema:
+    """
+    A set of fields compiled into one validator.
+
+    validate() returns structured per-field errors for a record, and
+    validate_many() checks a whole batch in one call.
+    """
+
+    def __init__(self, fields):
+        """
+        Compile the schema.
+
+        Args:
+            fields (list): Field objects, in form order
+        """
+        self.fields = tuple(fields)
+        self.checks = tuple((field.name, field.compile()) for field in self.fields)
+        self.checks_by_name = dict(self.checks)
+
+    def validate(self, record, partial=False):
+        """
+        Validate one record.
+
+        Args:
+            record (dict): Values keyed by field name
+            partial (bool): Only check the fields present in the record
+
+        Returns:
+            dict: Error message per invalid field, in form order; empty if valid
+        """
+        errors = {}
+        if partial:
+            for name, value in record.items():
+                check = self.checks_by_name.get(name)
+                error = check(value) if check else None
+                if error:
+                    errors[name] = error
+        else:
+            for name, check in self.checks:
+                error = check(record.get(name))
+                if error:
+                    errors[name] = error
+        return errors
+
+    def validate_many(self, records, partial=False):
+        """
+        Validate a batch of records.
+
+        Args:
+            records (iterable): Records to check
+            partial (bool): Only check the fields present in each record
+
+        Returns:
+            dict: Per-field errors keyed by the position of each invalid record
+        """
+        validate = self.validate
+        results = {}
+        for index, record in enumerate(records):
+            errors = validate(record, partial)
+            if errors:
+                results[index] = errors
+        return results
+
+
+REGISTRATION_SCHEMA = Schema([
+    Field('username', required=True),
+    Field('password', required=True),
+    Field('first_name', required=True, no_digits=True),
+    Field('last_name', required=True, no_digits=True),
+    Field('date_of_birth', kind='date', required=True, label='Date of birth'),
+    Field('position', required=True, choices=ROLES, message="Position must be either 'Player' or 'Coach'"),
+])
+
+PROFILE_SCHEMA = Schema([
+    Field('username', required=True),
+    Field('first_name', required=True, no_digits=True),
+    Field('last_name', required=True, no_digits=True),
+    Field('date_of_birth', kind='date', required=True, label='Date of birth'),
+    Field('position', required=True, choices=ROLES, message="Position must be either 'Player' or 'Coach'"),
+    Field('email', email=True),
+    Field('street'),
+    Field('building_number'),
+    Field('postal_code'),
+    Field('city'),
+    Field('jersey_number', kind='int', min_value=1, max_value=99),
+    Field('primary_position', choices=POSITIONS, message="Primary Position must be one of the specified positions"),
+    Field('secondary_position', choices=POSITIONS, message="Secondary Position must be one of the specified positions"),
+    Field('height', kind='int', min_value=0),
+    Field('preferred_foot', choices=FEET, message="Preferred Foot must be either 'Right' or 'Left'"),
+])
+
+TEAM_SCHEMA = Schema([
+    Field('name', required=True, label='Team name'),
+])
+
+
+def registration_record(values):
+    """
+    Take the registration fields from raw input such as a file row.
+
+    Values are converted to text and stripped of surrounding whitespace,
+    except the password, which is kept exactly as typed, as in the
+    registration form.
+
+    Args:
+        values (dict): Raw values keyed by field name; missing or empty values become ''
+
+    Returns:
+        dict: Values keyed by REGISTRATION_FIELDS
+    """
+    record = {field: str(values.get(field) or '') for field in REGISTRATION_FIELDS}
+    return {field: value if field == 'password' else value.strip() for field, value in record.items()}
+
+
+def first_error(errors):
+    """
+    Pick the message to show for a set of field errors.
+
+    Args:
+        errors (dict): Per-field errors from Schema.validate
+
+    Returns:
+        str or None: Message of the first invalid field, or None if there is none
+    """
+    return next(iter(errors.values()), None)
+
+
+def format_errors(errors, separator="\n"):
+    """
+    Join the messages of a set of field errors.
+
+    Args:
+        errors (dict): Per-field errors from Schema.validate
+        separator (str): Text placed between messages
+
+    Returns:
+        str: All messages, in form order
+    """
+    return separator.join(errors.values())
+
+
+def validate_registration(record):
+    """
+    Check a registration record against the registration schema.
+
+    Args:
+        record (dict): Values keyed by REGISTRATION_FIELDS
+
+    Returns:
+        str or None: Error message if the record is invalid, None otherwise
+    """
+    return first_error(REGISTRATION_SCHEMA.validate(record))
+
+
+def validate_profile(record):
+    """
+    Check profile values against the profile schema.
+
+    Args:
+        record (dict): Values keyed by profile column; missing columns are not checked
+
+    Returns:
+        str or None: Error message for the first invalid field, None if all are valid
+    """
+    return first_error(PROFILE_SCHEMA.validate(record, partial=True))
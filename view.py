@@ -1,268 +1,1047 @@
-# view.py
-
-import tkinter as tk
-from tkinter import ttk, messagebox, font
-from tkcalendar import DateEntry
-
-
-class FootballTeamView:
-
-    """
-    The View component of the Football Team Manager application.
-    Handles all GUI-related operations and user interactions.
-    """
-    def __init__(self, master):
-        """
-        Initialize the view.
-
-        Args:
-            master: The root window of the application
-        """
-        self.master = master
-        self.master.title("Football Team Manager")
-        self.master.geometry("800x600")
-        self.master.configure(bg='#ffffff')
-
-        self.button_style = {"font": ("Arial", 14), "bg": "#4CAF50", "fg": "white", "padx": 10, "pady": 5}
-
-    def create_main_window(self):
-        """
-        Create the main window of the application.
-        """
-        main_frame = tk.Frame(self.master, bg='#ffffff')
-        main_frame.pack(expand=True, fill='both', padx=20, pady=20)
-
-        title_label = tk.Label(main_frame, text="Football Team Manager", font=("Arial", 24, "bold"), bg='#ffffff', fg='#000000')
-        title_label.pack(pady=20)
-
-        register_button = tk.Button(main_frame, text="Register", **self.button_style)
-        register_button.pack(pady=10)
-
-        login_button = tk.Button(main_frame, text="Login", **self.button_style)
-        login_button.pack(pady=10)
-
-        view_team_button = tk.Button(main_frame, text="View Team", **self.button_style)
-        view_team_button.pack(pady=10)
-
-        exit_button = tk.Button(main_frame, text="Exit", **self.button_style)
-        exit_button.pack(pady=10)
-
-        
-
-        return register_button, login_button, view_team_button, exit_button
-
-    def create_registration_window(self):
-        """
-        Create the registration window.
-
-        Returns:
-            tuple: Registration window and dictionary of entry fields
-        """
-        registration_window = tk.Toplevel(self.master)
-        registration_window.title("Register")
-        registration_window.geometry("600x700")
-        registration_window.configure(bg='#ffffff')
-
-        form_frame = tk.Frame(registration_window, bg='#ffffff')
-        form_frame.pack(expand=True, fill='both', padx=20, pady=20)
-
-        labels = ['Username', 'Password', 'First Name', 'Last Name', 'Date of Birth', 'Position']
-        entries = {}
-
-        for label in labels:
-            tk.Label(form_frame, text=label, font=("Arial", 12), bg='#ffffff').pack(anchor='w', pady=5)
-            
-            if label == 'Position':
-                entry = ttk.Combobox(form_frame, values=['Player', 'Coach'], font=("Arial", 12))
-                entry.config(state='readonly')
-            elif label == 'Password':
-                entry = tk.Entry(form_frame, font=("Arial", 12), show='*')
-            elif label == 'Date of Birth':
-                entry = DateEntry(form_frame, font=("Arial", 12), date_pattern='y-mm-dd')
-            else:
-                entry = tk.Entry(form_frame, font=("Arial", 12))
-            entry.pack(fill='x', pady=5)
-            entries[label.lower().replace(' ', '_')] = entry
-
-
-        register_button = tk.Button(form_frame, text="Register", **self.button_style)
-        register_button.pack(pady=20)
-
-        return registration_window, entries, register_button
-
-    def create_login_window(self):
-        """
-        Create the login window.
-
-        Returns:
-            tuple: Login window and entry fields for username and password
-        """
-        login_window = tk.Toplevel(self.master)
-        login_window.title("Login")
-        login_window.geometry("400x300")
-        login_window.configure(bg='#ffffff')
-
-        form_frame = tk.Frame(login_window, bg='#ffffff')
-        form_frame.pack(expand=True, fill='both', padx=20, pady=20)
-
-        tk.Label(form_frame, text="Username", font=("Arial", 12), bg='#ffffff').pack(anchor='w', pady=5)
-        username_entry = tk.Entry(form_frame, font=("Arial", 12))
-        username_entry.pack(fill='x', pady=5)
-
-        tk.Label(form_frame, text="Password", font=("Arial", 12), bg='#ffffff').pack(anchor='w', pady=5)
-        password_entry = tk.Entry(form_frame, font=("Arial", 12), show="*")
-        password_entry.pack(fill='x', pady=5)
-
-        login_button = tk.Button(form_frame, text="Login", **self.button_style)
-        login_button.pack(pady=20)
-
-        return login_window, username_entry, password_entry, login_button
-
-    def create_profile_window(self, user_data):
-        """
-        Create the user profile window.
-
-        Args:
-            user_data (tuple): User data to populate the fields
-
-        Returns:
-            tuple: Profile window, dictionary of entry fields, and buttons
-        """
-        profile_window = tk.Toplevel(self.master)
-        profile_window.title("User Profile")
-        profile_window.geometry("600x800")
-        profile_window.configure(bg='#ffffff')
-
-        form_frame = tk.Frame(profile_window, bg='#ffffff')
-        form_frame.pack(expand=True, fill='both', padx=20, pady=20)
-
-        labels = ['Username', 'First Name', 'Last Name', 'Date of Birth', 'Position',
-                'Email', 'Street', 'Building Number', 'Postal Code',
-                'City','Jersey Number', 'Primary Position', 'Secondary Position', 'Height', 'Preferred Foot']
-        
-        entries = {}
-        positions = ['ST', 'CF', 'RW', 'LW', 'CAM', 'CM', 'CDM', 'RM', 'LM', 'CB', 'RB', 'LB', 'GK']
-        preferred_foot = ['Right', 'Left']
-
-        for i, label in enumerate(labels):
-            tk.Label(form_frame, text=label, font=("Arial", 12), bg='#ffffff').grid(row=i, column=0, sticky='w', pady=5)
-            if label == 'Date of Birth':
-                entry = DateEntry(form_frame, font=("Arial", 12), date_pattern='y-mm-dd')
-                entry.set_date(user_data[i] if user_data[i] else '2000-01-01')
-                entry.grid(row=i, column=1, sticky='ew', pady=5)
-            elif label == 'Primary Position' or label == 'Secondary Position':
-                entry = tk.StringVar(value=user_data[i])
-                tk.OptionMenu(form_frame, entry, *positions).grid(row=i, column=1, sticky='ew', pady=5)
-            elif label == 'Preferred Foot':
-                entry = tk.StringVar(value=user_data[i])
-                tk.OptionMenu(form_frame, entry, *preferred_foot).grid(row=i, column=1, sticky='ew', pady=5)
-            else:
-                entry = tk.Entry(form_frame, font=("Arial", 12))
-                entry.grid(row=i, column=1, sticky='ew', pady=5)
-                entry.insert(0, str(user_data[i]) if user_data[i] else '')
-            entries[label.lower().replace(' ', '_')] = entry
-
-        save_button = tk.Button(form_frame, text="Save Changes", **self.button_style)
-        save_button.grid(row=len(labels)+2, column=0, columnspan=2, pady=20)
-
-        delete_button = tk.Button(form_frame, text="Delete Account", **self.button_style)
-        delete_button.grid(row=len(labels)+3, column=0, columnspan=2, pady=20)
-
-        return profile_window, entries, save_button, delete_button
-
-    def create_team_view_window(self, team_data):
-        """
-        Create the team view window.
-
-        Args:
-            team_data (list): List of tuples containing team member data
-
-        Returns:
-            tk.Toplevel: Team view window
-        """
-        team_window = tk.Toplevel(self.master)
-        team_window.title("Team View")
-        team_window.geometry("1000x600")
-        team_window.configure(bg='#ffffff')
-
-        team_frame = tk.Frame(team_window, bg='#ffffff')
-        team_frame.pack(expand=True, fill='both', padx=20, pady=20)
-
-        columns = ('', 'First Name', 'Last Name', 'Date of Birth', 'Position', 'Email', 
-                'Street', 'Building Number', 'Postal Code', 'City', 'Jersey Number', 'Primary Position', 'Secondary Position', 
-                'Height', 'Preferred Foot')
-        tree = ttk.Treeview(team_frame, columns=columns, show='headings')
-
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=150, stretch=True)
-
-        h_scrollbar = ttk.Scrollbar(team_frame, orient='horizontal', command=tree.xview)
-        tree.configure(xscrollcommand=h_scrollbar.set)
-        h_scrollbar.pack(side='bottom', fill='x')
-
-        tree.pack(expand=True, fill='both')
-
-        coach_counter = 1
-        player_counter = 1
-        coaches_inserted = False
-        for row in team_data:
-            if row[3] == 'Coach':
-                if not coaches_inserted:
-                    tree.insert('', 'end', values=('', 'Coaches', '', '', '', '', '', '', '','', '', '', '', '', ''), tags=('separator',))
-                    coaches_inserted = True
-                tree.insert('', 'end', values=(coach_counter, *row))
-                coach_counter += 1
-            else:
-                if player_counter == 1:
-                    tree.insert('', 'end', values=('', 'Players', '', '', '', '', '', '', '', '', '', '', '', '', ''), tags=('separator',))
-                tree.insert('', 'end', values=(player_counter, *row))
-                player_counter += 1
-
-        font_measure = font.Font()
-        for col in columns:
-            tree.column(col, width=font_measure.measure(col) + 10) 
-            for item in tree.get_children():
-                item_text = tree.item(item, 'values')[columns.index(col)]
-                tree.column(col, width=max(tree.column(col, 'width'), font_measure.measure(item_text) + 10))
-
-
-        tree.tag_configure('separator', background='#e0e0e0', font=('Arial', 12, 'bold'))
-
-        return team_window
-
-    def show_message(self, title, message):
-        """
-        Display a message box to the user.
-
-        Args:
-            title (str): Title of the message box
-            message (str): Message to display
-        """
-        messagebox.showinfo(title, message)
-
-    def show_error(self, title, message):
-        """
-        Display an error message to the user.
-
-        Args:
-            title (str): Title of the error box
-            message (str): Error message to display
-        """
-        messagebox.showerror(title, message)
-
-    def ask_yes_no(self, title, message):
-        """
-        Ask the user a yes/no question.
-
-        Args:
-            title (str): Title of the question box
-            message (str): Question to ask
-
-        Returns:
-            bool: True if user selects 'Yes', False otherwise
-        """
-        return messagebox.askyesno(title, message)
-
-
-
+# view.py
+
+from bisect import bisect_left
+import tkinter as tk
+from tkinter import ttk, messagebox, font, filedialog
+
+from events import INSERT, UPDATE
+from metrics import timed
+from migrations import name_key
+from records import PROFILE_COLUMNS, TEAM_COLUMNS
+from validation import FEET, POSITIONS, ROLES
+
+
+# Position of each column in a roster row
+COLUMN_INDEX = {column: i for i, column in enumerate(TEAM_COLUMNS)}
+POSITION = COLUMN_INDEX['position']
+LAST_NAME = COLUMN_INDEX['last_name']
+
+
+class FootballTeamView:
+
+    """
+    The View component of the Football Team Manager application.
+    Handles all GUI-related operations and user interactions.
+    """
+    def __init__(self, master):
+        """
+        Initialize the view.
+
+        Args:
+            master: The root window of the application
+        """
+        self.master = master
+        self.master.title("Football Team Manager")
+        self.master.geometry("800x600")
+        self.master.configure(bg='#ffffff')
+
+        self.button_style = {"font": ("Arial", 14), "bg": "#4CAF50", "fg": "white", "padx": 10, "pady": 5}
+
+    @timed('view')
+    def create_main_window(self):
+        """
+        Create the main window of the application.
+        """
+        main_frame = tk.Frame(self.master, bg='#ffffff')
+        main_frame.pack(expand=True, fill='both', padx=20, pady=20)
+
+        title_label = tk.Label(main_frame, text="Football Team Manager", font=("Arial", 24, "bold"), bg='#ffffff', fg='#000000')
+        title_label.pack(pady=20)
+
+        register_button = tk.Button(main_frame, text="Register", **self.button_style)
+        register_button.pack(pady=10)
+
+        login_button = tk.Button(main_frame, text="Login", **self.button_style)
+        login_button.pack(pady=10)
+
+        view_team_button = tk.Button(main_frame, text="View Team", **self.button_style)
+        view_team_button.pack(pady=10)
+
+        exit_button = tk.Button(main_frame, text="Exit", **self.button_style)
+        exit_button.pack(pady=10)
+
+        
+
+        return register_button, login_button, view_team_button, exit_button
+
+    @timed('view')
+    def create_registration_window(self, teams=()):
+        """
+        Create the registration window.
+
+        Args:
+            teams (list): (team ID, name) tuples to choose the new member's team from
+
+        Returns:
+            tuple: Registration window and dictionary of entry fields; the
+                team choice is under 'team'
+        """
+        registration_window = tk.Toplevel(self.master)
+        registration_window.title("Register")
+        registration_window.geometry("600x700")
+        registration_window.configure(bg='#ffffff')
+
+        form_frame = tk.Frame(registration_window, bg='#ffffff')
+        form_frame.pack(expand=True, fill='both', padx=20, pady=20)
+
+        labels = ['Username', 'Password', 'First Name', 'Last Name', 'Date of Birth', 'Position']
+        entries = {}
+
+        for label in labels:
+            tk.Label(form_frame, text=label, font=("Arial", 12), bg='#ffffff').pack(anchor='w', pady=5)
+            
+            if label == 'Position':
+                entry = ttk.Combobox(form_frame, values=list(ROLES), font=("Arial", 12))
+                entry.config(state='readonly')
+            elif label == 'Password':
+                entry = tk.Entry(form_frame, font=("Arial", 12), show='*')
+            elif label == 'Date of Birth':
+                entry = self.create_date_entry(form_frame)
+            else:
+                entry = tk.Entry(form_frame, font=("Arial", 12))
+            entry.pack(fill='x', pady=5)
+            entries[label.lower().replace(' ', '_')] = entry
+
+        tk.Label(form_frame, text='Team', font=("Arial", 12), bg='#ffffff').pack(anchor='w', pady=5)
+        team_entry = ttk.Combobox(form_frame, values=[name for _, name in teams], font=("Arial", 12))
+        team_entry.config(state='readonly')
+        if teams:
+            team_entry.current(0)
+        team_entry.pack(fill='x', pady=5)
+        entries['team'] = team_entry
+
+        register_button = tk.Button(form_frame, text="Register", **self.button_style)
+        register_button.pack(pady=20)
+
+        return registration_window, entries, register_button
+
+    @timed('view')
+    def create_login_window(self):
+        """
+        Create the login window.
+
+        Returns:
+            tuple: Login window and entry fields for username and password
+        """
+        login_window = tk.Toplevel(self.master)
+        login_window.title("Login")
+        login_window.geometry("400x300")
+        login_window.configure(bg='#ffffff')
+
+        form_frame = tk.Frame(login_window, bg='#ffffff')
+        form_frame.pack(expand=True, fill='both', padx=20, pady=20)
+
+        tk.Label(form_frame, text="Username", font=("Arial", 12), bg='#ffffff').pack(anchor='w', pady=5)
+        username_entry = tk.Entry(form_frame, font=("Arial", 12))
+        username_entry.pack(fill='x', pady=5)
+
+        tk.Label(form_frame, text="Password", font=("Arial", 12), bg='#ffffff').pack(anchor='w', pady=5)
+        password_entry = tk.Entry(form_frame, font=("Arial", 12), show="*")
+        password_entry.pack(fill='x', pady=5)
+
+        login_button = tk.Button(form_frame, text="Login", **self.button_style)
+        login_button.pack(pady=20)
+
+        return login_window, username_entry, password_entry, login_button
+
+    @timed('view')
+    def create_profile_window(self, user_data):
+        """
+        Create the user profile window.
+
+        Args:
+            user_data (Member): User data to populate the fields
+
+        Returns:
+            tuple: Profile window, dictionary of entry fields, and buttons
+        """
+        profile_window = tk.Toplevel(self.master)
+        profile_window.title("User Profile")
+        profile_window.geometry("600x800")
+        profile_window.configure(bg='#ffffff')
+
+        form_frame = tk.Frame(profile_window, bg='#ffffff')
+        form_frame.pack(expand=True, fill='both', padx=20, pady=20)
+
+        labels = ['Username', 'First Name', 'Last Name', 'Date of Birth', 'Position',
+                'Email', 'Street', 'Building Number', 'Postal Code',
+                'City','Jersey Number', 'Primary Position', 'Secondary Position', 'Height', 'Preferred Foot']
+        
+        entries = {}
+
+        for i, (label, column) in enumerate(zip(labels, PROFILE_COLUMNS)):
+            value = getattr(user_data, column)
+            tk.Label(form_frame, text=label, font=("Arial", 12), bg='#ffffff').grid(row=i, column=0, sticky='w', pady=5)
+            if label == 'Date of Birth':
+                entry = self.create_date_entry(form_frame)
+                entry.set_date(value if value else '2000-01-01')
+                entry.grid(row=i, column=1, sticky='ew', pady=5)
+            elif label == 'Primary Position' or label == 'Secondary Position':
+                entry = tk.StringVar(value=value)
+                tk.OptionMenu(form_frame, entry, *POSITIONS).grid(row=i, column=1, sticky='ew', pady=5)
+            elif label == 'Preferred Foot':
+                entry = tk.StringVar(value=value)
+                tk.OptionMenu(form_frame, entry, *FEET).grid(row=i, column=1, sticky='ew', pady=5)
+            else:
+                entry = tk.Entry(form_frame, font=("Arial", 12))
+                entry.grid(row=i, column=1, sticky='ew', pady=5)
+                entry.insert(0, str(value) if value else '')
+            entries[column] = entry
+
+        save_button = tk.Button(form_frame, text="Save Changes", **self.button_style)
+        save_button.grid(row=len(labels)+2, column=0, columnspan=2, pady=20)
+
+        delete_button = tk.Button(form_frame, text="Delete Account", **self.button_style)
+        delete_button.grid(row=len(labels)+3, column=0, columnspan=2, pady=20)
+
+        return profile_window, entries, save_button, delete_button
+
+    def create_date_entry(self, parent):
+        """
+        Create a date picker field.
+
+        tkcalendar is imported on first use rather than at startup.
+
+        Args:
+            parent (tk.Widget): Parent widget
+
+        Returns:
+            DateEntry: Date picker using the YYYY-MM-DD format
+        """
+        from tkcalendar import DateEntry
+
+        return DateEntry(parent, font=("Arial", 12), date_pattern='y-mm-dd')
+
+    @timed('view')
+    def create_team_view_window(self, first_page, page_size=200, teams=(), team_id=None, fetch_page=None):
+        """
+        Create the team view window.
+
+        The first page is shown immediately and further pages are requested
+        from fetch_page as the user scrolls towards the end of the list.
+
+        Args:
+            first_page (list): First (user ID, tuple in TEAM_COLUMNS order)
+                pairs in roster order, such as from Roster.items()
+            page_size (int): Number of rows per page
+            teams (list): (team ID, name) tuples offered by the team selector
+            team_id (int, optional): ID of the team shown
+            fetch_page (callable, optional): See RosterTable; without it the
+                first page is the whole roster
+
+        Returns:
+            tuple: Team view window, export button, statistics button, lineup
+                button, team selector, search bar and the RosterTable filling it
+        """
+        team_window = tk.Toplevel(self.master)
+        team_window.title("Team View")
+        team_window.geometry("1000x600")
+        team_window.configure(bg='#ffffff')
+
+        toolbar = tk.Frame(team_window, bg='#ffffff')
+        toolbar.pack(fill='x', padx=20, pady=(20, 0))
+
+        tk.Label(toolbar, text="Team", font=("Arial", 12), bg='#ffffff').pack(side='left', padx=(0, 10))
+        team_selector = ttk.Combobox(toolbar, values=[name for _, name in teams], font=("Arial", 12))
+        team_selector.config(state='readonly')
+        team_ids = [tid for tid, _ in teams]
+        if team_id in team_ids:
+            team_selector.current(team_ids.index(team_id))
+        team_selector.pack(side='left')
+
+        export_button = tk.Button(toolbar, text="Export", **self.button_style)
+        export_button.pack(side='right')
+
+        stats_button = tk.Button(toolbar, text="Statistics", **self.button_style)
+        stats_button.pack(side='right', padx=(0, 10))
+
+        lineup_button = tk.Button(toolbar, text="Lineups", **self.button_style)
+        lineup_button.pack(side='right', padx=(0, 10))
+
+        search_bar = SearchBar(team_window)
+        search_bar.frame.pack(fill='x', padx=20, pady=(10, 0))
+
+        team_frame = tk.Frame(team_window, bg='#ffffff')
+        team_frame.pack(expand=True, fill='both', padx=20, pady=20)
+
+        columns = ('', 'First Name', 'Last Name', 'Date of Birth', 'Position', 'Email', 
+                'Street', 'Building Number', 'Postal Code', 'City', 'Jersey Number', 'Primary Position', 'Secondary Position', 
+                'Height', 'Preferred Foot')
+        tree = ttk.Treeview(team_frame, columns=columns, show='headings')
+
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=150, stretch=True)
+
+        h_scrollbar = ttk.Scrollbar(team_frame, orient='horizontal', command=tree.xview)
+        v_scrollbar = ttk.Scrollbar(team_frame, orient='vertical', command=tree.yview)
+        h_scrollbar.pack(side='bottom', fill='x')
+        v_scrollbar.pack(side='right', fill='y')
+
+        tree.pack(expand=True, fill='both')
+        tree.tag_configure('separator', background='#e0e0e0', font=('Arial', 12, 'bold'))
+
+        roster = RosterTable(tree, columns, page_size, fetch_page)
+        tree.configure(xscrollcommand=h_scrollbar.set, yscrollcommand=roster.scroll_handler(v_scrollbar))
+        roster.load_page(first_page)
+
+        return team_window, export_button, stats_button, lineup_button, team_selector, search_bar, roster
+
+    def create_statistics_window(self, report):
+        """
+        Create the squad statistics window, with one tab per statistic.
+
+        Args:
+            report (SquadReport): Statistics to display
+        """
+        stats_window = tk.Toplevel(self.master)
+        stats_window.title("Squad Statistics")
+        stats_window.geometry("600x400")
+        stats_window.configure(bg='#ffffff')
+
+        mean_age = f"{report.mean_age:.1f}" if report.mean_age is not None else "-"
+        roles = ", ".join(f"{role}s: {report.roles.get(role, 0)}" for role in ROLES)
+        tk.Label(stats_window, text=f"{report.members} members ({roles}), mean age {mean_age}",
+                 font=("Arial", 12), bg='#ffffff').pack(padx=20, pady=(20, 10), anchor='w')
+
+        notebook = ttk.Notebook(stats_window)
+        notebook.pack(expand=True, fill='both', padx=20, pady=(0, 20))
+
+        def add_tab(title, headings, rows):
+            frame = tk.Frame(notebook, bg='#ffffff')
+            tree = ttk.Treeview(frame, columns=headings, show='headings')
+            for heading in headings:
+                tree.heading(heading, text=heading)
+                tree.column(heading, width=100, stretch=True)
+            for row in rows:
+                tree.insert('', 'end', values=row)
+            tree.pack(expand=True, fill='both')
+            notebook.add(frame, text=title)
+
+        add_tab("Age", ('Age', 'Members'), list(report.age_bands.items()))
+        add_tab("Positions", ('Position', 'Primary', 'Secondary'),
+                [(position, report.primary.get(position, 0), report.secondary.get(position, 0))
+                 for position in POSITIONS])
+        add_tab("Height", ('Position', 'Players', 'Average', 'Shortest', 'Tallest'),
+                [(position, count, f"{mean:.1f}", low, high)
+                 for position, (count, mean, low, high) in sorted(report.heights.items())])
+        add_tab("Foot", ('Preferred Foot', 'Players'), [(foot, report.feet.get(foot, 0)) for foot in FEET])
+        add_tab("Jersey Conflicts", ('Jersey Number', 'Members'),
+                [(number, report.conflict_summary(number)) for number in report.jersey_conflicts])
+
+    def create_lineup_window(self, lineups):
+        """
+        Create the lineup suggestions window, with one tab per lineup.
+
+        Args:
+            lineups (list): Lineup objects, best first
+        """
+        lineup_window = tk.Toplevel(self.master)
+        lineup_window.title("Lineup Suggestions")
+        lineup_window.geometry("600x450")
+        lineup_window.configure(bg='#ffffff')
+
+        if not lineups:
+            tk.Label(lineup_window, text="No lineups could be picked", font=("Arial", 12),
+                     bg='#ffffff').pack(padx=20, pady=20)
+            return
+
+        notebook = ttk.Notebook(lineup_window)
+        notebook.pack(expand=True, fill='both', padx=20, pady=20)
+
+        headings = ('Slot', 'No.', 'Player', 'Primary', 'Secondary', 'Score')
+        for lineup in lineups:
+            frame = tk.Frame(notebook, bg='#ffffff')
+            tree = ttk.Treeview(frame, columns=headings, show='headings')
+            for heading in headings:
+                tree.heading(heading, text=heading)
+                tree.column(heading, width=80 if heading != 'Player' else 200, stretch=True)
+            for slot, player, score in lineup.picks:
+                if player is None:
+                    tree.insert('', 'end', values=(slot.name, '', '-', '', '', ''))
+                else:
+                    jersey = '' if player.jersey is None else player.jersey
+                    tree.insert('', 'end', values=(slot.name, jersey, player.name, player.primary or '',
+                                                   player.secondary or '', f"{score:.1f}"))
+            tree.pack(expand=True, fill='both')
+            notebook.add(frame, text=f"{lineup.formation} ({lineup.score:.1f})")
+
+    def ask_export_path(self):
+        """
+        Ask the user where to export the roster.
+
+        Returns:
+            str: Chosen file path, or an empty string if cancelled
+        """
+        return filedialog.asksaveasfilename(
+            title="Export Team",
+            defaultextension='.csv',
+            filetypes=[('CSV', '*.csv'), ('JSON Lines', '*.jsonl'), ('Columnar', '*.ftmc')]
+        )
+
+    def set_busy(self, window, busy, button=None):
+        """
+        Show or clear the busy indicator on a window.
+
+        Args:
+            window (tk.Misc): Window to mark as busy
+            busy (bool): True to show the indicator, False to clear it
+            button (tk.Button, optional): Button to disable while busy
+        """
+        if not window.winfo_exists():
+            return
+        window.config(cursor='watch' if busy else '')
+        if button is not None and button.winfo_exists():
+            button.config(state='disabled' if busy else 'normal')
+
+    def show_message(self, title, message):
+        """
+        Display a message box to the user.
+
+        Args:
+            title (str): Title of the message box
+            message (str): Message to display
+        """
+        messagebox.showinfo(title, message)
+
+    def show_error(self, title, message):
+        """
+        Display an error message to the user.
+
+        Args:
+            title (str): Title of the error box
+            message (str): Error message to display
+        """
+        messagebox.showerror(title, message)
+
+    def ask_yes_no(self, title, message):
+        """
+        Ask the user a yes/no question.
+
+        Args:
+            title (str): Title of the question box
+            message (str): Question to ask
+
+        Returns:
+            bool: True if user selects 'Yes', False otherwise
+        """
+        return messagebox.askyesno(title, message)
+
+
+class SearchBar:
+    """
+    Search text and filter choices of the team view.
+
+    The text matches names and jersey numbers; the choices filter by role,
+    played position and preferred foot. Every keystroke and choice calls
+    the callbacks given to on_change.
+    """
+
+    # Label, search keyword and choices of each filter
+    filters = (('Role', 'position', ROLES), ('Plays', 'plays', POSITIONS), ('Foot', 'preferred_foot', FEET))
+
+    # Choice that disables a filter
+    any_choice = 'Any'
+
+    def __init__(self, master):
+        """
+        Build the search bar.
+
+        Args:
+            master (tk.Misc): Parent widget
+        """
+        self.frame = tk.Frame(master, bg='#ffffff')
+        self.text = tk.StringVar(self.frame)
+        self.choices = {}
+
+        tk.Label(self.frame, text="Search", font=("Arial", 12), bg='#ffffff').pack(side='left', padx=(0, 10))
+        self.entry = tk.Entry(self.frame, textvariable=self.text, font=("Arial", 12))
+        self.entry.pack(side='left', fill='x', expand=True)
+
+        for label, keyword, values in self.filters:
+            tk.Label(self.frame, text=label, font=("Arial", 12), bg='#ffffff').pack(side='left', padx=(20, 5))
+            choice = tk.StringVar(self.frame, value=self.any_choice)
+            selector = ttk.Combobox(self.frame, textvariable=choice, values=(self.any_choice,) + tuple(values),
+                                    width=8, font=("Arial", 12), state='readonly')
+            selector.pack(side='left')
+            self.choices[keyword] = choice
+
+    def on_change(self, callback):
+        """
+        Call a function whenever the search text or a filter changes.
+
+        Args:
+            callback (callable): Called without arguments
+        """
+        for variable in (self.text, *self.choices.values()):
+            variable.trace_add('write', lambda *_: callback())
+
+    def query(self):
+        """
+        Read the current search.
+
+        Returns:
+            tuple: (str, dict) the search text, and the chosen filter values
+                keyed by RosterIndex.search keyword
+        """
+        filters = {keyword: choice.get() for keyword, choice in self.choices.items()
+                   if choice.get() != self.any_choice}
+        return self.text.get(), filters
+
+    def active(self):
+        """
+        Tell whether any search text or filter is set.
+
+        Returns:
+            bool: True if the search restricts the roster
+        """
+        text, filters = self.query()
+        return bool(text.strip() or filters)
+
+    def clear(self):
+        """
+        Reset the search text and every filter.
+        """
+        self.text.set('')
+        for choice in self.choices.values():
+            choice.set(self.any_choice)
+
+
+class RosterTable:
+    """
+    Fills a team Treeview lazily, one page of rows at a time, and keeps it
+    up to date with change events.
+
+    Only the pages the user has scrolled to are inserted into the widget.
+    Pages are fetched through a callback that reads them off the main loop,
+    so scrolling never waits for the database.
+    Column widths are kept up to date in the same pass that inserts rows:
+    for each column only values longer than the longest one seen so far are
+    measured, so no Treeview items are ever read back.
+
+    Inserted, updated and deleted members are applied in place. Rows are
+    kept in roster order by their sort key, and only the rows of a section
+    that follow a change are renumbered. Changes to members that have not
+    been loaded yet are held back and applied when their page arrives.
+
+    filter() restricts the table to some members by detaching the other
+    rows and reattaching them later, so a new filter only touches the rows
+    whose visibility changes. Counters keep the members' places in the
+    whole roster.
+    """
+
+    # Load the next page once the visible area reaches this fraction of the list
+    prefetch_threshold = 0.9
+
+    def __init__(self, tree, columns, page_size, fetch_page=None):
+        """
+        Initialize the roster table.
+
+        Args:
+            tree (ttk.Treeview): Treeview to fill
+            columns (tuple): Column headings, the first being the row counter
+            page_size (int): Number of rows per page
+            fetch_page (callable, optional): Called as fetch_page(on_page,
+                on_error) to read the next page off the main loop. It calls
+                on_page with a list of (user ID, row) pairs or on_error with
+                the exception on the main loop, and returns a handle with a
+                cancel() method. Without it no pages follow the first one.
+        """
+        self.tree = tree
+        self.columns = columns
+        self.page_size = page_size
+        self.fetch_page = fetch_page
+        self.exhausted = False
+        # Handle of the page being fetched, if any
+        self.fetching = None
+        tree.bind('<Destroy>', lambda event: self.cancel_fetch() if event.widget is tree else None, add='+')
+
+        # Sort keys of the loaded members in roster order, and each loaded member's row
+        self.keys = []
+        self.members = {}
+        self.coach_count = 0
+
+        # IDs the table is filtered to (None when unfiltered), and the sort
+        # keys of the attached rows in display order
+        self.matches = None
+        self.shown = []
+        self.shown_coaches = 0
+
+        # Changes to members that are not shown yet
+        self.waiting = {}
+        self.changed = {}
+        self.deleted = set()
+
+        self.font = font.Font()
+        self.longest = [''] * len(columns)
+        self.widths = [0] * len(columns)
+        self.fit_columns([columns])
+
+    def reset(self, first_page, fetch_page=None):
+        """
+        Replace every row with another roster, e.g. after switching teams.
+
+        Args:
+            first_page (list): First (user ID, tuple in TEAM_COLUMNS order) pairs
+            fetch_page (callable, optional): Reads the pages of the new roster, as in __init__
+        """
+        self.cancel_fetch()
+        self.tree.delete(*self.tree.get_children())
+        self.fetch_page = fetch_page
+        self.exhausted = False
+        self.keys = []
+        self.members = {}
+        self.coach_count = 0
+        self.matches = None
+        self.shown = []
+        self.shown_coaches = 0
+        self.waiting = {}
+        self.changed = {}
+        self.deleted = set()
+        self.tree.yview_moveto(0)
+        self.load_page(first_page)
+
+    @staticmethod
+    def sort_key(user_id, row):
+        """
+        Build the roster order key of a member: coaches first, then by last
+        name, ignoring case and accents as the database does, and ID.
+
+        Args:
+            user_id (int): ID of the member
+            row (tuple): Values in TEAM_COLUMNS order
+
+        Returns:
+            tuple: Sort key
+        """
+        return (0 if row[POSITION] == 'Coach' else 1, name_key(row[LAST_NAME]), user_id)
+
+    def scroll_handler(self, scrollbar):
+        """
+        Build the yscrollcommand callback for the tree.
+
+        Args:
+            scrollbar (ttk.Scrollbar): Vertical scrollbar to keep in sync
+
+        Returns:
+            callable: Callback that updates the scrollbar and prefetches pages
+        """
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) >= self.prefetch_threshold:
+                self.request_page()
+        return on_scroll
+
+    def request_page(self):
+        """
+        Start fetching the next page, unless one is on its way or all are loaded.
+
+        Returns:
+            bool: Whether a fetch was started
+        """
+        if self.exhausted or self.fetching is not None or self.fetch_page is None:
+            return False
+        self.fetching = self.fetch_page(self.load_page, self.page_failed)
+        return True
+
+    def page_failed(self, error):
+        """
+        Forget a failed fetch, so scrolling requests the page again.
+
+        Args:
+            error (Exception): Why the page could not be read
+        """
+        self.fetching = None
+
+    def cancel_fetch(self):
+        """
+        Cancel the page being fetched, if any; its rows are never inserted.
+        """
+        if self.fetching is not None:
+            self.fetching.cancel()
+            self.fetching = None
+
+    def load_page(self, page):
+        """
+        Insert the next page of rows into the tree.
+
+        Args:
+            page (list): (user ID, tuple in TEAM_COLUMNS order) pairs following
+                the loaded ones in roster order
+
+        Returns:
+            int: Number of member rows in the page
+        """
+        self.fetching = None
+        if self.exhausted:
+            return 0
+        if len(page) < self.page_size or self.fetch_page is None:
+            self.exhausted = True
+
+        inserted = []
+        for user_id, row in page:
+            inserted.extend(self.load_member(user_id, row))
+        inserted.extend(self.place_waiting())
+
+        self.fit_columns(inserted)
+        return len(page)
+
+    def load_member(self, user_id, row):
+        """
+        Insert a member read from the roster, with any change held back for it.
+
+        Args:
+            user_id (int): ID of the member
+            row (tuple): Values in TEAM_COLUMNS order, as read
+
+        Returns:
+            list: Value tuples inserted into the tree
+        """
+        if user_id in self.deleted or user_id in self.members:
+            return []
+        if user_id in self.waiting:
+            row = self.waiting.pop(user_id)
+        changes = self.changed.pop(user_id, None)
+        if changes:
+            row = self.patch(row, changes)
+        return self.insert_member(user_id, row)
+
+    def filter(self, matches, rows=None):
+        """
+        Show only some members, or every loaded member again.
+
+        Matching members that have not been loaded yet are inserted from
+        rows; the pages that contain them later skip them.
+
+        Args:
+            matches (set or None): IDs of the members to show; None removes the filter
+            rows (dict, optional): Rows in TEAM_COLUMNS order keyed by ID,
+                covering at least the matches
+
+        Returns:
+            int: Number of rows attached or detached
+        """
+        inserted = []
+        if matches is not None and rows is not None:
+            for user_id in matches:
+                if user_id not in self.members and user_id in rows:
+                    inserted.extend(self.load_member(user_id, rows[user_id]))
+
+        old, self.matches = self.matches, matches
+        loaded = self.members.keys()
+        shown = set(loaded) if old is None else loaded & old
+        target = set(loaded) if matches is None else loaded & matches
+        for user_id in shown - target:
+            self.hide(self.sort_key(user_id, self.members[user_id]))
+        for user_id in target - shown:
+            inserted.extend(self.show(self.sort_key(user_id, self.members[user_id])))
+        self.fit_columns(inserted)
+        return len(shown ^ target)
+
+    def apply_event(self, event):
+        """
+        Apply a committed change to the table.
+
+        Args:
+            event (ChangeEvent): Change published by the model
+        """
+        if not self.tree.winfo_exists():
+            return
+        if event.kind == INSERT:
+            row = tuple(event.values.get(column) for column in TEAM_COLUMNS)
+            inserted = self.add_member(event.user_id, row)
+        elif event.kind == UPDATE:
+            inserted = self.update_member(event.user_id, event.values)
+        else:
+            self.remove_member(event.user_id)
+            inserted = []
+        self.fit_columns(inserted)
+
+    def add_member(self, user_id, row):
+        """
+        Show a new member if its place is within the loaded part of the roster.
+
+        Members that sort after the last loaded row wait until the pages
+        before them have been loaded.
+
+        Args:
+            user_id (int): ID of the member
+            row (tuple): Values in TEAM_COLUMNS order
+
+        Returns:
+            list: Value tuples inserted into the tree
+        """
+        self.deleted.discard(user_id)
+        if user_id in self.members:
+            return []
+        if self.exhausted or (self.keys and self.sort_key(user_id, row) < self.keys[-1]):
+            return self.insert_member(user_id, row)
+        self.waiting[user_id] = row
+        return []
+
+    def update_member(self, user_id, changes):
+        """
+        Apply changed values to a member, moving its row if its place changed.
+
+        Args:
+            user_id (int): ID of the member
+            changes (dict): New values keyed by column
+
+        Returns:
+            list: Value tuples inserted or changed in the tree
+        """
+        if user_id in self.waiting:
+            self.waiting[user_id] = self.patch(self.waiting[user_id], changes)
+            return []
+        if user_id not in self.members:
+            if self.exhausted:
+                return []
+            if all(column in changes for column in TEAM_COLUMNS):
+                # The whole row is known, so place it now: its page may never
+                # come if the change moved it before the loaded part
+                self.changed.pop(user_id, None)
+                return self.add_member(user_id, tuple(changes[column] for column in TEAM_COLUMNS))
+            self.changed.setdefault(user_id, {}).update(changes)
+            return []
+
+        old_row = self.members[user_id]
+        row = self.patch(old_row, changes)
+        if self.sort_key(user_id, row) == self.sort_key(user_id, old_row):
+            self.members[user_id] = row
+            index = self.position(self.sort_key(user_id, row))
+            values = (self.number(index), *row)
+            self.tree.item(str(user_id), values=values)
+            return [values]
+
+        self.delete_member(user_id)
+        return self.add_member(user_id, row)
+
+    def remove_member(self, user_id):
+        """
+        Remove a member from the table, or make sure it is skipped when its page arrives.
+
+        Args:
+            user_id (int): ID of the member
+        """
+        self.changed.pop(user_id, None)
+        self.waiting.pop(user_id, None)
+        if user_id in self.members:
+            self.delete_member(user_id)
+        # A page fetched before the delete may still contain the member
+        if not self.exhausted:
+            self.deleted.add(user_id)
+
+    def place_waiting(self):
+        """
+        Insert waiting members whose place is now within the loaded part of the roster.
+
+        Returns:
+            list: Value tuples inserted into the tree
+        """
+        inserted = []
+        for user_id, row in list(self.waiting.items()):
+            if self.exhausted or (self.keys and self.sort_key(user_id, row) < self.keys[-1]):
+                del self.waiting[user_id]
+                if user_id not in self.members:
+                    inserted.extend(self.insert_member(user_id, row))
+        return inserted
+
+    def insert_member(self, user_id, row):
+        """
+        Insert a member row at its place in roster order.
+
+        Rows arriving in roster order are appended; only rows placed in the
+        middle of a section cause the rest of that section to be renumbered.
+        Rows of members outside the filter are inserted detached.
+
+        Args:
+            user_id (int): ID of the member
+            row (tuple): Values in TEAM_COLUMNS order
+
+        Returns:
+            list: Value tuples inserted into the tree, including any new section heading
+        """
+        key = self.sort_key(user_id, row)
+        index = bisect_left(self.keys, key)
+        coach = key[0] == 0
+        if coach:
+            self.coach_count += 1
+        self.keys.insert(index, key)
+        self.members[user_id] = row
+        values = (self.number(index), *row)
+
+        if self.matches is None or user_id in self.matches:
+            inserted = self.show(key, values)
+        else:
+            self.tree.insert('', 'end', iid=str(user_id), values=values)
+            self.tree.detach(str(user_id))
+            inserted = []
+        inserted.append(values)
+        if index < len(self.keys) - 1:
+            self.renumber(index + 1, coach)
+        return inserted
+
+    def delete_member(self, user_id):
+        """
+        Delete a loaded member's row and renumber the rest of its section.
+
+        Args:
+            user_id (int): ID of the member
+        """
+        row = self.members.pop(user_id)
+        key = self.sort_key(user_id, row)
+        index = self.position(key)
+        del self.keys[index]
+        coach = key[0] == 0
+        if coach:
+            self.coach_count -= 1
+        if self.matches is None or user_id in self.matches:
+            self.hide(key)
+        self.tree.delete(str(user_id))
+        self.renumber(index, coach)
+
+    def show(self, key, values=None):
+        """
+        Attach a member's row among the shown rows, adding its section heading if needed.
+
+        Args:
+            key (tuple): Sort key of the member
+            values (tuple, optional): Values of a new row; an existing
+                detached row is reattached if omitted
+
+        Returns:
+            list: Value tuples of any section heading inserted
+        """
+        inserted = []
+        index = bisect_left(self.shown, key)
+        if key[0] == 0:
+            if self.shown_coaches == 0:
+                inserted.append(self.insert_separator('Coaches', 0))
+            tree_index = index + 1
+            self.shown_coaches += 1
+        else:
+            heading = 1 if self.shown_coaches else 0
+            if len(self.shown) == self.shown_coaches:
+                inserted.append(self.insert_separator('Players', self.shown_coaches + heading))
+            tree_index = index + heading + 1
+
+        at_end = index == len(self.shown)
+        self.shown.insert(index, key)
+        if values is None:
+            self.tree.move(str(key[2]), '', 'end' if at_end else tree_index)
+        else:
+            self.tree.insert('', 'end' if at_end else tree_index, iid=str(key[2]), values=values)
+        return inserted
+
+    def hide(self, key):
+        """
+        Detach a shown member's row, removing its section heading if the section is left empty.
+
+        Args:
+            key (tuple): Sort key of the member
+        """
+        del self.shown[self.position(key, self.shown)]
+        self.tree.detach(str(key[2]))
+        if key[0] == 0:
+            self.shown_coaches -= 1
+            if self.shown_coaches == 0:
+                self.tree.delete('coaches')
+        elif len(self.shown) == self.shown_coaches:
+            self.tree.delete('players')
+
+    def position(self, key, keys=None):
+        """
+        Find a member's position in a sorted key list.
+
+        Args:
+            key (tuple): Sort key of the member
+            keys (list, optional): Key list to search; defaults to self.keys
+
+        Returns:
+            int: Position of the key
+        """
+        keys = self.keys if keys is None else keys
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            return index
+        return keys.index(key)
+
+    def number(self, index):
+        """
+        Get the counter shown for the member at a position.
+
+        Args:
+            index (int): Position in self.keys
+
+        Returns:
+            int: 1-based position within the member's section
+        """
+        return index + 1 if index < self.coach_count else index - self.coach_count + 1
+
+    def renumber(self, start, coach):
+        """
+        Update the counters of a section from a position to the section's end.
+
+        Args:
+            start (int): First position in self.keys to update
+            coach (bool): Whether the section is the coaches section
+        """
+        end = self.coach_count if coach else len(self.keys)
+        for index in range(start, end):
+            self.tree.set(str(self.keys[index][2]), '#1', self.number(index))
+
+    def insert_separator(self, title, index):
+        """
+        Insert a section heading row.
+
+        Args:
+            title (str): Text shown in the first name column
+            index (int): Position of the heading in the tree
+
+        Returns:
+            tuple: Values of the inserted row
+        """
+        values = ('', title) + ('',) * (len(self.columns) - 2)
+        self.tree.insert('', index, iid=title.lower(), values=values, tags=('separator',))
+        return values
+
+    def patch(self, row, changes):
+        """
+        Apply changed values to a row.
+
+        Args:
+            row (tuple): Values in TEAM_COLUMNS order
+            changes (dict): New values keyed by column; non-roster columns are ignored
+
+        Returns:
+            tuple: Updated row
+        """
+        row = list(row)
+        for column, value in changes.items():
+            index = COLUMN_INDEX.get(column)
+            if index is not None:
+                row[index] = value
+        return tuple(row)
+
+    def fit_columns(self, rows):
+        """
+        Widen columns to fit new rows, measuring each column at most once.
+
+        Args:
+            rows (list): Value tuples that were just inserted or changed
+        """
+        candidates = list(self.longest)
+        for values in rows:
+            for i, value in enumerate(values):
+                text = str(value)
+                if len(text) > len(candidates[i]):
+                    candidates[i] = text
+
+        for i, text in enumerate(candidates):
+            if text is self.longest[i]:
+                continue
+            self.longest[i] = text
+            width = self.font.measure(text) + 10
+            if width > self.widths[i]:
+                self.widths[i] = width
+                self.tree.column(self.columns[i], width=width)